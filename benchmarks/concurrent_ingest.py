@@ -0,0 +1,69 @@
+"""
+Measures throughput of Model.generate alone and while another thread updates the same dictionary,
+and the time of copying the text generator which an update starts with.
+
+Usage: python -m benchmarks.concurrent_ingest [words count of the dictionary] [words count of the update]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.model import Model
+from model.text_parser import TextParser
+
+
+def generate(model: Model, prompts: list[str], stop: threading.Event = None) -> tuple[int, float]:
+    """Generate by prompts in a loop until stop is set or once without stop, return count and seconds."""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for prompt in prompts:
+            model.generate(prompt)
+        count += len(prompts)
+        if stop is None or stop.is_set():
+            return count, time.perf_counter() - start
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    update_words_count = int(sys.argv[2]) if len(sys.argv) > 2 else 300_000
+    with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+        paths = []
+        for seed, count in ((0, words_count), (1, update_words_count)):
+            paths.append(os.path.join(directory, f"text_{seed}.txt"))
+            with open(paths[-1], "w", encoding="UTF-8") as file:
+                file.write(generate_corpus(count, seed=seed))
+        model = Model()
+        model.create_new("dictionary")
+        model.read_and_update(paths[0])
+        words = [word for sentence in TextParser().parse_text(generate_corpus(1000, seed=2)) for word in sentence]
+        prompts = [word for word in words if word != "."]
+
+        start = time.perf_counter()
+        model.registry.get("dictionary").copy()
+        print(f"copy of the text generator: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        count, seconds = generate(model, prompts * 20)
+        print(f"generation alone:           {count / seconds:10.0f} phrases/s")
+
+        stop = threading.Event()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(generate(model, prompts, stop)))
+        thread.start()
+        start = time.perf_counter()
+        model.read_and_update(paths[1])
+        update_seconds = time.perf_counter() - start
+        stop.set()
+        thread.join()
+        count, seconds = result[0]
+        print(f"generation during update:   {count / seconds:10.0f} phrases/s, update took {update_seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
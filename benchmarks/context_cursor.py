@@ -0,0 +1,67 @@
+"""
+Compares per-token latency of continue_phrase with contexts looked up by text and with the cursor over token ids.
+
+Usage: python -m benchmarks.context_cursor [prompts count]
+The dictionary is built from a synthetic corpus of 300,000 words and also opened from its binary dump.
+The best of three runs is reported.
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.context_cursor import TextContextCursor
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+SETTINGS = GenerationSettings(max_generated_word_count=30, generated_without_dot=20)
+
+
+def measure(text_generator: TextGenerator, prompts: list[str]) -> float:
+    """Return the best of three runs of seconds per generated token."""
+    best = float("inf")
+    for _ in range(3):
+        random.seed(0)
+        tokens_count = 0
+        gc.disable()
+        start = time.perf_counter()
+        for prompt in prompts:
+            tokens_count += len(text_generator.continue_phrase(prompt, settings=SETTINGS).split(" "))
+        seconds = time.perf_counter() - start
+        gc.enable()
+        best = min(best, seconds / tokens_count)
+    return best
+
+
+def main() -> None:
+    prompts_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(300_000))
+    words = [word for sentence in TextParser().parse_text(generate_corpus(prompts_count, seed=1)) for word in sentence]
+    prompts = [word for word in words if word != "."][:prompts_count]
+
+    with tempfile.TemporaryDirectory() as directory:
+        FileHandler._dumps_folder_path = directory
+        FileHandler.write_data(text_generator, "dictionary")
+        mapped_text_generator = FileHandler.read_data("dictionary")
+        for name, generator in (("NgramStore", text_generator), ("MappedNgramStore", mapped_text_generator)):
+            store = generator.ngrams_dict
+            cursor_seconds = measure(generator, prompts)
+            store.context_cursor = lambda words, max_length: TextContextCursor(store, words, max_length)
+            text_seconds = measure(generator, prompts)
+            del store.context_cursor
+            print(f"{name:<17} text lookup {text_seconds * 1e6:6.2f} us/token"
+                  f"   cursor {cursor_seconds * 1e6:6.2f} us/token   x{text_seconds / cursor_seconds:.2f}")
+        mapped_text_generator.ngrams_dict.close()
+        os.remove(os.path.join(directory, "dictionary.tgm"))
+
+
+if __name__ == "__main__":
+    main()
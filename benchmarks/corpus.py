@@ -0,0 +1,35 @@
+import random
+
+
+LATIN_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+CYRILLIC_LETTERS = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+SENTENCE_DELIMITERS = ".!?;"
+
+
+def generate_vocabulary(size: int, letters: str = LATIN_LETTERS, seed: int = 0) -> list[str]:
+    """Generate list of size distinct random words from letters."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(1, 10))))
+    return sorted(words)
+
+
+def generate_corpus(words_count: int, vocabulary_size: int = 10000, seed: int = 0,
+                    letters: str = LATIN_LETTERS) -> str:
+    """
+    Generate text of words_count words of letters with Zipf distributed frequencies.
+
+    Sentences consist of 3-20 words and are separated by random delimiters.
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(vocabulary_size, letters, seed)
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+    words = rng.choices(vocabulary, weights=weights, k=words_count)
+    sentences = []
+    start = 0
+    while start < words_count:
+        end = start + rng.randint(3, 20)
+        sentences.append(" ".join(words[start:end]) + rng.choice(SENTENCE_DELIMITERS))
+        start = end
+    return " ".join(sentences)
@@ -0,0 +1,36 @@
+"""
+Compares FrequencyAnalyzer.create_count_dict with the bulk counting of token ids on the same parsed text.
+
+Usage: python -m benchmarks.count_dict [path to text file]
+Without a path a synthetic corpus of 1,000,000 words is used.
+"""
+
+import sys
+import timeit
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.text_parser import TextParser
+
+
+def main() -> None:
+    text = FileHandler.read_file(sys.argv[1]) if len(sys.argv) > 1 else generate_corpus(1_000_000)
+    parsed_text = TextParser().parse_text(text)
+    frequency_analyzer = FrequencyAnalyzer()
+    tokens_count = sum(len(sentence) for sentence in parsed_text)
+
+    if frequency_analyzer.create_count_dict(parsed_text) != frequency_analyzer.create_count_dict_bulk(parsed_text):
+        raise AssertionError("bulk count dictionary differs from create_count_dict")
+
+    for name, method in (
+        ("create_count_dict", frequency_analyzer.create_count_dict),
+        ("create_count_dict_bulk", frequency_analyzer.create_count_dict_bulk),
+        ("count_id_ngrams", frequency_analyzer.count_id_ngrams),
+    ):
+        seconds = min(timeit.repeat(lambda: method(parsed_text), number=1, repeat=3))
+        print(f"{name:<24} {seconds:8.3f} s {tokens_count / seconds:12,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
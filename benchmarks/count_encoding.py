@@ -0,0 +1,98 @@
+"""
+Measures size, write and load time, generation speed and top-k ordering changes of count encodings of dumps.
+
+Usage: python -m benchmarks.count_encoding [words count of the dictionary]
+
+For every count encoding and compression the dictionary is written to a binary dump and measured:
+the dump size, write time, open time, time of loading the dump into an updatable NgramStore
+and per-token generation latency on the opened dump with the choice among the most frequent continuations
+and with weighted sampling. Orderings of the top 2 and top 5 continuations by decoded counts are compared
+with orderings by exact counts, they tell how much a lossy encoding would change the most frequent
+continuations if they were chosen by decoded counts. Tops of dumps are always written from exact counts.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.count_encoding import COMPRESSIONS, COUNT_ENCODINGS
+from model.generation_settings import GenerationSettings
+from model.mapped_ngram_store import MappedNgramStore, write_store
+from model.ngram_store import NgramStore
+from model.sampling import SamplingSettings
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+SETTINGS = {
+    "top": GenerationSettings(max_generated_word_count=30, generated_without_dot=20),
+    "weighted": GenerationSettings(max_generated_word_count=30, generated_without_dot=20, sampling=SamplingSettings()),
+}
+
+
+def top(count_dict: dict, k: int) -> list[str]:
+    """Return k most frequent words of count_dict in the order of generation."""
+    return sorted(count_dict, key=lambda word: (-count_dict[word], word))[:k]
+
+
+def count_errors(store: NgramStore, mapped_store: MappedNgramStore) -> tuple[float, float, float]:
+    """Return shares of contexts whose top 2 and top 5 orderings change and the maximum relative count error."""
+    changed_top2 = changed_top5 = 0
+    max_error = 0.0
+    for context in store:
+        exact = store[context]._count_dict
+        decoded = mapped_store[context]._count_dict
+        changed_top2 += top(exact, 2) != top(decoded, 2)
+        changed_top5 += top(exact, 5) != top(decoded, 5)
+        max_error = max(max_error, max(abs(decoded[word] - count) / count for word, count in exact.items()))
+    return changed_top2 / len(store), changed_top5 / len(store), max_error
+
+
+def us_per_token(text_generator: TextGenerator, prompts: list[str], settings: GenerationSettings) -> float:
+    start = time.perf_counter()
+    tokens = sum(
+        len(text_generator.continue_phrase(prompt, seed=index, settings=settings).split(" "))
+        for index, prompt in enumerate(prompts)
+    )
+    return (time.perf_counter() - start) / tokens * 1e6
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(words_count))
+    store = text_generator.ngrams_dict
+    prompts = [sentence[0] for sentence in TextParser().parse_text(generate_corpus(5000, seed=1))]
+    print(f"{len(store)} contexts, {store.edges_count} continuations, "
+          f"in memory {store.memory_size() / 2**20:.1f} MiB with counts of typecode {store._edge_count.typecode}")
+    print(f"{'encoding':<9} {'compression':<11} {'size MiB':>9} {'write s':>8} {'open ms':>8} {'load s':>7} "
+          f"{'top us':>7} {'weighted us':>11} {'top2 changed':>12} {'top5 changed':>12} {'max error':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dictionary.tgm")
+        for count_encoding in COUNT_ENCODINGS:
+            for compression in COMPRESSIONS:
+                start = time.perf_counter()
+                with open(path, "wb") as file:
+                    write_store(store, file, count_encoding=count_encoding, compression=compression)
+                write_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                mapped_store = MappedNgramStore(path)
+                open_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                mapped_store.as_ngram_store()
+                load_seconds = time.perf_counter() - start
+                mapped_generator = TextGenerator.from_store(mapped_store)
+                latencies = [us_per_token(mapped_generator, prompts, settings) for settings in SETTINGS.values()]
+                changed_top2, changed_top5, max_error = count_errors(store, mapped_store)
+                print(f"{count_encoding:<9} {compression:<11} {os.path.getsize(path) / 2**20:9.2f} "
+                      f"{write_seconds:8.2f} {open_seconds * 1000:8.1f} {load_seconds:7.2f} "
+                      f"{latencies[0]:7.1f} {latencies[1]:11.1f} {changed_top2:12.2%} {changed_top5:12.2%} "
+                      f"{max_error:9.2%}")
+                mapped_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares time of writing the whole binary dump and of appending changes to its journal after a small update.
+
+Usage: python -m benchmarks.delta_save [words count of the dictionary] [words count of the update]
+By default the dictionary is built from 1,000,000 words and updated by 10,000 words.
+"""
+
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.text_generator import TextGenerator
+
+
+def timed(function, *args) -> float:
+    """Return time of function call in seconds."""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    update_words_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(words_count))
+    update = generate_corpus(update_words_count, seed=1)
+
+    with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+        FileHandler.write_data(text_generator, "dictionary")
+        text_generator.update_dicts_by_text(update)
+        append_seconds = timed(FileHandler.append_changes, text_generator, "dictionary")
+        start = time.perf_counter()
+        replayed_text_generator = FileHandler.read_data("dictionary")
+        open_seconds = time.perf_counter() - start
+        if replayed_text_generator.ngrams_dict != text_generator.ngrams_dict:
+            raise AssertionError("replayed journal differs from the dictionary")
+        write_seconds = timed(FileHandler.write_data, text_generator, "dictionary")
+
+    print(f"dictionary of {words_count} words updated by {update_words_count} words")
+    print(f"write whole dump    {write_seconds:8.3f} s")
+    print(f"append to journal   {append_seconds:8.3f} s")
+    print(f"open with replay    {open_seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Compares throughput of generate_batch and of a loop over continue_phrase.
+
+Usage: python -m benchmarks.generate_batch [prompts count]
+The dictionary is built from a synthetic corpus of 300,000 words, prompts are its words with Zipf frequencies.
+"""
+
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+def main() -> None:
+    prompts_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(300_000))
+    words = [word for sentence in TextParser().parse_text(generate_corpus(prompts_count, seed=1)) for word in sentence]
+    prompts = [word for word in words if word != "."][:prompts_count]
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        text_generator.continue_phrase(prompt)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text_generator.generate_batch(prompts, seed=0)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{len(prompts)} prompts")
+    print(f"continue_phrase loop {len(prompts) / loop_seconds:10.0f} prompts/s")
+    print(f"generate_batch       {len(prompts) / batch_seconds:10.0f} prompts/s")
+
+
+if __name__ == "__main__":
+    main()
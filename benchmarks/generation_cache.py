@@ -0,0 +1,49 @@
+"""
+Compares throughput of Model.generate with seed with and without the generation cache.
+
+Usage: python -m benchmarks.generation_cache [requests count]
+The dictionary is built from a synthetic corpus of 300,000 words. Prompts end with words of the corpus,
+so their context tails repeat with Zipf frequencies, every request uses one of 4 seeds.
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.generation_settings import GenerationSettings
+from model.model import Model
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+def main() -> None:
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(300_000))
+    words = [word for sentence in TextParser().parse_text(generate_corpus(requests_count, seed=1))
+             for word in sentence if word != "."]
+    rng = random.Random(0)
+    requests = [(f"{rng.choice(words)}. {word}", rng.randrange(4)) for word in words[:requests_count]]
+
+    for name, cache_size in (("without cache", 0), ("with cache", 10_000)):
+        Model.set_generation_cache_size(cache_size)
+        registry = Model.create_registry()
+        registry.put("dictionary", text_generator)
+        model = Model(
+            "dictionary", registry, settings=GenerationSettings(max_generated_word_count=30, generated_without_dot=20)
+        )
+        generation_cache = model.generation_cache
+        start = time.perf_counter()
+        for prompt, seed in requests:
+            model.generate(prompt, seed)
+        seconds = time.perf_counter() - start
+        print(f"{name:<14} {len(requests) / seconds:10.0f} requests/s")
+        if generation_cache:
+            stats = generation_cache.stats()
+            print(f"hit rate {stats['hit_rate']:.2f}, {stats['entries']} entries, "
+                  f"{stats['memory_size'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
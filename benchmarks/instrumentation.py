@@ -0,0 +1,50 @@
+"""
+Measures the overhead of instrumentation on generation: per-token latency of continue_phrase
+before instrumentation has ever been enabled, while it is enabled and after it has been disabled.
+Disabled instrumentation must cost nothing, since the original functions are put back.
+
+Usage: python -m benchmarks.instrumentation [words count of the dictionary] [repeats]
+"""
+
+import sys
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import best_time
+from model.generation_settings import GenerationSettings
+from model.instrumentation import Instrumentation
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(words_count))
+    prompts = [sentence[0] for sentence in TextParser().parse_text(generate_corpus(2000, seed=1))] * 20
+    settings = GenerationSettings(max_generated_word_count=30, generated_without_dot=20)
+
+    def generate():
+        return sum(
+            len(text_generator.continue_phrase(prompt, seed=index, settings=settings).split(" "))
+            for index, prompt in enumerate(prompts)
+        )
+    tokens_count = generate()
+    original = TextGenerator.__dict__["continue_phrase"]
+
+    never_enabled = best_time(generate, repeats)
+    Instrumentation.enable()
+    enabled = best_time(generate, repeats)
+    calls = Instrumentation.snapshot()["ContextCursor.advance"]["calls"]
+    Instrumentation.disable()
+    disabled = best_time(generate, repeats)
+
+    for name, seconds in (("never enabled", never_enabled), ("enabled", enabled), ("disabled", disabled)):
+        print(f"{name:<14} {seconds / tokens_count * 1e6:6.2f} us/token, "
+              f"{(seconds - never_enabled) / never_enabled:+6.1%} to never enabled")
+    print(f"timed calls of ContextCursor.advance while enabled: {calls}")
+    print(f"original functions are restored: {TextGenerator.__dict__['continue_phrase'] is original}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares size, save time, open time and first generation latency of pickled and binary dumps.
+Pickled dumps are measured both for the dictionary of Ngram objects used by old dumps and for NgramStore.
+
+Usage: python -m benchmarks.model_load [words count]
+The dictionary is built from a synthetic corpus of 1,000,000 words by default.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.mapped_ngram_store import MappedNgramStore, write_store
+from model.text_generator import TextGenerator
+
+
+def save_pickle(text_generator: TextGenerator, path: str) -> None:
+    with open(path, "wb") as file:
+        pickle.dump(text_generator, file)
+
+
+def open_pickle(path: str) -> TextGenerator:
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def save_binary(text_generator: TextGenerator, path: str) -> None:
+    with open(path, "wb") as file:
+        write_store(text_generator.ngrams_dict, file)
+
+
+def open_binary(path: str) -> TextGenerator:
+    return TextGenerator.from_store(MappedNgramStore(path))
+
+
+def timed(function, *args):
+    """Return result of function and time of its call in seconds."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(words_count))
+    phrase = next(iter(text_generator.ngrams_dict)).split(" ")[0]
+    legacy_text_generator = TextGenerator({context: ngram for context, ngram in text_generator.ngrams_dict.items()})
+    variants = (
+        ("ngrams", legacy_text_generator, save_pickle, open_pickle),
+        ("pickle", text_generator, save_pickle, open_pickle),
+        ("binary", text_generator, save_binary, open_binary),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, saved, save, open_dump in variants:
+            path = os.path.join(directory, name)
+            _, save_seconds = timed(save, saved, path)
+            opened, open_seconds = timed(open_dump, path)
+            _, generate_seconds = timed(opened.continue_phrase, phrase)
+            print(
+                f"{name:<8} size {os.path.getsize(path) / 2**20:7.1f} MiB save {save_seconds:7.2f} s "
+                f"open {open_seconds * 1000:9.2f} ms first generate {generate_seconds * 1000:7.2f} ms"
+            )
+            if opened.ngrams_dict != text_generator.ngrams_dict:
+                raise AssertionError(f"{name} dump differs from the dictionary")
+            if name == "binary":
+                opened.ngrams_dict.close()
+
+
+if __name__ == "__main__":
+    main()
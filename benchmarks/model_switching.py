@@ -0,0 +1,53 @@
+"""
+Compares time of alternating between two dictionaries with the registry keeping both resident
+and with the registry keeping only the last one, so every switch loads the dictionary.
+
+Usage: python -m benchmarks.model_switching [words count of every dictionary] [switches count]
+"""
+
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.model import Model
+from model.text_generator import TextGenerator
+
+
+def switch(model: Model, switches_count: int) -> float:
+    """Return time of alternating between dictionaries with a generation after every switch."""
+    start = time.perf_counter()
+    for index in range(switches_count):
+        model.open_model(("first", "second")[index % 2])
+        model.generate("a")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    switches_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+        for seed, name in enumerate(("first", "second")):
+            text_generator = TextGenerator()
+            text_generator.update_dicts_by_text(generate_corpus(words_count, seed=seed))
+            FileHandler.write_data(text_generator, name)
+            FileHandler.append_changes(text_generator, name)
+            text_generator.update_dicts_by_text(generate_corpus(words_count // 10, seed=seed + 2))
+            FileHandler.append_changes(text_generator, name)
+
+        for budget_mb in (0, 512):
+            with patch.object(Model, "_memory_budget_mb", budget_mb):
+                model = Model()
+            seconds = switch(model, switches_count)
+            stats = model.registry.stats()
+            print(
+                f"budget {budget_mb:4} MiB: {seconds / switches_count * 1000:8.2f} ms per switch, "
+                f"hits {stats['hits']}, misses {stats['misses']}, evictions {stats['evictions']}, "
+                f"load {stats['load_seconds']:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
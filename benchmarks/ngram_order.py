@@ -0,0 +1,47 @@
+"""
+Compares build time, memory and generation latency of dictionaries of different ngram orders.
+
+Usage: python -m benchmarks.ngram_order [path to text file]
+Without a path a synthetic corpus of 300,000 words is used. Every order is built from the same text.
+"""
+
+import gc
+import random
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+def main() -> None:
+    text = FileHandler.read_file(sys.argv[1]) if len(sys.argv) > 1 else generate_corpus(300_000)
+    words = [word for sentence in TextParser().parse_text(text) for word in sentence if word != "."]
+    prompts = [" ".join(random.Random(0).sample(words, 3)) for _ in range(2000)]
+    print(f"{'order':>5} {'build, s':>9} {'MiB':>8} {'contexts':>9} {'edges':>9} {'continue, us':>13}")
+    for order in (2, 3, 4, 5):
+        gc.collect()
+        gc.disable()
+        text_generator = TextGenerator(order=order)
+        start = time.perf_counter()
+        text_generator.update_dicts_by_text(text)
+        build_seconds = time.perf_counter() - start
+
+        random.seed(0)
+        start = time.perf_counter()
+        for prompt in prompts:
+            text_generator.continue_phrase(prompt)
+        continue_seconds = time.perf_counter() - start
+        gc.enable()
+
+        store = text_generator.ngrams_dict
+        print(
+            f"{order:>5} {build_seconds:>9.2f} {store.memory_size() / 2**20:>8.1f} {len(store):>9} "
+            f"{store.edges_count:>9} {continue_seconds / len(prompts) * 1e6:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compares memory used by the dictionary of Ngram objects and by NgramStore on the same corpus.
+
+Usage: python -m benchmarks.ngram_store_memory [path to text file]
+Without a path a synthetic corpus of 1,000,000 words is used.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.ngram_store import NgramDict, NgramStore
+from model.text_parser import TextParser
+
+
+def measure(ngrams_factory, text: str) -> tuple[int, int]:
+    """
+    Return number of bytes retained by ngrams built from text and number of contexts.
+    Parsed text and count dictionary are released before the measurement.
+    """
+    tracemalloc.start()
+    parsed_text = TextParser().parse_text(text)
+    count_dict = FrequencyAnalyzer().create_count_dict(parsed_text)
+    ngrams = ngrams_factory()
+    ngrams.update_by_count_dict(count_dict)
+    del parsed_text, count_dict
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(ngrams)
+
+
+def main() -> None:
+    text = FileHandler.read_file(sys.argv[1]) if len(sys.argv) > 1 else generate_corpus(1_000_000)
+    for name, factory in (("NgramDict", NgramDict), ("NgramStore", NgramStore)):
+        size, contexts = measure(factory, text)
+        print(f"{name:<12} {size / 2**20:10.2f} MiB {size / contexts:8.1f} bytes per context")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Compares ingestion time of a corpus with different numbers of ingest worker processes.
+
+Usage: python -m benchmarks.parallel_ingest [path to text file]
+Without a path a synthetic corpus of 1,000,000 words is used.
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.text_generator import TextGenerator
+
+
+def main() -> None:
+    text = FileHandler.read_file(sys.argv[1]) if len(sys.argv) > 1 else generate_corpus(1_000_000)
+    chunk_size = FileHandler._chunk_size
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    workers_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    serial_ngrams = None
+    for workers in workers_counts:
+        TextGenerator.set_ingest_workers(workers)
+        text_generator = TextGenerator()
+        start = time.perf_counter()
+        text_generator.update_dicts_by_chunks(chunks)
+        seconds = time.perf_counter() - start
+        print(f"{workers:>3} workers {seconds:8.2f} s")
+        if serial_ngrams is None:
+            serial_ngrams = text_generator.ngrams_dict
+        elif text_generator.ngrams_dict != serial_ngrams:
+            raise AssertionError(f"ingestion with {workers} workers built another model")
+
+
+if __name__ == "__main__":
+    main()
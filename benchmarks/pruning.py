@@ -0,0 +1,71 @@
+"""
+Measures memory saved by pruning policies and their effect on generation output.
+
+Usage: python -m benchmarks.pruning [words count of the dictionary]
+
+For every policy the dictionary is pruned and generations of the same prompts and seeds are compared
+with generations of the unpruned dictionary: the share of identical texts and the mean length of texts,
+both with the choice among the most frequent continuations and with weighted sampling.
+"""
+
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.generation_settings import GenerationSettings
+from model.pruning import PruningPolicy
+from model.sampling import SamplingSettings
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+SETTINGS = {
+    "top": GenerationSettings(max_generated_word_count=30, generated_without_dot=20),
+    "weighted": GenerationSettings(max_generated_word_count=30, generated_without_dot=20, sampling=SamplingSettings()),
+}
+
+
+def generate(text_generator: TextGenerator, prompts: list[str], settings: GenerationSettings) -> list[str]:
+    return [
+        text_generator.continue_phrase(prompt, seed=index, settings=settings) for index, prompt in enumerate(prompts)
+    ]
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(words_count))
+    memory = text_generator.memory_size()
+    policies = (
+        PruningPolicy(min_count=2),
+        PruningPolicy(min_count=3),
+        PruningPolicy(max_continuations=2),
+        PruningPolicy(max_continuations=8),
+        PruningPolicy(max_memory_mb=round(memory / 2**20 / 2)),
+        PruningPolicy(max_memory_mb=round(memory / 2**20 / 4)),
+    )
+    prompts = [sentence[0] for sentence in TextParser().parse_text(generate_corpus(10000, seed=1))]
+    expected = {name: generate(text_generator, prompts, settings) for name, settings in SETTINGS.items()}
+    print(f"unpruned: {len(text_generator.ngrams_dict)} contexts, {memory / 2**20:.1f} MiB")
+
+    for policy in policies:
+        pruned = text_generator.copy()
+        start = time.perf_counter()
+        report = pruned.prune(policy)
+        seconds = time.perf_counter() - start
+        print(f"min_count={policy.min_count} max_continuations={policy.max_continuations} "
+              f"max_memory_mb={policy.max_memory_mb}: pruned in {seconds:.2f} s")
+        print(f"    {report.contexts_after} contexts, {report.memory_after / 2**20:.1f} MiB, "
+              f"saved {report.memory_saved / 2**20:.1f} MiB ({report.memory_saved / report.memory_before:.0%}), "
+              f"kept {report.count_kept_share:.0%} of counts")
+        for name, settings in SETTINGS.items():
+            texts = generate(pruned, prompts, settings)
+            identical = sum(text == expected_text for text, expected_text in zip(texts, expected[name]))
+            mean_words = sum(text.count(" ") + 1 for text in texts) / len(texts)
+            expected_mean_words = sum(text.count(" ") + 1 for text in expected[name]) / len(texts)
+            print(f"    {name:<8} identical texts {identical / len(texts):6.1%}, "
+                  f"mean words {mean_words:5.2f} (unpruned {expected_mean_words:5.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares per-token latency of continue_phrase choosing among the top continuations and drawing by weights.
+
+Usage: python -m benchmarks.sampling [prompts count]
+The dictionary is built from a synthetic corpus of 300,000 words. Weighted drawing is measured with
+sampling tables cached per context and with tables rebuilt on every draw, as a scan of all continuations would do.
+The best of three runs is reported.
+"""
+
+import gc
+import random
+import sys
+import time
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.generation_settings import GenerationSettings
+from model.sampling import SamplingSettings, SamplingTableCache
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+class NoCache(SamplingTableCache):
+    """Cache which keeps nothing, so every draw builds its table."""
+
+    def get(self, context, settings):
+        return None
+
+
+def measure(text_generator: TextGenerator, prompts: list[str], settings: GenerationSettings) -> tuple[float, int]:
+    """Return the best of three runs of seconds per generated token and number of distinct generated phrases."""
+    best = float("inf")
+    for _ in range(3):
+        random.seed(0)
+        tokens_count = 0
+        phrases = set()
+        gc.disable()
+        start = time.perf_counter()
+        for prompt in prompts:
+            phrase = text_generator.continue_phrase(prompt, settings=settings)
+            tokens_count += len(phrase.split(" "))
+            phrases.add(phrase)
+        seconds = time.perf_counter() - start
+        gc.enable()
+        best = min(best, seconds / tokens_count)
+    return best, len(phrases)
+
+
+def main() -> None:
+    prompts_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(generate_corpus(300_000))
+    words = [word for sentence in TextParser().parse_text(generate_corpus(prompts_count, seed=1)) for word in sentence]
+    prompts = [word for word in words if word != "."][:prompts_count]
+
+    store = text_generator.ngrams_dict
+    modes = (
+        ("top-2", None, store._sampling_tables),
+        ("weighted, rebuilt", SamplingSettings(), NoCache()),
+        ("weighted, cached", SamplingSettings(), SamplingTableCache()),
+        ("weighted, T=0.7 top_p=0.9", SamplingSettings(temperature=0.7, top_p=0.9), SamplingTableCache()),
+    )
+    for name, sampling, cache in modes:
+        settings = GenerationSettings(max_generated_word_count=30, generated_without_dot=20, sampling=sampling)
+        with patch.object(store, "_sampling_tables", cache):
+            seconds, distinct = measure(text_generator, prompts, settings)
+        print(f"{name:<27} {seconds * 1e6:7.2f} us/token {distinct:6} distinct phrases of {len(prompts)}")
+
+
+if __name__ == "__main__":
+    main()
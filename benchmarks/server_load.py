@@ -0,0 +1,90 @@
+"""
+Load test of the generation server on localhost: measures p50/p99 latency and requests per second.
+
+Usage: python -m benchmarks.server_load [--port PORT] [--dictionary NAME] [--requests N] [--concurrency N]
+                                        [--ingest-words N]
+The server must be started by serve.py. With --ingest-words the dictionary is first updated
+by a synthetic corpus of that many words, so the test can be run against an empty dumps folder.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import generate_vocabulary, generate_corpus
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                  method: str, path: str, body: dict = None) -> tuple[int, dict]:
+    """Send request over keep-alive connection and return status and answer."""
+    data = json.dumps(body).encode("UTF-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split(b" ")[1])
+    length = 0
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host: str, port: int, dictionary: str, prompts: list[str], latencies: list[float],
+                 errors: list[int]) -> None:
+    """Send generate requests one by one over one connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for prompt in prompts:
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, "POST", "/generate", {"dictionary": dictionary, "prompt": prompt})
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+    writer.close()
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    if arguments.ingest_words:
+        file_descriptor, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(file_descriptor, "w", encoding="UTF-8") as file:
+            file.write(generate_corpus(arguments.ingest_words))
+        reader, writer = await asyncio.open_connection(arguments.host, arguments.port)
+        start = time.perf_counter()
+        status, answer = await request(
+            reader, writer, "POST", "/ingest", {"dictionary": arguments.dictionary, "path": path}
+        )
+        print(f"ingest {arguments.ingest_words} words: {status} {answer} in {time.perf_counter() - start:.2f} s")
+        writer.close()
+        os.remove(path)
+
+    vocabulary = generate_vocabulary(10000)     # words of generate_corpus in the order of their frequency
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    prompts = random.Random(1).choices(vocabulary, weights=weights, k=arguments.requests)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(arguments.host, arguments.port, arguments.dictionary, prompts[index::arguments.concurrency],
+               latencies, errors)
+        for index in range(arguments.concurrency)
+    ))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print(f"{len(latencies)} requests, {arguments.concurrency} connections, {len(errors)} errors")
+    print(f"{len(latencies) / seconds:.0f} requests/s")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p99 {latencies[len(latencies) * 99 // 100] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--dictionary", default="benchmark")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--ingest-words", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+Compares exact ingestion with ingestion keeping only ngrams frequent by Count-Min Sketch.
+
+Usage: python -m benchmarks.sketch_ingest [words count] [min count]
+
+For every sketch size and mode the time, the memory of the store and of the sketch, the error bound
+and the accuracy against exact counts are printed: false positives are kept continuations whose true count
+is less than min count, missed are continuations with at least min count which are not kept,
+overcounted are kept continuations whose count differs from the true count.
+"""
+
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.count_min_sketch import SketchSettings
+from model.pruning import PruningPolicy
+from model.text_generator import TextGenerator
+
+
+def continuation_counts(store) -> dict:
+    """Return count of every (context, continuation) pair of store."""
+    return {
+        (context, word): count for context in store for word, count in store[context]._count_dict.items()
+    }
+
+
+def main() -> None:
+    words_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    min_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    text = generate_corpus(words_count)
+
+    exact = TextGenerator()
+    start = time.perf_counter()
+    exact.update_dicts_by_text(text)
+    seconds = time.perf_counter() - start
+    print(f"exact:          {seconds:5.2f} s, store {exact.memory_size() / 2**20:6.1f} MiB, "
+          f"{exact.ngrams_dict.edges_count} continuations")
+    exact_counts = continuation_counts(exact.ngrams_dict)
+    expected = continuation_counts(exact.ngrams_dict.pruned(PruningPolicy(min_count=min_count)))
+    print(f"{len(expected)} continuations have at least {min_count} occurrences")
+
+    for width in (2**16, 2**18, 2**20):
+        for two_pass in (True, False):
+            settings = SketchSettings(width, 4, min_count, two_pass)
+            text_generator = TextGenerator()
+            start = time.perf_counter()
+            report = text_generator.update_dicts_by_sketch([[text]], settings, first_pass_chunk_streams=[[text]])
+            seconds = time.perf_counter() - start
+            counts = continuation_counts(text_generator.ngrams_dict)
+            false_positives = sum(pair not in expected for pair in counts)
+            missed = sum(pair not in counts for pair in expected)
+            overcounted = sum(count != exact_counts[pair] for pair, count in counts.items())
+            print(f"width 2**{width.bit_length() - 1} {'two pass ' if two_pass else 'streaming'}: {seconds:5.2f} s, "
+                  f"store {text_generator.memory_size() / 2**20:6.1f} MiB, "
+                  f"sketch {report.sketch_memory / 2**20:5.1f} MiB, error bound {report.error_bound:6.2f} "
+                  f"with probability {report.confidence:.3f}, kept {len(counts)} continuations, "
+                  f"false positives {false_positives}, missed {missed}, overcounted {overcounted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares peak memory and time of ingestion of a whole file and of streaming ingestion by chunks.
+
+Usage: python -m benchmarks.streaming_ingest [path to text file]
+Without a path a synthetic corpus of 1,000,000 words is written to a temporary file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.text_generator import TextGenerator
+
+
+def whole_file(path: str) -> TextGenerator:
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(FileHandler.read_file(path))
+    return text_generator
+
+
+def streaming(path: str) -> TextGenerator:
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_chunks(FileHandler.read_file_chunks(path))
+    return text_generator
+
+
+def measure(ingest, path: str) -> tuple[TextGenerator, float, int]:
+    """Return text generator built by ingest, time in seconds and peak of allocated bytes."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    text_generator = ingest(path)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return text_generator, seconds, peak
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        file_descriptor, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(file_descriptor, "w", encoding="UTF-8") as file:
+            file.write(generate_corpus(1_000_000))
+    print(f"file size {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    try:
+        results = {}
+        for ingest in (whole_file, streaming):
+            text_generator, seconds, peak = measure(ingest, path)
+            results[ingest.__name__] = text_generator.ngrams_dict
+            print(f"{ingest.__name__:<12} {seconds:8.2f} s peak {peak / 2**20:8.1f} MiB")
+        if results["whole_file"] != results["streaming"]:
+            raise AssertionError("streaming ingestion built another model")
+    finally:
+        if len(sys.argv) == 1:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
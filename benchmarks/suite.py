@@ -0,0 +1,183 @@
+"""
+Runs the benchmark suite of ingestion and generation on synthetic corpora and compares results with a baseline.
+
+Usage:
+    python -m benchmarks.suite run [--output results.json] [--words 300000] [--vocabulary 10000] [--repeats 3]
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.1]
+
+Every corpus has Zipf distributed words of latin or cyrillic letters. For every corpus the suite measures
+tokenize and count-build throughput, save and load time of the binary dump, per-token generation latency
+and peak RSS. Every corpus is measured in its own process, so peak RSS belongs to that corpus only.
+Timings are the best of repeats. compare prints the change of every metric and exits with code 1
+if a metric got worse than the baseline by more than threshold.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.corpus import CYRILLIC_LETTERS, LATIN_LETTERS, generate_corpus
+from model.file_handler import FileHandler
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.generation_settings import GenerationSettings
+from model.ngram_store import NgramStore
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+try:
+    import resource
+except ImportError:     # not available on Windows
+    resource = None
+
+
+CORPORA = {"latin": LATIN_LETTERS, "cyrillic": CYRILLIC_LETTERS}   # corpus name -> letters of its words
+METRICS = {
+    "tokenize_words_per_second": "higher",
+    "count_build_words_per_second": "higher",
+    "save_ms": "lower",
+    "load_ms": "lower",
+    "generation_us_per_token": "lower",
+    "peak_rss_mib": "lower",
+}   # metric -> direction of improvement
+_GENERATION_SETTINGS = GenerationSettings(max_generated_word_count=30, generated_without_dot=20)
+
+
+def best_time(function, repeats: int) -> float:
+    """Return the best of repeats times of calling function in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_rss_mib() -> float:
+    """Return peak resident set size of the current process in MiB or None if it is unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10   # bytes on macOS, KiB elsewhere
+
+
+def run_corpus(letters: str, words_count: int, vocabulary_size: int, repeats: int) -> dict:
+    """Return metrics of one corpus of words_count words of letters."""
+    text = generate_corpus(words_count, vocabulary_size, letters=letters)
+    text_parser = TextParser()
+    parsed_text = text_parser.parse_text(text)
+    words = sum(map(len, parsed_text)) - len(parsed_text)    # sentence ends are not words
+    tokenize_seconds = best_time(lambda: text_parser.parse_text(text), repeats)
+
+    def count_build():
+        NgramStore().update_by_id_counts(*FrequencyAnalyzer().count_id_ngrams(parsed_text))
+    count_build_seconds = best_time(count_build, repeats)
+
+    text_generator = TextGenerator()
+    text_generator.update_dicts_by_text(text)
+    prompts_text = generate_corpus(2000, vocabulary_size, seed=1, letters=letters)
+    prompts = [sentence[0] for sentence in text_parser.parse_text(prompts_text)]
+    with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+        save_seconds = best_time(lambda: FileHandler.write_data(text_generator, "dictionary"), repeats)
+        load_seconds = best_time(lambda: FileHandler.read_data("dictionary").ngrams_dict.close(), repeats)
+
+    def generate():
+        return sum(
+            len(text_generator.continue_phrase(prompt, seed=index, settings=_GENERATION_SETTINGS).split(" "))
+            for index, prompt in enumerate(prompts)
+        )
+    tokens_count = generate()
+    generation_seconds = best_time(generate, repeats)
+
+    return {
+        "tokenize_words_per_second": words / tokenize_seconds,
+        "count_build_words_per_second": words / count_build_seconds,
+        "save_ms": save_seconds * 1000,
+        "load_ms": load_seconds * 1000,
+        "generation_us_per_token": generation_seconds / tokens_count * 1e6,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def run(words_count: int, vocabulary_size: int, repeats: int) -> dict:
+    """Return results of all corpora with metadata of the run."""
+    results = {}
+    for name, letters in CORPORA.items():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[name] = executor.submit(run_corpus, letters, words_count, vocabulary_size, repeats).result()
+    return {
+        "metadata": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "words": words_count,
+            "vocabulary": vocabulary_size,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[tuple[str, str, float, float, float, bool]]:
+    """
+    Return rows (corpus, metric, baseline value, current value, relative change, regression) for metrics
+    present in both results. The change is positive when the metric got worse,
+    it is a regression when it exceeds threshold.
+    """
+    rows = []
+    for corpus, baseline_metrics in baseline["results"].items():
+        current_metrics = current["results"].get(corpus, {})
+        for metric, direction in METRICS.items():
+            old, new = baseline_metrics.get(metric), current_metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old if direction == "lower" else (old - new) / old
+            rows.append((corpus, metric, old, new, change, change > threshold))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark suite of ingestion and generation.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run benchmarks and write results to JSON")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--words", type=int, default=300_000, help="words count of every corpus")
+    run_parser.add_argument("--vocabulary", type=int, default=10_000, help="vocabulary size of every corpus")
+    run_parser.add_argument("--repeats", type=int, default=3)
+    compare_parser = commands.add_parser("compare", help="compare results with baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative worsening")
+    arguments = parser.parse_args()
+
+    if arguments.command == "run":
+        results = run(arguments.words, arguments.vocabulary, arguments.repeats)
+        with open(arguments.output, "w", encoding="UTF-8") as file:
+            json.dump(results, file, indent=2)
+        for corpus, metrics in results["results"].items():
+            for metric, value in metrics.items():
+                print(f"{corpus:<9} {metric:<29} {value if value is None else f'{value:14.3f}'}")
+        print(f"results are written to {os.path.abspath(arguments.output)}")
+        return
+
+    with open(arguments.baseline, encoding="UTF-8") as file:
+        baseline = json.load(file)
+    with open(arguments.results, encoding="UTF-8") as file:
+        current = json.load(file)
+    rows = compare(baseline, current, arguments.threshold)
+    print(f"{'corpus':<9} {'metric':<29} {'baseline':>14} {'results':>14} {'worse by':>9}")
+    for corpus, metric, old, new, change, regression in rows:
+        print(f"{corpus:<9} {metric:<29} {old:14.3f} {new:14.3f} {change:+9.1%}{'  REGRESSION' if regression else ''}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regressions of {len(rows)} metrics, threshold {arguments.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
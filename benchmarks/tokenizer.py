@@ -0,0 +1,77 @@
+"""
+Compares tokens per second of tokenizers and of the original per-sentence parsing.
+
+Usage: python -m benchmarks.tokenizer [path to text file]
+Without a path a synthetic corpus of 1,000,000 words and a text of short Russian sentences
+with punctuation and capital letters are used.
+"""
+
+import gc
+import random
+import re
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.text_parser import TOKENIZERS, TextParser, get_text_parser
+
+
+class OriginalTextParser:
+    """TextParser before the fast path: re.split, strip and lower per sentence, re.findall per sentence."""
+
+    def _parse_sentences(self, text: str) -> list[str]:
+        sentences = re.split(TextParser.DELIMITERS, text)
+        return [sentence.strip().lower() for sentence in sentences if sentence.strip()]
+
+    def _parse_words(self, sentence: str) -> list[str]:
+        return re.findall(TextParser.WORD, sentence)
+
+    def parse_text(self, text: str) -> list[list[str]]:
+        result = []
+        for sentence in self._parse_sentences(text):
+            parse_sentence = self._parse_words(sentence)
+            parse_sentence.append(".")
+            result.append(parse_sentence)
+        return result
+
+
+def short_sentences_text(words_count: int) -> str:
+    words = ["Мама", "мыла", "раму,", "и", "кошку:", "«Привет»", "123", "—", "don't", "Ёлка", "(скобка)", "...", "?!"]
+    rng = random.Random(0)
+    return " ".join(rng.choice(words) for _ in range(words_count))
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        texts = {sys.argv[1]: FileHandler.read_file(sys.argv[1])}
+    else:
+        texts = {"synthetic corpus": generate_corpus(1_000_000), "short sentences": short_sentences_text(1_000_000)}
+    text_parser = TextParser()
+    parsers = {
+        "original parse_text": OriginalTextParser().parse_text,
+        "parse_text": text_parser.parse_text,
+        "iter_sentences": lambda text: list(text_parser.iter_sentences(text)),
+    }
+    parsers.update({f"{tokenizer} tokenizer": get_text_parser(tokenizer).parse_text for tokenizer in TOKENIZERS})
+    for name, text in texts.items():
+        results = {}
+        for parser_name, parse in parsers.items():
+            seconds = float("inf")
+            for _ in range(3):  # the best of 3 runs, as timeit recommends
+                results[parser_name] = None
+                gc.collect()
+                gc.disable()    # as timeit does, so results of the previous parser do not slow down the next one
+                start = time.perf_counter()
+                results[parser_name] = parse(text)
+                seconds = min(seconds, time.perf_counter() - start)
+                gc.enable()
+            tokens_count = sum(map(len, results[parser_name]))
+            print(f"{name:<18} {parser_name:<20} {tokens_count / seconds:12.0f} tokens/s")
+        if any(results[parser_name] != results["original parse_text"]
+               for parser_name in ("parse_text", "iter_sentences", "default tokenizer")):
+            raise AssertionError("parse_text differs from the original parsing")
+
+
+if __name__ == "__main__":
+    main()
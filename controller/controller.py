@@ -1,11 +1,19 @@
+import os
+import queue
 from tkinter import filedialog
 import re
+import threading
 
 from view.main_window import MainWindow
 from model.model import Model
 from model.texts_methods import add_line_feed
+from model.count_encoding import COMPRESSIONS, COUNT_ENCODINGS
 from model.file_handler import FileHandler
+from model.generation_settings import parse_generation_settings
+from model.ingest_progress import IngestCancelled, IngestMonitor, IngestProgress
+from model.sampling import parse_sampling_settings
 from model.text_generator import TextGenerator
+from model.text_parser import TOKENIZERS
 
 
 class Controller:
@@ -15,16 +23,37 @@ class Controller:
         "output_width": 60,
         "max_generated_word_count": 30,
         "generated_without_dot": 10,
+        "ingest_workers": 1,
+        "memory_budget_mb": 512,
+        "generation_cache_size": 10000,
+        "generation_cache_ttl": 0,
+        "tokenizer": "default",
+        "order": 3,
+        "continuations_count": 2,
+        "sampling": "top",
+        "temperature": 1.0,
+        "top_k": 0,
+        "top_p": 1.0,
+        "count_encoding": "raw",
+        "dump_compression": "none",
         "image_name": "gaindolf.png"
     }   # contains the default settings
+    _ingest_poll_interval_ms = 100  # interval of polling progress of the running update of dictionary
 
     def __init__(self):
         self._config = self._read_config()
-
-        TextGenerator.set_generated_without_dot(self._config["generated_without_dot"])
-        TextGenerator.set_max_generated_word_count(self._config["max_generated_word_count"])
-
-        self._model = Model(self._config["current_dictionary"])
+        self._ingest_monitor = None     # monitor of the running update of dictionary or None
+        self._ingest_thread = None
+        self._ingest_queue = queue.Queue()  # progress of the running update and then its final message
+
+        TextGenerator.set_ingest_workers(self._config["ingest_workers"])
+        Model.set_memory_budget_mb(self._config["memory_budget_mb"])
+        Model.set_generation_cache_size(self._config["generation_cache_size"])
+        Model.set_generation_cache_ttl(self._config["generation_cache_ttl"])
+        FileHandler.set_count_encoding(self._config["count_encoding"])
+        FileHandler.set_dump_compression(self._config["dump_compression"])
+
+        self._model = Model(self._config["current_dictionary"], settings=parse_generation_settings(self._config))
         self._view = MainWindow(output_width=self._config["output_width"], image_name=self._config["image_name"])
         self._set_controllers()
 
@@ -33,6 +62,7 @@ class Controller:
     def _set_controllers(self) -> None:
         """Binds controller functions to handlers from the main window."""
         self._view.set_read_file_command(command=self._select_file)
+        self._view.set_cancel_update_command(self._cancel_update)
 
         self._view.set_generate_command(self._generate)
         self._view.set_change_dictionary_command(self._dictionaries_combobox_selected)
@@ -57,11 +87,31 @@ class Controller:
         for key in set(Controller._default_config).difference(set(config)):
             config[key] = Controller._default_config[key]
 
-        for option in ("output_width", "max_generated_word_count", "generated_without_dot"):
-            if not all([symbol.isdigit() for symbol in config[option]]):
+        for option in ("output_width", "max_generated_word_count", "generated_without_dot", "ingest_workers",
+                       "memory_budget_mb", "order", "continuations_count", "generation_cache_size",
+                       "generation_cache_ttl"):
+            if not all([symbol.isdigit() for symbol in str(config[option])]):
                 config[option] = self._default_config[option]
             config[option] = int(config[option])
 
+        if config["order"] < 2:
+            config["order"] = self._default_config["order"]
+        if config["continuations_count"] < 1:
+            config["continuations_count"] = self._default_config["continuations_count"]
+
+        try:
+            parse_sampling_settings(config)
+        except ValueError:
+            for option in ("sampling", "temperature", "top_k", "top_p"):
+                config[option] = self._default_config[option]
+
+        if config["tokenizer"] not in TOKENIZERS:
+            config["tokenizer"] = self._default_config["tokenizer"]
+
+        for option, values in (("count_encoding", COUNT_ENCODINGS), ("dump_compression", COMPRESSIONS)):
+            if config[option] not in values:
+                config[option] = self._default_config[option]
+
         if config["current_dictionary"] not in FileHandler.get_files():
             config["current_dictionary"] = self._default_config["current_dictionary"]
 
@@ -73,21 +123,67 @@ class Controller:
         self._view.update_output(add_line_feed(text))
 
     def _select_file(self) -> None:
-        """Handler for clicking on the file selection button."""
-        if self._model.dictionary_name:
+        """
+        Handler for clicking on the file selection button.
+        The dictionary is updated in a worker thread, meanwhile generation uses its last published version.
+        """
+        if self._ingest_monitor:
+            self._print_output_message("Словарь уже обновляется")
+        elif self._model.dictionary_name:
             file_path = filedialog.askopenfilename()
             if file_path:
-                try:
-                    self._print_output_message("Идет обновление словаря...")
-                    self._view.update()
-                    self._model.read_and_update(file_path)
-                except (UnicodeDecodeError):
-                    self._print_output_message("Неверный тип файла")
-                else:
-                    self._print_output_message("Словарь обновлен")
+                self._print_output_message("Идет обновление словаря...")
+                self._ingest_monitor = IngestMonitor(os.path.getsize(file_path), self._ingest_queue.put)
+                self._ingest_thread = threading.Thread(
+                    target=self._ingest, args=(file_path, self._ingest_monitor), daemon=True
+                )
+                self._ingest_thread.start()
+                self._view.set_update_running(True)
+                self._view.after(Controller._ingest_poll_interval_ms, self._poll_ingest_queue)
         else:
             self._print_output_message("Словарь не открыт")
 
+    def _ingest(self, file_path: str, monitor: IngestMonitor) -> None:
+        """Update dictionary by file in the worker thread and post the final message to the queue."""
+        try:
+            self._model.read_and_update(file_path, monitor)
+        except IngestCancelled:
+            self._ingest_queue.put("Обновление словаря отменено")
+        except UnicodeDecodeError:
+            self._ingest_queue.put("Неверный тип файла")
+        except Exception as error:
+            self._ingest_queue.put(f"Ошибка обновления словаря: {error}")
+        else:
+            self._ingest_queue.put("Словарь обновлен")
+
+    def _poll_ingest_queue(self) -> None:
+        """Show progress posted by the worker thread, the final message ends polling."""
+        progress = None
+        while True:
+            try:
+                item = self._ingest_queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, IngestProgress):
+                self._ingest_monitor = None
+                self._ingest_thread = None
+                self._view.set_update_running(False)
+                self._print_output_message(item)
+                return
+            progress = item
+        if progress:
+            self._view.set_update_progress(
+                progress.bytes_read / progress.total_bytes if progress.total_bytes else 0.0,
+                f"{progress.bytes_read / 2**20:.1f} из {progress.total_bytes / 2**20:.1f} МиБ, "
+                f"предложений: {progress.sentences}, n-грамм: {progress.ngrams}",
+            )
+        self._view.after(Controller._ingest_poll_interval_ms, self._poll_ingest_queue)
+
+    def _cancel_update(self) -> None:
+        """Handler for clicking on the cancel update button."""
+        if self._ingest_monitor:
+            self._ingest_monitor.cancel()
+
     def _generate(self) -> None:
         """Handler for clicking on the generate text button."""
         if self._model.dictionary_name:
@@ -115,21 +211,28 @@ class Controller:
         elif entry_file_name in FileHandler.get_files():
             self._print_output_message("файл с таким именем уже существует")
         else:
-            self._model.create_new(entry_file_name)
+            self._model.create_new(
+                entry_file_name, self._config["tokenizer"], self._config["order"], self._config["continuations_count"]
+            )
             self._view.add_to_dict_combobox(entry_file_name)
             self._view.set_current_dict_combobox(entry_file_name)
             self._view.clear_dictionary_name_entry()
 
     def _delete_dictionary(self) -> None:
         """Handler for clicking on the delete dictionary button."""
-        if self._model.dictionary_name:
+        if self._ingest_monitor:
+            self._print_output_message("Дождитесь окончания обновления словаря")
+        elif self._model.dictionary_name:
             current = self._view.remove_in_dict_combobox(self._model.dictionary_name)
             self._model.delete()
             if current:
                 self._model.open_model(current)
 
     def _on_closing(self) -> None:
-        """Handler for closing app."""
+        """Handler for closing app, the running update is cancelled, so a dump is not left half-written."""
+        if self._ingest_monitor:
+            self._ingest_monitor.cancel()
+            self._ingest_thread.join()
         self._config["current_dictionary"] = self._model.dictionary_name
         FileHandler.save_config(self._config)
         self._view.destroy()
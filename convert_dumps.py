@@ -0,0 +1,6 @@
+from model.file_handler import FileHandler
+
+
+if __name__ == "__main__":
+    for filename in FileHandler.convert_legacy_dumps():
+        print(f"{filename}: converted")
@@ -0,0 +1,112 @@
+from typing import List, Optional
+
+from model.sampling import SamplingSettings, SamplingTable
+
+
+def get_continuations_by_backoff(store, words: List[str], max_length: int) -> Optional[List[str]]:
+    """
+    Return the most frequent continuations of the longest context of store among up to max_length last words
+    or None if no context is known.
+    """
+    for context_length in range(min(max_length, len(words)), 0, -1):
+        continuations = store.get_continuations(" ".join(words[-context_length:]))
+        if continuations is not None:
+            return continuations
+    return None
+
+
+def get_sampling_table_by_backoff(store, words: List[str], max_length: int,
+                                  settings: SamplingSettings) -> Optional[SamplingTable]:
+    """
+    Return sampling table of the longest context of store among up to max_length last words
+    or None if no context is known.
+    """
+    for context_length in range(min(max_length, len(words)), 0, -1):
+        table = store.get_sampling_table_by_text(" ".join(words[-context_length:]), settings)
+        if table is not None:
+            return table
+    return None
+
+
+class TextContextCursor:
+    """
+    Class describing cursor over contexts of the last words of a phrase, contexts are looked up by their text.
+
+    It serves stores which are not indexed by token ids, e.g. the dictionary of Ngram objects.
+    """
+
+    def __init__(self, store, words: List[str], max_length: int):
+        self._store = store
+        self._words = list(words[-max_length:])
+        self._max_length = max_length
+
+    def continuations(self) -> Optional[List[str]]:
+        """Return the most frequent continuations of the longest known context or None if no context is known."""
+        return get_continuations_by_backoff(self._store, self._words, self._max_length)
+
+    def sampling_table(self, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of the longest known context or None if no context is known."""
+        return get_sampling_table_by_backoff(self._store, self._words, self._max_length, settings)
+
+    def advance(self, word: str) -> None:
+        """Move the cursor to contexts ending with word."""
+        self._words.append(word)
+        del self._words[:-self._max_length]
+
+
+class ContextCursor:
+    """
+    Class describing cursor over contexts of the last words of a phrase in a prefix tree of contexts by token ids.
+
+    The cursor keeps ids of the contexts of the last 1..max_length words, moving it by a word takes
+    one child lookup per context length, so neither context text nor token ids of the phrase are rebuilt.
+    The store provides root_context, get_token_id, get_child_context, get_top_ids, get_token
+    and get_sampling_table.
+    """
+
+    def __init__(self, store, words: List[str], max_length: int):
+        self._store = store
+        self._max_length = max_length
+        self._contexts = []     # ids of contexts of the last 1, 2, ... words, -1 for unknown contexts
+        self._top = []  # the last returned continuations
+        self._top_ids = []  # token ids of the last returned continuations
+        for word in words[-max_length:]:
+            self._advance_by_id(store.get_token_id(word))
+
+    def _advance_by_id(self, token_id: int) -> None:
+        if token_id < 0:
+            self._contexts = []
+            return
+        store = self._store
+        self._contexts = [
+            store.get_child_context(parent, token_id) if parent >= 0 else -1
+            for parent in (store.root_context, *self._contexts[:self._max_length - 1])
+        ]
+
+    def continuations(self) -> Optional[List[str]]:
+        """Return the most frequent continuations of the longest known context or None if no context is known."""
+        store = self._store
+        for context in reversed(self._contexts):
+            top_ids = store.get_top_ids(context) if context >= 0 else None
+            if top_ids:
+                self._top_ids = top_ids
+                self._top = [store.get_token(token_id) for token_id in top_ids]
+                return self._top
+        return None
+
+    def sampling_table(self, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of the longest known context or None if no context is known."""
+        store = self._store
+        self._top = []
+        for context in reversed(self._contexts):
+            table = store.get_sampling_table(context, settings) if context >= 0 else None
+            if table is not None:
+                return table
+        return None
+
+    def advance(self, word: str) -> None:
+        """Move the cursor to contexts ending with word, the last returned continuations are resolved without lookup."""
+        if word in self._top:
+            self._advance_by_id(self._top_ids[self._top.index(word)])
+        else:
+            self._advance_by_id(self._store.get_token_id(word))
@@ -0,0 +1,150 @@
+from array import array
+import bisect
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+
+COUNT_ENCODINGS = ("raw", "narrow", "escape8", "log8", "log16", "varint")   # encodings of counts of binary dumps
+COMPRESSIONS = ("none", "lzma")     # compressions of binary dumps
+
+
+def narrowest_typecode(max_value: int) -> str:
+    """Return the narrowest unsigned array typecode holding values up to max_value."""
+    for typecode in "BHIQ":
+        if max_value < 1 << 8 * array(typecode).itemsize:
+            return typecode
+    raise OverflowError(f"{max_value} does not fit 64 bits")
+
+
+class Quantizer(NamedTuple):
+    """
+    Quantizer of counts to unsigned codes of typecode.
+
+    Counts up to exact_limit are stored as they are, larger counts are stored as logarithms to base ratio,
+    so decoded counts differ from them by about (ratio - 1) / 2 relatively at most.
+    The largest code is the escape: counts which do not fit the other codes are kept exactly in a separate table.
+    ratio 1 keeps all counts exact. ratio is at least e ** (1 / exact_limit), so decode(encode(count))
+    is encoded to the same code again.
+    """
+    typecode: str
+    exact_limit: int
+    ratio: float
+
+    @property
+    def escape(self) -> int:
+        return (1 << 8 * array(self.typecode).itemsize) - 1
+
+    def encode(self, count: int) -> int:
+        """Return code of count, the escape if count must be kept exactly."""
+        if count <= self.exact_limit:
+            return count
+        if self.ratio > 1 and count < 1 << 53:
+            code = self.exact_limit + round(math.log(count / self.exact_limit, self.ratio))
+            if code < self.escape:
+                return code
+        return self.escape
+
+    def decode(self, code: int) -> int:
+        """Return count of code other than the escape."""
+        if code <= self.exact_limit:
+            return code
+        return round(self.exact_limit * self.ratio ** (code - self.exact_limit))
+
+
+QUANTIZERS = {
+    "escape8": Quantizer("B", 254, 1.0),
+    "log8": Quantizer("B", 64, 1.05),
+    "log16": Quantizer("H", 1024, 1.001),
+}   # count encoding -> quantizer of counts
+
+
+def quantize_counts(counts: Sequence[int], quantizer: Quantizer) -> Tuple[array, array, array]:
+    """Return codes of counts, ascending indexes of escaped counts and the escaped counts."""
+    codes = array(quantizer.typecode)
+    escape_indexes = array("Q")
+    escape_counts = array("Q")
+    escape = quantizer.escape
+    for index, count in enumerate(counts):
+        code = quantizer.encode(count)
+        if code == escape:
+            escape_indexes.append(index)
+            escape_counts.append(count)
+        codes.append(code)
+    return codes, escape_indexes, escape_counts
+
+
+class QuantizedCounts:
+    """Class describing read-only sequence of counts decoded from codes of a quantizer and escaped counts."""
+
+    def __init__(self, codes: Sequence[int], quantizer: Quantizer, escape_indexes: Sequence[int],
+                 escape_counts: Sequence[int]):
+        self._codes = codes
+        self._quantizer = quantizer
+        self._escape_indexes = escape_indexes
+        self._escape_counts = escape_counts
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _decode(self, index: int, code: int) -> int:
+        if code != self._quantizer.escape:
+            return self._quantizer.decode(code)
+        return self._escape_counts[bisect.bisect_left(self._escape_indexes, index)]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, _, _ = key.indices(len(self._codes))
+            return [self._decode(start + offset, code) for offset, code in enumerate(self._codes[key])]
+        return self._decode(key, self._codes[key])
+
+
+def _append_varint(blob: bytearray, value: int) -> None:
+    """Append value as LEB128 varint: 7 bits per byte, the high bit tells that more bytes follow."""
+    while value >= 0x80:
+        blob.append(value & 0x7F | 0x80)
+        value >>= 7
+    blob.append(value)
+
+
+def encode_varint_edges(edge_offsets: Sequence[int], edge_next: Sequence[int],
+                        edge_count: Sequence[int]) -> Tuple[array, bytes]:
+    """
+    Return byte offsets of continuations of every context and the blob of continuations.
+    Continuations of a context are sorted by next id, they are stored as varints of the difference
+    of next id to the previous one and of the count.
+    """
+    blob = bytearray()
+    byte_offsets = array("Q", [0])
+    for context in range(len(edge_offsets) - 1):
+        previous = 0
+        for row in range(edge_offsets[context], edge_offsets[context + 1]):
+            _append_varint(blob, edge_next[row] - previous)
+            _append_varint(blob, edge_count[row])
+            previous = edge_next[row]
+        byte_offsets.append(len(blob))
+    return byte_offsets, bytes(blob)
+
+
+def decode_varint_edges(blob: Sequence[int], start: int, end: int) -> Tuple[List[int], List[int]]:
+    """Return next ids and counts of continuations stored in blob[start:end] by encode_varint_edges."""
+    values = []
+    value = shift = 0
+    for byte in blob[start:end]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    next_ids = values[::2]
+    for index in range(1, len(next_ids)):
+        next_ids[index] += next_ids[index - 1]
+    return next_ids, values[1::2]
+
+
+def validate_encoding(count_encoding: str, compression: Optional[str] = "none") -> None:
+    """Raise ValueError if count_encoding or compression is unknown."""
+    if count_encoding not in COUNT_ENCODINGS:
+        raise ValueError(f"count encoding must be one of {', '.join(COUNT_ENCODINGS)}, not {count_encoding!r}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {', '.join(COMPRESSIONS)}, not {compression!r}")
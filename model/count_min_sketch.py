@@ -0,0 +1,200 @@
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+import math
+from typing import Hashable, List, NamedTuple, Tuple
+
+from model.ngram_store import _array_size
+
+
+def sketch_dimensions(epsilon: float, delta: float) -> Tuple[int, int]:
+    """
+    Return width and depth of the sketch whose estimates exceed true counts by at most epsilon * total
+    with probability 1 - delta.
+    """
+    if not 0 < epsilon < 1 or not 0 < delta < 1:
+        raise ValueError(f"epsilon and delta must be in (0, 1), not {epsilon} and {delta}")
+    return math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta))
+
+
+class CountMinSketch:
+    """
+    Class describing Count-Min Sketch: approximate counts of any number of keys in fixed memory.
+
+    Every key is counted in one cell of each of depth rows of width cells chosen by double hashing.
+    The estimate of a key is the least of its cells, it is never less than the true count and with probability
+    confidence it exceeds the true count by at most error_bound = e / width * total.
+    Counts are added by conservative update: cells are raised only up to the new estimate of the key,
+    which keeps the bound and lowers overestimates of rare keys colliding with frequent ones.
+    Keys are hashed by the built-in hash, so a sketch is meaningful only in the process which filled it.
+    """
+
+    def __init__(self, width: int, depth: int, seed: int = 0):
+        if not isinstance(width, int) or width < 1 or not isinstance(depth, int) or depth < 1:
+            raise ValueError(f"width and depth must be positive integers, not {width!r} and {depth!r}")
+        self._width = width
+        self._depth = depth
+        self._seed = seed
+        self._cells = array("Q", [0]) * (width * depth)
+        self._total = 0
+
+    @classmethod
+    def for_error(cls, epsilon: float, delta: float, seed: int = 0) -> "CountMinSketch":
+        """Return sketch whose estimates exceed true counts by at most epsilon * total with probability 1 - delta."""
+        return cls(*sketch_dimensions(epsilon, delta), seed)
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @property
+    def total(self) -> int:
+        """Sum of all added counts."""
+        return self._total
+
+    @property
+    def error_bound(self) -> float:
+        """Overestimate of a count, which is not exceeded with probability confidence."""
+        return math.e / self._width * self._total
+
+    @property
+    def confidence(self) -> float:
+        return 1 - math.exp(-self._depth)
+
+    def _cells_of(self, key: Hashable) -> List[int]:
+        """Return indexes of cells of key in the rows one by one."""
+        first = hash(key)
+        step = hash((first, self._seed)) | 1
+        width = self._width
+        return [row * width + (first + row * step) % width for row in range(self._depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """Add count to key and return the new estimate of its count."""
+        cells = self._cells
+        key_cells = self._cells_of(key)
+        estimate = min(cells[cell] for cell in key_cells) + count
+        for cell in key_cells:
+            if cells[cell] < estimate:
+                cells[cell] = estimate
+        self._total += count
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        """Return estimate of the count of key, it is never less than the true count."""
+        cells = self._cells
+        return min(cells[cell] for cell in self._cells_of(key))
+
+    def add_id_counts(self, tokens: List[str], *ngram_counts: Counter) -> None:
+        """Add counts of ngrams of token ids as returned by FrequencyAnalyzer.count_id_ngrams, keyed by their words."""
+        for counts in ngram_counts:
+            for ngram, count in counts.items():
+                self.add(tuple(tokens[token_id] for token_id in ngram), count)
+
+    def frequent_id_counts(self, min_count: int, tokens: List[str], *ngram_counts: Counter) -> Tuple:
+        """
+        Return counts of ngrams of token ids in the format of FrequencyAnalyzer.count_id_ngrams only of ngrams
+        whose estimated counts are at least min_count, the counts are taken from ngram_counts.
+        The sketch is not changed.
+        """
+        return _compact_id_counts(tokens, [
+            Counter({
+                ngram: count for ngram, count in counts.items()
+                if self.estimate(tuple(tokens[token_id] for token_id in ngram)) >= min_count
+            })
+            for counts in ngram_counts
+        ])
+
+    def admit_id_counts(self, min_count: int, tokens: List[str], *ngram_counts: Counter) -> Tuple:
+        """
+        Add counts of ngrams of token ids and return counts of the ngrams admitted to exact counting
+        in the format of FrequencyAnalyzer.count_id_ngrams. An ngram whose estimate had reached min_count before
+        keeps its count, an ngram reaching it now gets its whole estimate, which includes its occurrences
+        before admission.
+        """
+        admitted = []
+        for counts in ngram_counts:
+            admitted_counts = Counter()
+            for ngram, count in counts.items():
+                key = tuple(tokens[token_id] for token_id in ngram)
+                if self.estimate(key) >= min_count:
+                    self.add(key, count)
+                    admitted_counts[ngram] = count
+                else:
+                    estimate = self.add(key, count)
+                    if estimate >= min_count:
+                        admitted_counts[ngram] = estimate
+            admitted.append(admitted_counts)
+        return _compact_id_counts(tokens, admitted)
+
+    def memory_size(self) -> int:
+        """Return number of bytes of the cells."""
+        return _array_size(self._cells)
+
+
+def _compact_id_counts(tokens: List[str], ngram_counts: List[Counter]) -> Tuple:
+    """Return tokens used by ngram_counts and ngram_counts with token ids of the returned tokens."""
+    new_ids = {}
+    compact_counts = [
+        Counter({tuple(new_ids.setdefault(token_id, len(new_ids)) for token_id in ngram): count
+                 for ngram, count in counts.items()})
+        for counts in ngram_counts
+    ]
+    return ([tokens[token_id] for token_id in new_ids], *compact_counts)
+
+
+@dataclass(frozen=True)
+class SketchSettings:
+    """
+    Immutable settings of ingestion keeping exact counts only of ngrams frequent by Count-Min Sketch.
+
+    width and depth are the dimensions of the sketch, it takes width * depth * 8 bytes.
+    min_count is the estimated count from which an ngram is counted exactly.
+    With two_pass the texts are read twice: the first pass fills the sketch, the second one counts exactly
+    the ngrams whose estimates are at least min_count. Otherwise texts are read once and an ngram is admitted
+    to exact counting as soon as its estimate reaches min_count.
+    """
+    width: int = 2**20
+    depth: int = 4
+    min_count: int = 2
+    two_pass: bool = True
+
+    def __post_init__(self):
+        for name in ("width", "depth", "min_count"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise ValueError(f"{name} must be positive integer, not {value!r}")
+
+    @classmethod
+    def for_error(cls, epsilon: float, delta: float, min_count: int = 2, two_pass: bool = True) -> "SketchSettings":
+        """Return settings of sketch overestimating counts by epsilon * total at most with probability 1 - delta."""
+        return cls(*sketch_dimensions(epsilon, delta), min_count, two_pass)
+
+    def create_sketch(self) -> CountMinSketch:
+        return CountMinSketch(self.width, self.depth)
+
+
+class SketchReport(NamedTuple):
+    """Result of ingestion by a sketch: its size, counts seen and kept, and the error bound of estimates."""
+    width: int
+    depth: int
+    sketch_memory: int
+    total_count: int
+    kept_count: int
+    error_bound: float
+    confidence: float
+
+    @classmethod
+    def of(cls, sketch: CountMinSketch, kept_count: int) -> "SketchReport":
+        return cls(
+            sketch.width, sketch.depth, sketch.memory_size(), sketch.total, kept_count,
+            sketch.error_bound, sketch.confidence,
+        )
+
+    @property
+    def kept_share(self) -> float:
+        """Share of counted ngrams kept in the store."""
+        return self.kept_count / self.total_count if self.total_count else 1.0
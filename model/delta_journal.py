@@ -0,0 +1,68 @@
+import json
+import os
+import struct
+import zlib
+from typing import Dict, List
+
+
+JOURNAL_MAGIC = b"TGJOURNL"     # first bytes of a journal
+_JOURNAL_HEADER = struct.Struct("<8s16s")   # magic, id of the binary dump the journal belongs to
+_RECORD_HEADER = struct.Struct("<II")   # length and crc32 of the record payload
+
+
+def ensure_journal(path: str, journal_id: str) -> None:
+    """
+    Create empty journal for the binary dump with journal_id, if there is no journal of this dump.
+    The journal is created atomically.
+    """
+    header = _JOURNAL_HEADER.pack(JOURNAL_MAGIC, bytes.fromhex(journal_id))
+    if os.path.isfile(path):
+        with open(path, 'rb') as file:
+            if file.read(_JOURNAL_HEADER.size) == header:
+                return
+    with open(path+".tmp", 'wb') as file:
+        file.write(header)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path+".tmp", path)
+
+
+def append_record(path: str, count_dict: Dict[str, Dict[str, int]]) -> None:
+    """
+    Append record of added counts (context, next word, +count) to the journal.
+    The record is prefixed by its length and checksum, so a record torn by a crash is detected on reading.
+    """
+    payload = json.dumps(count_dict, ensure_ascii=False, separators=(",", ":")).encode("UTF-8")
+    with open(path, 'ab') as file:
+        file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def read_records(path: str, journal_id: str) -> List[Dict[str, Dict[str, int]]]:
+    """
+    Return records of the journal of the binary dump with journal_id.
+
+    A journal of another dump (left by a crash during compaction) is ignored and removed.
+    A torn or corrupted tail (left by a crash during appending) is cut off.
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+    if len(content) < _JOURNAL_HEADER.size or _JOURNAL_HEADER.unpack_from(content) != (
+            JOURNAL_MAGIC, bytes.fromhex(journal_id)):
+        os.remove(path)
+        return []
+
+    records = []
+    offset = _JOURNAL_HEADER.size
+    while offset + _RECORD_HEADER.size <= len(content):
+        length, checksum = _RECORD_HEADER.unpack_from(content, offset)
+        payload = content[offset + _RECORD_HEADER.size:offset + _RECORD_HEADER.size + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        records.append(json.loads(payload.decode("UTF-8")))
+        offset += _RECORD_HEADER.size + length
+    if offset != len(content):
+        with open(path, 'r+b') as file:
+            file.truncate(offset)
+    return records
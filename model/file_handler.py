@@ -1,14 +1,28 @@
 import pickle
 import os
 import re
+from typing import Iterator
+import uuid
 
 
+from model.count_encoding import validate_encoding
+from model.delta_journal import append_record, ensure_journal, read_records
+from model.mapped_ngram_store import MappedNgramStore, read_dump_info, write_store
+from model.ngram_store import NgramStore
 from model.text_generator import TextGenerator
 
 
 class FileHandler:
     """Сlass describing static methods for working with the file system."""
     _dumps_folder_path = "model/data"   # relative path to the folder where model dumps are stored
+    _chunk_size = 1 << 20   # number of characters read from a text file at once
+    _dump_extension = "tgm"     # extension of binary dumps opened via mmap
+    _legacy_dump_extension = "pkl"  # extension of pickled dumps, supported for reading and conversion
+    _journal_extension = "tgj"  # extension of journals of changes appended to binary dumps
+    _compaction_ratio = 0.5     # journal is folded into the dump when it grows larger than this part of the dump,
+                                # the size of a compressed dump is taken decompressed
+    _count_encoding = "raw"     # encoding of counts of written binary dumps, one of COUNT_ENCODINGS
+    _dump_compression = "none"  # compression of written binary dumps, one of COMPRESSIONS
 
     @staticmethod
     def read_file(file_name: str) -> str:
@@ -16,28 +30,154 @@ class FileHandler:
         with open(file_name, 'r', encoding="UTF-8") as file:
             return file.read()
 
+    @staticmethod
+    def read_file_chunks(file_name: str, chunk_size: int = None) -> Iterator[str]:
+        """Read the file by chunks of chunk_size characters."""
+        chunk_size = chunk_size if chunk_size else FileHandler._chunk_size
+        with open(file_name, 'r', encoding="UTF-8") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    def _dump_path(filename: str, extension: str) -> str:
+        """Return path of the dump of dictionary filename with extension."""
+        return FileHandler._dumps_folder_path+f"/{filename}.{extension}"
+
     @staticmethod
     def write_data(data: TextGenerator, filename: str) -> None:
-        """Serialize  text generator to pcl file."""
-        with open(FileHandler._dumps_folder_path+f"/{filename}.pkl", 'wb') as file:
-            pickle.dump(data, file)
+        """
+        Write text generator to binary dump with _count_encoding and _dump_compression,
+        the dump is written to disk before it atomically replaces the old one.
+        The journal and the pickled dump with the same name are removed, as they are outdated.
+        """
+        os.makedirs(FileHandler._dumps_folder_path, exist_ok=True)
+        path = FileHandler._dump_path(filename, FileHandler._dump_extension)
+        with open(path+".tmp", 'wb') as file:
+            write_store(
+                data.ngrams_dict.as_ngram_store(), file,
+                {"journal_id": uuid.uuid4().hex, "tokenizer": data.tokenizer, "order": data.order},
+                FileHandler._count_encoding, FileHandler._dump_compression,
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path+".tmp", path)
+        FileHandler._fsync_directory(FileHandler._dumps_folder_path)
+        for extension in (FileHandler._journal_extension, FileHandler._legacy_dump_extension):
+            outdated_path = FileHandler._dump_path(filename, extension)
+            if os.path.isfile(outdated_path):
+                os.remove(outdated_path)
+        if isinstance(data.ngrams_dict, NgramStore):
+            data.ngrams_dict.mark_saved()
+
+    @staticmethod
+    def _fsync_directory(directory_path: str) -> None:
+        """Write the entries of directory to disk, so a renamed file survives a crash. Skipped on Windows."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(directory_path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def append_changes(data: TextGenerator, filename: str) -> None:
+        """
+        Append counts added to text generator since it was saved to the journal of its binary dump,
+        so the time of saving depends on the size of changes, not on the size of the dictionary.
+        The journal is folded into the dump, when it grows larger than _compaction_ratio of the dump.
+        If there is no binary dump, the whole text generator is written.
+        """
+        store = data.ngrams_dict
+        if store.read_only:
+            return
+        path = FileHandler._dump_path(filename, FileHandler._dump_extension)
+        dump_info = read_dump_info(path) if os.path.isfile(path) else None
+        journal_id = dump_info.metadata.get("journal_id") if dump_info else None
+        if not isinstance(store, NgramStore) or journal_id is None:
+            FileHandler.write_data(data, filename)
+            return
+        changes = store.get_changes()
+        if not changes:
+            return
+        journal_path = FileHandler._dump_path(filename, FileHandler._journal_extension)
+        ensure_journal(journal_path, journal_id)
+        append_record(journal_path, changes)
+        store.mark_saved()
+        if os.path.getsize(journal_path) > dump_info.size * FileHandler._compaction_ratio:
+            FileHandler.write_data(data, filename)
+
+    @staticmethod
+    def compact(filename: str) -> None:
+        """Fold the journal of changes into the binary dump."""
+        FileHandler.write_data(FileHandler.read_data(filename), filename)
 
     @staticmethod
     def read_data(filename: str) -> TextGenerator:
-        """Deserialize  text generator from pcl file."""
-        with open(FileHandler._dumps_folder_path+f"/{filename}.pkl", 'rb') as file:
-            return pickle.load(file)
+        """
+        Open text generator from binary dump via mmap and replay the journal of changes appended to it,
+        the replayed counts are kept in memory over the mapped dump.
+        If there is no binary dump, deserialize text generator from pcl file.
+        """
+        path = FileHandler._dump_path(filename, FileHandler._dump_extension)
+        if not os.path.isfile(path):
+            with open(FileHandler._dump_path(filename, FileHandler._legacy_dump_extension), 'rb') as file:
+                return pickle.load(file)
+        store = MappedNgramStore(path)
+        journal_path = FileHandler._dump_path(filename, FileHandler._journal_extension)
+        if os.path.isfile(journal_path):
+            for record in read_records(journal_path, store.metadata.get("journal_id", "")):
+                store.add_changes(record)
+        return TextGenerator.from_store(
+            store, store.metadata.get("tokenizer", "default"), store.metadata.get("order", 3)
+        )
+
+    @staticmethod
+    def convert_legacy_dumps() -> list[str]:
+        """Convert all pcl files in dumps folder to binary dumps, return names of converted dictionaries."""
+        directory_path = FileHandler._dumps_folder_path
+        suffix = "."+FileHandler._legacy_dump_extension
+        converted = []
+        for f in sorted(os.listdir(directory_path)):
+            if f.endswith(suffix) and os.path.isfile(os.path.join(directory_path, f)):
+                filename = f[:-len(suffix)]
+                with open(os.path.join(directory_path, f), 'rb') as file:
+                    FileHandler.write_data(pickle.load(file), filename)
+                converted.append(filename)
+        return converted
 
     @staticmethod
     def get_files() -> list[str]:
-        """Get list of file names from dumps folder."""
+        """Get list of dictionary names from dumps folder."""
         directory_path = FileHandler._dumps_folder_path
-        return [f.split(".")[0] for f in os.listdir(directory_path) if os.path.isfile(os.path.join(directory_path, f))]
+        if not os.path.isdir(directory_path):
+            return []
+        extensions = (FileHandler._dump_extension, FileHandler._legacy_dump_extension)
+        return list(dict.fromkeys(
+            name for name, _, extension in (f.rpartition(".") for f in os.listdir(directory_path))
+            if extension in extensions and os.path.isfile(os.path.join(directory_path, f"{name}.{extension}"))
+        ))
 
     @staticmethod
     def delete_file(filename) -> None:
-        """Delete file indumps folder."""
-        os.remove(FileHandler._dumps_folder_path+f"/{filename}.pkl")
+        """Delete dumps and journal of dictionary in dumps folder."""
+        for extension in (FileHandler._dump_extension, FileHandler._journal_extension,
+                          FileHandler._legacy_dump_extension):
+            path = FileHandler._dump_path(filename, extension)
+            if os.path.isfile(path):
+                os.remove(path)
+
+    @staticmethod
+    def set_count_encoding(value: str) -> None:
+        """set count_encoding, raise ValueError if it is unknown"""
+        validate_encoding(value)
+        FileHandler._count_encoding = value
+
+    @staticmethod
+    def set_dump_compression(value: str) -> None:
+        """set dump_compression, raise ValueError if it is unknown"""
+        validate_encoding(FileHandler._count_encoding, value)
+        FileHandler._dump_compression = value
 
     @staticmethod
     def read_config() -> dict[str, str]:
@@ -45,7 +185,7 @@ class FileHandler:
         with open("config.txt", 'r') as file:
             return {
                 key: value for key, value in [(match.group(1), match.group(2))
-                                              for match in re.finditer(r"([a-zA-Z_]+)=([a-zA-Z0-9_]*)", file.read())]
+                                              for match in re.finditer(r"([a-zA-Z_]+)=([a-zA-Z0-9_.]*)", file.read())]
                 }
 
     @staticmethod
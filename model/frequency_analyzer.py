@@ -1,25 +1,92 @@
+from array import array
+import bisect
 from collections import defaultdict, Counter
-from typing import Dict, List
+import heapq
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+_SENTENCE_END = None    # marker separating sentences in the flat token sequence, never equal to a word
 
 
 class FrequencyAnalyzer:
     """Class describing methods of frequency analysis."""
 
-    def create_count_dict(self, text_list: List[List[str]]) -> Dict[str, Counter]:
-        """Create a count dictionary by parsed text."""
+    def create_count_dict(self, text_list: List[List[str]], order: int = 3) -> Dict[str, Counter]:
+        """Create a count dictionary by parsed text, contexts are ngrams of 1 to order-1 words."""
         count_dictionary = defaultdict(Counter)
         for sentence_list in text_list:
             for i in range(len(sentence_list)-1):
-                # обработка биграмм
-                bigram_start = sentence_list[i]
-                bigram_end = sentence_list[i+1]
-                count_dictionary[bigram_start].update([bigram_end])
-                # обработка триграмм
-                if i < len(sentence_list)-2:
-                    trigram_start = ' '.join(sentence_list[i:i+2])
-                    trigram_end = sentence_list[i+2]
-                    count_dictionary[trigram_start].update([trigram_end])
+                # обработка n-грамм, начинающихся с i-го слова, от биграммы до n-граммы порядка order
+                for context_length in range(1, min(order-1, len(sentence_list)-1-i)+1):
+                    ngram_start = ' '.join(sentence_list[i:i+context_length])
+                    ngram_end = sentence_list[i+context_length]
+                    count_dictionary[ngram_start].update([ngram_end])
+
+        return count_dictionary
+
+    def count_id_ngrams(self, text_list: List[List[str]], order: int = 3) -> Tuple[Any, ...]:
+        """
+        Count ngrams of 2 to order words of parsed text as tuples of token ids.
+
+        Tokens are interned to ids, sentences are flattened to one id sequence separated by an end marker,
+        and ngrams are counted by Counter over zipped shifted sequences, so the per-token work is done in C.
+        Return the list of tokens by id and counters of (id, id) bigrams, (id, id, id) trigrams
+        and so on up to ngrams of order ids, ngrams crossing a sentence end are not counted.
+        """
+        flat_text = list(chain.from_iterable(chain(sentence, (_SENTENCE_END,)) for sentence in text_list))
+        tokens = [token for token in dict.fromkeys(flat_text) if token is not _SENTENCE_END]
+        ids = {token: token_id for token_id, token in enumerate(tokens)}
+        ids[_SENTENCE_END] = -1
+        id_sequence = array("i", map(ids.__getitem__, flat_text))
+        del flat_text
+
+        all_ngram_counts = []
+        for n in range(2, order + 1):
+            ngram_counts = Counter(zip(*(islice(id_sequence, shift, None) for shift in range(n))))
+            for ngram in [ngram for ngram in ngram_counts if -1 in ngram]:
+                del ngram_counts[ngram]
+            all_ngram_counts.append(ngram_counts)
+        return (tokens, *all_ngram_counts)
+
+    @staticmethod
+    def merge_id_counts(shard_counts: Iterable[Tuple[Any, ...]]) -> Tuple[Any, ...]:
+        """
+        Merge results of count_id_ngrams over separate shards of a text in the order of shards.
+        Local token ids of every shard are remapped to ids of the merged token list and counts are summed.
+        """
+        ids = {}
+        tokens = []
+        all_ngram_counts = []
+        for shard_tokens, *shard_all_ngram_counts in shard_counts:
+            merged_ids = []
+            for token in shard_tokens:
+                token_id = ids.get(token)
+                if token_id is None:
+                    token_id = ids[token] = len(tokens)
+                    tokens.append(token)
+                merged_ids.append(token_id)
+            all_ngram_counts.extend(Counter() for _ in range(len(shard_all_ngram_counts) - len(all_ngram_counts)))
+            for ngram_counts, shard_ngram_counts in zip(all_ngram_counts, shard_all_ngram_counts):
+                for ngram, count in shard_ngram_counts.items():
+                    ngram_counts[tuple(map(merged_ids.__getitem__, ngram))] += count
+        return (tokens, *all_ngram_counts)
 
+    def create_count_dict_bulk(self, text_list: List[List[str]], order: int = 3) -> Dict[str, Counter]:
+        """Create the same count dictionary as create_count_dict by counting ngrams of token ids in bulk."""
+        return self.id_counts_to_count_dict(*self.count_id_ngrams(text_list, order))
+
+    @staticmethod
+    def id_counts_to_count_dict(tokens: List[str], *ngram_counts: Counter) -> Dict[str, Counter]:
+        """Convert counters of ngrams of token ids to the count dictionary of create_count_dict."""
+        count_dictionary = defaultdict(Counter)
+        ngram_starts = {}
+        for counts in ngram_counts:
+            for ngram, count in counts.items():
+                ngram_start = ngram_starts.get(ngram[:-1])
+                if ngram_start is None:
+                    ngram_start = ngram_starts[ngram[:-1]] = " ".join([tokens[i] for i in ngram[:-1]])
+                count_dictionary[ngram_start][tokens[ngram[-1]]] = count
         return count_dictionary
 
     def get_2_most_frequently_continuation(self, count_dictionary:  Counter) -> List[str]:
@@ -47,6 +114,33 @@ class FrequencyAnalyzer:
                     max2 = end
             return [max1, max2]
 
+    def get_most_frequently_continuations(self, count_dictionary: Dict[str, int], k: int) -> List[str]:
+        """
+        Return k most frequent continuations by count dictionary.
+        Continuations are ordered as in get_2_most_frequently_continuation:
+        higher count first, then lexicographically smaller.
+        """
+        if len(count_dictionary) == 0:
+            return None
+        return heapq.nsmallest(k, count_dictionary, key=lambda word: (-count_dictionary[word], word))
+
+    @staticmethod
+    def update_most_frequently_continuations(top: List[Any], continuation: Any,
+                                             sort_key: Callable[[Any], Any], k: int) -> None:
+        """
+        Update in place the sorted list top of k most frequent continuations after the count of continuation
+        has been increased. sort_key returns smaller keys for more frequent continuations.
+
+        Counts only grow, so a continuation outside of top can get into it only by its own increment,
+        and it takes O(log k) comparisons instead of scanning all continuations.
+        """
+        if continuation in top:
+            top.remove(continuation)
+        elif len(top) >= k and sort_key(continuation) >= sort_key(top[-1]):
+            return
+        bisect.insort(top, continuation, key=sort_key)
+        del top[k:]
+
     @staticmethod
     def _compare_count_dict_items(key1, key2, dictionary) -> bool:
         """Compare two continuations by key in count dictionary."""
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import sys
+import threading
+import time
+from typing import Callable, Hashable, Optional, Tuple
+
+
+class GenerationCache:
+    """
+    Class describing LRU cache of generated words with optional time to live.
+
+    Keys start with the dictionary name, so entries of a changed dictionary are discarded at once.
+    When the number of entries exceeds max_entries, the least recently used one is evicted.
+    Methods may be called from several threads.
+    """
+
+    def __init__(self, max_entries: int, ttl: float = 0, clock: Callable[[], float] = time.monotonic):
+        """ttl is the lifetime of an entry in seconds, 0 means entries do not expire."""
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()   # key -> (generated words, expiry time), the last is the newest
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Tuple[str, ...]]:
+        """Return generated words by key or None if they are not cached or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._ttl and entry[1] <= self._clock():
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Tuple[Hashable, ...], words: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Cache generated words by key and return them."""
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (words, self._clock() + self._ttl)
+            self._memory_size += self._entry_size(key, words)
+            while len(self._entries) > self._max_entries:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+        return words
+
+    def discard_dictionary(self, name: str) -> None:
+        """Discard entries of dictionary name, e.g. after the dictionary has been changed."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == name]:
+                self._discard(key)
+
+    def _discard(self, key: Tuple[Hashable, ...]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory_size -= self._entry_size(key, entry[0])
+
+    @staticmethod
+    def _entry_size(key: Tuple[Hashable, ...], words: Tuple[str, ...]) -> int:
+        """Return approximate number of bytes of entry, strings shared with the dictionary are counted too."""
+        return sys.getsizeof(key) + sys.getsizeof(words) + sum(map(sys.getsizeof, words))
+
+    def stats(self) -> dict:
+        """Return counters of hits, misses, evictions, hit rate, number of entries and their memory size."""
+        with self._lock:
+            requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "memory_size": self._memory_size,
+            }
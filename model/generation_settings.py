@@ -0,0 +1,42 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from model.sampling import SamplingSettings, parse_sampling_settings
+
+
+@dataclass(frozen=True)
+class GenerationSettings:
+    """
+    Immutable settings of generation, they are validated once on creation and may be shared by threads.
+
+    max_generated_word_count is the maximum number of generated words.
+    generated_without_dot is the number of generated words after which generator tries to complete the sentence.
+    sampling is the settings of weighted sampling from all continuations,
+    None means choice among the most frequent continuations.
+    """
+    max_generated_word_count: int = 10
+    generated_without_dot: int = 10
+    sampling: Optional[SamplingSettings] = None
+
+    def __post_init__(self):
+        for name in ("max_generated_word_count", "generated_without_dot"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"{name} must be non-negative integer, not {value!r}")
+        if self.sampling is not None:
+            self.sampling.validate()
+
+
+def parse_generation_settings(options: dict, base: GenerationSettings = GenerationSettings()) -> GenerationSettings:
+    """
+    Return settings of base with options max_generated_word_count, generated_without_dot and sampling options
+    of options replaced, options may be a config or a request. Raise ValueError if options are invalid.
+    """
+    values = {}
+    for name in ("max_generated_word_count", "generated_without_dot"):
+        if name in options:
+            value = options[name]
+            values[name] = int(value) if isinstance(value, str) and value.isdigit() else value
+    if "sampling" in options:
+        values["sampling"] = parse_sampling_settings(options)
+    return replace(base, **values)
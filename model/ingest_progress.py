@@ -0,0 +1,78 @@
+from collections import Counter
+import threading
+from typing import Callable, Iterable, Iterator, List, NamedTuple
+
+
+class IngestProgress(NamedTuple):
+    """Progress of ingestion: bytes of files read, sentences and ngrams of all orders counted."""
+    bytes_read: int
+    total_bytes: int
+    sentences: int
+    ngrams: int
+
+
+class IngestCancelled(Exception):
+    """Raised in the ingesting thread after ingestion has been cancelled."""
+
+
+class IngestMonitor:
+    """
+    Class describing progress and cancellation of one ingestion.
+
+    The ingesting thread reports read chunks and counted ngrams, every report is passed to callback
+    in that thread and raises IngestCancelled once cancel has been called from another thread.
+    """
+
+    def __init__(self, total_bytes: int = 0, callback: Callable[[IngestProgress], None] = None):
+        """total_bytes is the size of ingested files, callback gets progress after every report."""
+        self._total_bytes = total_bytes
+        self._callback = callback
+        self._bytes_read = 0
+        self._sentences = 0
+        self._ngrams = 0
+        self._cancelled = threading.Event()
+
+    @property
+    def progress(self) -> IngestProgress:
+        return IngestProgress(self._bytes_read, self._total_bytes, self._sentences, self._ngrams)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Ask the ingesting thread to stop at its next report."""
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise IngestCancelled if ingestion has been cancelled."""
+        if self._cancelled.is_set():
+            raise IngestCancelled()
+
+    def track_chunks(self, chunks: Iterable[str], file_size: int = None) -> Iterator[str]:
+        """
+        Yield chunks of a file reporting their size in bytes of UTF-8. Chunks are read with newlines translated,
+        so their size may be less than the size of the file, e.g. with CRLF newlines.
+        With file_size the whole file is counted by it after the last chunk.
+        """
+        start = self._bytes_read
+        for chunk in chunks:
+            self._bytes_read += len(chunk.encode("UTF-8"))
+            self._report()
+            yield chunk
+        if file_size is not None and self._bytes_read != start + file_size:
+            self._bytes_read = start + file_size
+            self._report()
+
+    def add_id_counts(self, tokens: List[str], *ngram_counts: Counter) -> None:
+        """Report counts of ngrams of token ids as returned by FrequencyAnalyzer.count_id_ngrams."""
+        if ngram_counts:
+            dot_id = tokens.index(".") if "." in tokens else -1
+            self._sentences += sum(count for ngram, count in ngram_counts[0].items() if ngram[-1] == dot_id)
+        self._ngrams += sum(sum(counts.values()) for counts in ngram_counts)
+        self._report()
+
+    def _report(self) -> None:
+        self.check()
+        if self._callback:
+            self._callback(self.progress)
@@ -0,0 +1,29 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, Tuple
+
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.text_parser import get_text_parser
+
+
+def count_text(text: str, tokenizer: str = "default", order: int = 3) -> Tuple[Any, ...]:
+    """Parse text by tokenizer and count its ngrams of up to order token ids, it is run in a worker process."""
+    return FrequencyAnalyzer().count_id_ngrams(get_text_parser(tokenizer).parse_text(text), order)
+
+
+def count_texts_parallel(texts: Iterable[str], workers: int, tokenizer: str = "default",
+                         order: int = 3) -> Iterator[Tuple[Any, ...]]:
+    """
+    Count ngrams of texts in worker processes and yield merged counts of every workers texts in the order of texts.
+    At most 2*workers texts are submitted at once, so texts may be a lazy stream of a large corpus.
+    """
+    texts = iter(texts)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(count_text, text, tokenizer, order) for text in islice(texts, 2 * workers))
+        while pending:
+            shard_counts = []
+            for _ in range(min(workers, len(pending))):
+                shard_counts.append(pending.popleft().result())
+                pending.extend(executor.submit(count_text, text, tokenizer, order) for text in islice(texts, 1))
+            yield FrequencyAnalyzer.merge_id_counts(shard_counts)
@@ -0,0 +1,158 @@
+import cProfile
+from contextlib import contextmanager
+from functools import wraps
+import importlib
+import inspect
+import threading
+import time
+from typing import Callable, Dict, Iterator
+
+
+class Instrumentation:
+    """
+    Class describing opt-in timers of hot functions of ingestion, generation and file I/O.
+
+    While instrumentation is disabled, the functions are not wrapped at all, so it costs nothing.
+    enable replaces the functions of _targets by wrappers counting calls and their time,
+    disable puts the original functions back. A generator function is timed by the time spent
+    producing its items, and its items are counted instead of calls. Timers may be updated from several threads.
+    """
+    _targets = (
+        ("model.text_parser", "TextParser", "parse_text"),
+        ("model.frequency_analyzer", "FrequencyAnalyzer", "create_count_dict"),
+        ("model.frequency_analyzer", "FrequencyAnalyzer", "count_id_ngrams"),
+        ("model.ngram_store", "NgramStore", "update_by_id_counts"),
+        ("model.ngram_store", "NgramStore", "update_by_count_dict"),
+        ("model.text_generator", "TextGenerator", "update_dicts_by_text"),
+        ("model.text_generator", "TextGenerator", "update_dicts_by_count_dict"),
+        ("model.text_generator", "TextGenerator", "update_dicts_by_chunk_streams"),
+        ("model.text_generator", "TextGenerator", "continue_phrase"),
+        ("model.text_generator", "TextGenerator", "generate_batch"),
+        ("model.text_generator", "TextGenerator", "_choose_next_word"),
+        ("model.context_cursor", "ContextCursor", "continuations"),
+        ("model.context_cursor", "ContextCursor", "sampling_table"),
+        ("model.context_cursor", "ContextCursor", "advance"),
+        ("model.context_cursor", "TextContextCursor", "continuations"),
+        ("model.context_cursor", "TextContextCursor", "sampling_table"),
+        ("model.context_cursor", "TextContextCursor", "advance"),
+        ("model.file_handler", "FileHandler", "read_file"),
+        ("model.file_handler", "FileHandler", "read_file_chunks"),
+        ("model.file_handler", "FileHandler", "write_data"),
+        ("model.file_handler", "FileHandler", "read_data"),
+        ("model.file_handler", "FileHandler", "append_changes"),
+    )   # (module, class, function) of instrumented functions, the steps of continue_phrase are cursor methods
+    _originals = {}     # (class, function name) -> original attribute of the class while instrumentation is enabled
+    _timers: Dict[str, list] = {}    # "class.function" -> [calls, seconds, max seconds]
+    _lock = threading.Lock()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return bool(cls._originals)
+
+    @classmethod
+    def enable(cls) -> None:
+        """Wrap instrumented functions by timers, timers keep their values collected before."""
+        with cls._lock:
+            if cls._originals:
+                return
+            for module_name, class_name, name in cls._targets:
+                owner = getattr(importlib.import_module(module_name), class_name)
+                original = owner.__dict__[name]
+                cls._originals[(owner, name)] = original
+                setattr(owner, name, cls._wrap(original, f"{class_name}.{name}"))
+
+    @classmethod
+    def disable(cls) -> None:
+        """Put the original functions back."""
+        with cls._lock:
+            for (owner, name), original in cls._originals.items():
+                setattr(owner, name, original)
+            cls._originals = {}
+
+    @classmethod
+    def reset(cls) -> None:
+        """Reset all timers."""
+        with cls._lock:
+            cls._timers = {}
+
+    @classmethod
+    def _wrap(cls, original, metric: str):
+        """Return timed wrapper of function, staticmethod or classmethod original."""
+        if isinstance(original, (staticmethod, classmethod)):
+            return type(original)(cls._wrap(original.__func__, metric))
+        record = cls._recorder(metric)
+        if inspect.isgeneratorfunction(original):
+            @wraps(original)
+            def generator_wrapper(*args, **kwargs):
+                iterator = original(*args, **kwargs)
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        record(time.perf_counter() - start)
+                        yield item
+                finally:
+                    iterator.close()
+            return generator_wrapper
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record(time.perf_counter() - start)
+        return wrapper
+
+    @classmethod
+    def _recorder(cls, metric: str) -> Callable[[float], None]:
+        """Return function adding a call of seconds to the timer of metric."""
+        def record(seconds: float) -> None:
+            with cls._lock:
+                timer = cls._timers.get(metric)
+                if timer is None:
+                    timer = cls._timers[metric] = [0, 0.0, 0.0]
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+        return record
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, float]]:
+        """Return calls, total seconds and maximum seconds of a call of every called instrumented function."""
+        with cls._lock:
+            return {
+                metric: {"calls": calls, "seconds": seconds, "max_seconds": max_seconds}
+                for metric, (calls, seconds, max_seconds) in sorted(cls._timers.items())
+            }
+
+    @classmethod
+    def prometheus_text(cls) -> str:
+        """Return timers in the Prometheus text exposition format."""
+        families = (
+            ("textgen_calls_total", "counter", "calls", "Calls of instrumented functions."),
+            ("textgen_seconds_total", "counter", "seconds", "Total time of instrumented functions in seconds."),
+            ("textgen_max_seconds", "gauge", "max_seconds", "Maximum time of one call in seconds."),
+        )
+        snapshot = cls.snapshot()
+        lines = []
+        for family, kind, field, description in families:
+            lines.append(f"# HELP {family} {description}")
+            lines.append(f"# TYPE {family} {kind}")
+            lines.extend(f'{family}{{function="{metric}"}} {timer[field]}' for metric, timer in snapshot.items())
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    @contextmanager
+    def profile(path: str) -> Iterator[cProfile.Profile]:
+        """Profile the enclosed code by cProfile and write its stats to path, they are read by pstats."""
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
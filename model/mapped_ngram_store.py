@@ -0,0 +1,437 @@
+from array import array
+import bisect
+from collections import Counter
+from collections.abc import Mapping
+import io
+import json
+import lzma
+import mmap
+import os
+import struct
+import sys
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from model.context_cursor import ContextCursor, TextContextCursor
+from model.count_encoding import (
+    QUANTIZERS, QuantizedCounts, decode_varint_edges, encode_varint_edges, narrowest_typecode, quantize_counts,
+    validate_encoding,
+)
+from model.ngram import Ngram
+from model.ngram_store import NgramStore
+from model.sampling import SamplingSettings, SamplingTable, SamplingTableCache, build_sampling_table
+
+
+MAGIC = b"TGMODEL\0"    # first bytes of a binary dump
+COMPRESSED_MAGIC = b"TGMODELZ"  # first bytes of a binary dump compressed by lzma as a whole, after its metadata
+FORMAT_VERSION = 2  # version of the binary dump layout
+SECTIONS = (
+    "metadata", "token_offsets", "token_blob", "context_keys", "edge_offsets", "edge_next", "edge_count",
+    "context_top", "escape_indexes", "escape_counts",
+)   # sections of the binary dump in the order of the section table
+VERSION_SECTIONS = {1: SECTIONS[:8], 2: SECTIONS}   # sections of supported format versions
+SECTION_TYPECODES = {
+    "token_offsets": "Q", "context_keys": "Q", "edge_offsets": "Q", "edge_next": "I", "edge_count": "Q",
+    "context_top": "i", "escape_indexes": "Q", "escape_counts": "Q",
+}   # typecodes of array sections, edge_count has the typecode of the count encoding
+_HEADER = struct.Struct("<8sII")    # magic, format version, number of sections
+_COMPRESSED_HEADER = struct.Struct("<8sQQ")     # magic, size of the decompressed dump, length of metadata
+_SECTION_ENTRY = struct.Struct("<QQ")   # offset and length of a section
+_ID_BITS = 32   # number of bits reserved for one id inside a packed context key
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def write_store(store: NgramStore, file: BinaryIO, metadata: dict = None, count_encoding: str = "raw",
+                compression: str = "none") -> None:
+    """
+    Write store to binary file in the dump layout:
+    header, section table, then sections aligned to 8 bytes.
+    Array sections are written in the native byte order, which is recorded in metadata.
+
+    count_encoding is one of COUNT_ENCODINGS: raw 64-bit counts, narrow counts of the least typecode
+    holding the largest count, quantized counts of QUANTIZERS with escaped counts in the escape sections,
+    or varint with continuations of every context stored as varints in edge_next, edge_offsets are then
+    byte offsets. The most frequent continuations are chosen by exact counts for every encoding.
+    With lzma compression the whole dump is compressed, so it is decompressed into memory on opening.
+    Metadata of a compressed dump is also written uncompressed before it, so it is read by read_dump_info
+    without decompression.
+    """
+    validate_encoding(count_encoding, compression)
+    tables = store.to_sorted_tables()
+    token_blob = bytearray()
+    token_offsets = array("Q", [0])
+    for token in tables.tokens:
+        token_blob += token.encode("UTF-8")
+        token_offsets.append(len(token_blob))
+    metadata = dict(metadata if metadata else {})
+    metadata.update(
+        continuations_count=store.continuations_count, byteorder=sys.byteorder, count_encoding=count_encoding
+    )
+    edge_offsets, edge_next, edge_count = tables.edge_offsets, tables.edge_next, tables.edge_count
+    escape_indexes = escape_counts = array("Q")
+    if count_encoding == "narrow":
+        edge_count = array(narrowest_typecode(max(edge_count, default=0)), edge_count)
+    elif count_encoding in QUANTIZERS:
+        edge_count, escape_indexes, escape_counts = quantize_counts(edge_count, QUANTIZERS[count_encoding])
+    elif count_encoding == "varint":
+        edge_offsets, edge_next = encode_varint_edges(edge_offsets, edge_next, edge_count)
+        edge_count = array("Q")
+    metadata.update(count_typecode=edge_count.typecode)
+    sections = {
+        "metadata": json.dumps(metadata).encode("UTF-8"),
+        "token_offsets": token_offsets.tobytes(),
+        "token_blob": bytes(token_blob),
+        "context_keys": tables.context_keys.tobytes(),
+        "edge_offsets": edge_offsets.tobytes(),
+        "edge_next": edge_next if isinstance(edge_next, bytes) else edge_next.tobytes(),
+        "edge_count": edge_count.tobytes(),
+        "context_top": tables.context_top.tobytes(),
+        "escape_indexes": escape_indexes.tobytes(),
+        "escape_counts": escape_counts.tobytes(),
+    }
+    if compression == "lzma":
+        image = io.BytesIO()
+        _write_sections(image, sections)
+        file.write(_COMPRESSED_HEADER.pack(COMPRESSED_MAGIC, image.tell(), len(sections["metadata"])))
+        file.write(sections["metadata"])
+        file.write(lzma.compress(image.getvalue()))
+    else:
+        _write_sections(file, sections)
+
+
+def _write_sections(file: BinaryIO, sections: Dict[str, bytes]) -> None:
+    """Write header, section table and sections aligned to 8 bytes."""
+    offset = _align(_HEADER.size + _SECTION_ENTRY.size * len(SECTIONS))
+    table = []
+    for name in SECTIONS:
+        table.append(_SECTION_ENTRY.pack(offset, len(sections[name])))
+        offset = _align(offset + len(sections[name]))
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS)))
+    file.write(b"".join(table))
+    for name in SECTIONS:
+        file.write(b"\0" * (_align(file.tell()) - file.tell()))
+        file.write(sections[name])
+
+
+class DumpInfo(NamedTuple):
+    """Metadata of a binary dump and its size in bytes, the decompressed size for a compressed dump."""
+    metadata: dict
+    size: int
+
+
+def read_dump_info(path: str) -> DumpInfo:
+    """Return metadata and size of binary dump by path, only its headers and metadata are read."""
+    with open(path, "rb") as file:
+        header = file.read(max(_HEADER.size, _COMPRESSED_HEADER.size))
+        if header.startswith(COMPRESSED_MAGIC):
+            _, size, metadata_length = _COMPRESSED_HEADER.unpack_from(header)
+            file.seek(_COMPRESSED_HEADER.size)
+            return DumpInfo(json.loads(file.read(metadata_length)), size)
+        magic, version, sections_count = _HEADER.unpack_from(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a text generator dump")
+        if sections_count != len(VERSION_SECTIONS.get(version, ())):
+            raise ValueError(f"{path} has unsupported format version {version}")
+        file.seek(_HEADER.size)
+        offset, length = _SECTION_ENTRY.unpack(file.read(_SECTION_ENTRY.size))   # metadata is the first section
+        file.seek(offset)
+        return DumpInfo(json.loads(file.read(length)), os.fstat(file.fileno()).st_size)
+
+
+def _align(offset: int) -> int:
+    """Return offset rounded up to 8 bytes."""
+    return (offset + 7) & ~7
+
+
+class MappedNgramStore(Mapping):
+    """
+    Class describing read-only ngram store opened from a binary dump via mmap.
+
+    Only the header is read on opening, tables are accessed through memoryviews of the mapping,
+    so pages are read lazily by lookups. Lookups use binary search over the sorted tables.
+    Counts replayed from the journal of the dump are kept in memory over the mapped tables.
+    """
+    read_only = True
+    root_context = 0
+    _load_batch_size = 100000   # number of ngrams added to NgramStore at once by as_ngram_store
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = self._mmap     # bytes of the dump, decompressed into memory if the dump is compressed
+        if self._mmap[:len(COMPRESSED_MAGIC)] == COMPRESSED_MAGIC:
+            _, _, metadata_length = _COMPRESSED_HEADER.unpack_from(self._mmap, 0)
+            self._data = lzma.decompress(self._mmap[_COMPRESSED_HEADER.size + metadata_length:])
+            self._mmap.close()
+        magic, version, sections_count = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a text generator dump")
+        if sections_count != len(VERSION_SECTIONS.get(version, ())):
+            raise ValueError(f"{path} has unsupported format version {version}")
+
+        view = memoryview(self._data)
+        sections = {}
+        for index, name in enumerate(VERSION_SECTIONS[version]):
+            offset, length = _SECTION_ENTRY.unpack_from(self._data, _HEADER.size + _SECTION_ENTRY.size * index)
+            sections[name] = view[offset:offset + length]
+            if name == "token_blob":
+                self._token_blob_offset = offset
+        self._metadata = json.loads(bytes(sections["metadata"]).decode("UTF-8"))
+        if self._metadata["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a machine with another byte order")
+
+        self._views = []    # memoryviews of sections kept by the store, released on closing
+        self._continuations_count = self._metadata["continuations_count"]
+        self._token_offsets = self._cast(sections["token_offsets"], SECTION_TYPECODES["token_offsets"])
+        self._context_keys = self._cast(sections["context_keys"], SECTION_TYPECODES["context_keys"])
+        self._edge_offsets = self._cast(sections["edge_offsets"], SECTION_TYPECODES["edge_offsets"])
+        self._context_top = self._cast(sections["context_top"], SECTION_TYPECODES["context_top"])
+        self._count_encoding = self._metadata.get("count_encoding", "raw")
+        self._edge_blob = None  # varints of continuations of the varint encoding
+        self._edge_next = self._edge_count = None
+        if self._count_encoding == "varint":
+            self._edge_blob = self._cast(sections["edge_next"], "B")
+        else:
+            self._edge_next = self._cast(sections["edge_next"], SECTION_TYPECODES["edge_next"])
+            self._edge_count = self._cast(
+                sections["edge_count"], self._metadata.get("count_typecode", SECTION_TYPECODES["edge_count"])
+            )
+        if self._count_encoding in QUANTIZERS:
+            self._edge_count = QuantizedCounts(
+                self._edge_count, QUANTIZERS[self._count_encoding],
+                self._cast(sections["escape_indexes"], SECTION_TYPECODES["escape_indexes"]),
+                self._cast(sections["escape_counts"], SECTION_TYPECODES["escape_counts"]),
+            )
+        self._contexts_count = None     # number of contexts having continuations, counted on demand
+        self._changes = {}  # context -> Counter of counts added by the journal
+        self._changed_tops = {}     # context -> the most frequent continuations of changed context, built on demand
+        self._sampling_tables = SamplingTableCache()    # context id or text of changed context -> sampling table
+
+    def _cast(self, section: memoryview, typecode: str) -> memoryview:
+        """Return view of section as an array of typecode, it is released on closing."""
+        view = section.cast(typecode)
+        self._views.append(view)
+        return view
+
+    @property
+    def metadata(self) -> dict:
+        return self._metadata
+
+    @property
+    def count_encoding(self) -> str:
+        return self._count_encoding
+
+    @property
+    def continuations_count(self) -> int:
+        return self._continuations_count
+
+    @property
+    def tokens_count(self) -> int:
+        return len(self._token_offsets) - 1
+
+    def _get_encoded_token(self, token_id: int) -> bytes:
+        """Return UTF-8 encoded token by its id."""
+        start = self._token_blob_offset + self._token_offsets[token_id]
+        return self._data[start:start + self._token_offsets[token_id + 1] - self._token_offsets[token_id]]
+
+    def _get_token(self, token_id: int) -> str:
+        """Return token by its id."""
+        return str(self._get_encoded_token(token_id), "UTF-8")
+
+    def _get_token_id(self, token: str) -> int:
+        """Return id of token or -1 if token is unknown, tokens are sorted, so binary search is used."""
+        encoded_token = token.encode("UTF-8")
+        low, high = 0, self.tokens_count
+        while low < high:
+            middle = (low + high) // 2
+            middle_token = self._get_encoded_token(middle)
+            if middle_token < encoded_token:
+                low = middle + 1
+            elif middle_token == encoded_token:
+                return middle
+            else:
+                high = middle
+        return -1
+
+    def _find_context(self, text: str) -> int:
+        """Return id of context by its text or -1 if context is unknown."""
+        context = 0
+        for token in text.split(" "):
+            token_id = self._get_token_id(token)
+            if token_id < 0:
+                return -1
+            key = context << _ID_BITS | token_id
+            index = bisect.bisect_left(self._context_keys, key)
+            if index == len(self._context_keys) or self._context_keys[index] != key:
+                return -1
+            context = index + 1
+        return context
+
+    def _has_continuations(self, context: int) -> bool:
+        return context >= 0 and self._edge_offsets[context] != self._edge_offsets[context + 1]
+
+    def _context_text(self, context: int) -> str:
+        """Return text of context by its id."""
+        tokens = []
+        while context != 0:
+            key = self._context_keys[context - 1]
+            tokens.append(self._get_token(key & _ID_MASK))
+            context = key >> _ID_BITS
+        return " ".join(reversed(tokens))
+
+    def _get_top(self, context: int) -> List[str]:
+        """Return the most frequent continuations of context."""
+        start = context * self._continuations_count
+        return [
+            self._get_token(next_id)
+            for next_id in self._context_top[start:start + self._continuations_count] if next_id >= 0
+        ]
+
+    def _get_edges(self, context: int) -> tuple[Sequence[int], Sequence[int]]:
+        """Return next ids and counts of continuations of context, counts are decoded by the count encoding."""
+        start, end = self._edge_offsets[context], self._edge_offsets[context + 1]
+        if self._edge_blob is not None:
+            return decode_varint_edges(self._edge_blob, start, end)
+        return self._edge_next[start:end], self._edge_count[start:end]
+
+    def _get_count_dict(self, context: int) -> Counter:
+        """Return count dictionary of continuations of context."""
+        return Counter({self._get_token(next_id): count for next_id, count in zip(*self._get_edges(context))})
+
+    def add_changes(self, count_dict: Dict[str, Dict[str, int]]) -> None:
+        """Add counts of count_dict, e.g. replayed from the journal, over the mapped tables."""
+        for context, counts in count_dict.items():
+            if counts:
+                self._changes.setdefault(context, Counter()).update(counts)
+                self._changed_tops.pop(context, None)
+        self._sampling_tables.discard(count_dict)
+        self._contexts_count = None
+
+    def get_continuations(self, context: str) -> Optional[List[str]]:
+        """Return the most frequent continuations of context or None if context is unknown."""
+        if context in self._changes:
+            top = self._changed_tops.get(context)
+            if top is None:
+                top = self._changed_tops[context] = self[context].most_frequently_continuations
+            return top
+        context_id = self._find_context(context)
+        if not self._has_continuations(context_id):
+            return None
+        return self._get_top(context_id)
+
+    def get_token_id(self, token: str) -> int:
+        """Return id of token or -1 if token is unknown."""
+        return self._get_token_id(token)
+
+    def get_token(self, token_id: int) -> str:
+        """Return token by its id."""
+        return self._get_token(token_id)
+
+    def get_child_context(self, context: int, token_id: int) -> int:
+        """Return id of context extended by token_id or -1 if it is unknown."""
+        key = context << _ID_BITS | token_id
+        index = bisect.bisect_left(self._context_keys, key)
+        return index + 1 if index != len(self._context_keys) and self._context_keys[index] == key else -1
+
+    def get_top_ids(self, context: int) -> List[int]:
+        """Return token ids of the most frequent continuations of context, empty if it has no continuations."""
+        start = context * self._continuations_count
+        return [next_id for next_id in self._context_top[start:start + self._continuations_count] if next_id >= 0]
+
+    def get_sampling_table(self, context: int, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of all continuations of context or None if it has no continuations."""
+        table = self._sampling_tables.get(context, settings)
+        if table is None:
+            if not self._has_continuations(context):
+                return None
+            next_ids, counts = self._get_edges(context)
+            table = self._sampling_tables.put(context, build_sampling_table(
+                settings, [self._get_token(next_id) for next_id in next_ids], list(counts),
+            ))
+        return table
+
+    def get_sampling_table_by_text(self, context: str, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of all continuations of context or None if context is unknown."""
+        if context not in self._changes:
+            return self.get_sampling_table(self._find_context(context), settings)
+        table = self._sampling_tables.get(context, settings)
+        if table is None:
+            count_dict = self[context]._count_dict
+            table = self._sampling_tables.put(
+                context, build_sampling_table(settings, list(count_dict), list(count_dict.values()))
+            )
+        return table
+
+    def context_cursor(self, words: List[str], max_length: int):
+        """
+        Return cursor over contexts of up to max_length last words, which is moved by generated words.
+        Changes replayed from the journal are kept by context text, so then contexts are looked up by text.
+        """
+        if self._changes:
+            return TextContextCursor(self, words, max_length)
+        return ContextCursor(self, words, max_length)
+
+    def as_ngram_store(self) -> NgramStore:
+        """Load all ngrams into a new NgramStore, which can be updated, the loaded counts are marked as saved."""
+        tokens = [self._get_token(token_id) for token_id in range(self.tokens_count)]
+        context_ngrams = [()]   # token ids of contexts, parents precede children in the sorted table
+        for key in self._context_keys:
+            context_ngrams.append(context_ngrams[key >> _ID_BITS] + (key & _ID_MASK,))
+        store = NgramStore(self._continuations_count)
+        ngram_counts = Counter()
+        for context, ngram in enumerate(context_ngrams):
+            for next_id, count in zip(*self._get_edges(context)):
+                ngram_counts[ngram + (next_id,)] = count
+            if len(ngram_counts) >= MappedNgramStore._load_batch_size:
+                store.update_by_id_counts(tokens, ngram_counts)
+                ngram_counts = Counter()
+        store.update_by_id_counts(tokens, ngram_counts)
+        store.update_by_count_dict(self._changes)
+        store.mark_saved()
+        return store
+
+    def memory_size(self) -> int:
+        """Return number of bytes of the mapped dump, all of its pages may become resident, and of replayed changes."""
+        return len(self._data) + sum(
+            sys.getsizeof(context) + sys.getsizeof(counts) for context, counts in self._changes.items()
+        )
+
+    def close(self) -> None:
+        """Release memoryviews and close the mapping."""
+        for view in self._views:
+            view.release()
+        self._mmap.close()
+
+    def __getitem__(self, context: str) -> Ngram:
+        context_id = self._find_context(context)
+        if context in self._changes:
+            count_dict = self._get_count_dict(context_id) if self._has_continuations(context_id) else Counter()
+            count_dict.update(self._changes[context])
+            return Ngram(text=context, count_dict=count_dict, continuations_count=self._continuations_count)
+        if not self._has_continuations(context_id):
+            raise KeyError(context)
+        return Ngram(
+            text=context,
+            count_dict=self._get_count_dict(context_id),
+            most_frequently_continuations_list=self._get_top(context_id),
+            continuations_count=self._continuations_count,
+        )
+
+    def __contains__(self, context) -> bool:
+        return isinstance(context, str) and (
+            context in self._changes or self._has_continuations(self._find_context(context))
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for context in range(1, len(self._edge_offsets) - 1):
+            if self._has_continuations(context):
+                yield self._context_text(context)
+        for context in self._changes:
+            if not self._has_continuations(self._find_context(context)):
+                yield context
+
+    def __len__(self) -> int:
+        if self._contexts_count is None:
+            self._contexts_count = sum(
+                1 for context in range(len(self._edge_offsets) - 1) if self._has_continuations(context)
+            ) + sum(1 for context in self._changes if not self._has_continuations(self._find_context(context)))
+        return self._contexts_count
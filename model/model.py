@@ -1,58 +1,218 @@
+import os
+from typing import Optional
+
 from model.file_handler import FileHandler
+from model.count_min_sketch import SketchReport, SketchSettings
+from model.generation_cache import GenerationCache
+from model.generation_settings import GenerationSettings
+from model.ingest_progress import IngestMonitor
+from model.model_registry import ModelRegistry
+from model.pruning import PruningPolicy, PruningReport
 from model.text_generator import TextGenerator
 
 
 class Model:
     """Class describing model."""
-    def __init__(self, file_name=""):
+    _memory_budget_mb = 512     # memory budget of text generators kept resident by the registry, in MiB
+    _generation_cache_size = 10000  # number of cached generations, 0 disables the cache
+    _generation_cache_ttl = 0   # lifetime of cached generations in seconds, 0 means they do not expire
+
+    def __init__(self, file_name="", registry: ModelRegistry = None, generation_cache: GenerationCache = None,
+                 settings: GenerationSettings = None):
         """
         Initializes model.
 
-        file_name is name of the currently open dictionary.
+        file_name is name of the currently open dictionary, its text generator is loaded on first use.
+        registry keeps text generators of recently used dictionaries, it may be shared by several models.
+        generation_cache keeps words generated with a seed, it may be shared by several models too,
+        by default a cache with the size of config is created.
+        settings are the generation settings used when a call does not give its own, default ones if None.
         """
         self._dictionary_name = file_name
-        if file_name:
-            self._text_generator = FileHandler.read_data(file_name)
-            if self._text_generator._text_parser is None:
-                self._text_generator = TextGenerator()
-                self._dictionary_name = file_name
+        self._registry = registry if registry else Model.create_registry()
+        self._generation_cache = generation_cache if generation_cache else Model.create_generation_cache()
+        self._settings = settings if settings is not None else GenerationSettings()
+
+    @staticmethod
+    def create_registry() -> ModelRegistry:
+        """Create registry of text generators loaded from dumps with the memory budget of config."""
+        return ModelRegistry(Model._load_text_generator, Model._memory_budget_mb << 20)
+
+    @staticmethod
+    def create_generation_cache() -> Optional[GenerationCache]:
+        """Create cache of generations with the size and lifetime of config, None if the cache is disabled."""
+        if Model._generation_cache_size == 0:
+            return None
+        return GenerationCache(Model._generation_cache_size, Model._generation_cache_ttl)
+
+    @staticmethod
+    def _load_text_generator(file_name: str) -> TextGenerator:
+        """Load text generator from dump of dictionary file_name."""
+        text_generator = FileHandler.read_data(file_name)
+        if text_generator._text_parser is None:
+            text_generator = TextGenerator()
+        return text_generator
 
     @property
     def dictionary_name(self):
         return self._dictionary_name
 
-    def _update_text_generator(self, text: str) -> None:
-        """Update dictionaries inside text_generator."""
-        self._text_generator.update_dicts_by_text(text)
+    @property
+    def registry(self) -> ModelRegistry:
+        return self._registry
+
+    @property
+    def settings(self) -> GenerationSettings:
+        return self._settings
+
+    @property
+    def generation_cache(self) -> Optional[GenerationCache]:
+        return self._generation_cache
+
+    def _discard_generations(self) -> None:
+        """Discard cached generations of the current dictionary after it has been changed."""
+        if self._generation_cache:
+            self._generation_cache.discard_dictionary(self._dictionary_name)
+
+    def _get_text_generator(self) -> TextGenerator:
+        """Return text generator of the current dictionary from the registry."""
+        return self._registry.get(self._dictionary_name)
 
-    def read_and_update(self, path: str) -> None:
-        """Read text file by path and update text_generator by it."""
-        self._update_text_generator(FileHandler.read_file(path))
-        self.save_model(self._dictionary_name)
+    def read_and_update(self, path: str, monitor: IngestMonitor = None, pruning: PruningPolicy = None,
+                        sketch: SketchSettings = None) -> Optional[SketchReport]:
+        """Read text file by path chunk by chunk and update text_generator by it."""
+        return self.read_and_update_files([path], monitor, pruning, sketch)
+
+    def read_and_update_files(self, paths: list[str], monitor: IngestMonitor = None, pruning: PruningPolicy = None,
+                              sketch: SketchSettings = None) -> Optional[SketchReport]:
+        """
+        Read text files by paths chunk by chunk and update text_generator by them,
+        the added counts are appended to the journal of the model dump once.
+
+        A copy of the text generator is updated and then published in the registry at once, so generation
+        keeps using the previous version until the update is complete and never sees partially updated counts.
+        Updates of one dictionary are applied one by one. If a file can not be decoded or the update
+        is cancelled by monitor, the copy is dropped. monitor gets read bytes and counted ngrams.
+        With pruning the ngrams are pruned during and after the update, then the whole dump is rewritten.
+        With sketch only ngrams frequent by Count-Min Sketch are added, two pass settings read the files twice,
+        and the report of the sketch is returned.
+        """
+        name = self._dictionary_name
+        with self._registry.update_lock(name):
+            text_generator = self._registry.get(name).copy()
+            chunk_streams = (FileHandler.read_file_chunks(path) for path in paths)
+            if monitor:
+                chunk_streams = (
+                    monitor.track_chunks(chunks, os.path.getsize(path)) for chunks, path in zip(chunk_streams, paths)
+                )
+            report = None
+            if sketch:
+                first_pass_chunk_streams = (FileHandler.read_file_chunks(path) for path in paths)
+                report = text_generator.update_dicts_by_sketch(chunk_streams, sketch, monitor, first_pass_chunk_streams)
+                if pruning:
+                    text_generator.prune(pruning)
+            else:
+                text_generator.update_dicts_by_chunk_streams(chunk_streams, monitor, pruning)
+            if monitor:
+                monitor.check()
+            if pruning:
+                FileHandler.write_data(text_generator, name)
+            else:
+                FileHandler.append_changes(text_generator, name)
+            self._registry.put(name, text_generator)
+        if self._generation_cache:
+            self._generation_cache.discard_dictionary(name)
+        return report
+
+    def prune(self, policy: PruningPolicy) -> Optional[PruningReport]:
+        """
+        Prune ngrams of the current dictionary by policy, save its dump and return the report of pruning.
+        As updates do, pruning publishes a pruned copy, so generation is not interrupted.
+        """
+        if not self._dictionary_name:
+            return None
+        name = self._dictionary_name
+        with self._registry.update_lock(name):
+            text_generator = self._registry.get(name).copy()
+            report = text_generator.prune(policy)
+            FileHandler.write_data(text_generator, name)
+            self._registry.put(name, text_generator)
+        self._discard_generations()
+        return report
 
     def save_model(self, file_name) -> None:
         """Saves generator of the current model in a file named file_name."""
-        FileHandler.write_data(self._text_generator, file_name)
+        FileHandler.write_data(self._get_text_generator(), file_name)
+
+    def generate(self, input: str, seed: int = None, settings: GenerationSettings = None) -> str:
+        """
+        Generate text by input in text generator with settings, settings of the model if they are None.
+        The text is reproduced by the same seed and settings.
 
-    def generate(self, input: str) -> str:
-        """Generate text by input in text generator."""
+        Words generated with seed are cached by the dictionary, its version, the context tail of input,
+        generation settings and seed, so inputs ending with the same words are generated once.
+        """
         if self._dictionary_name:
-            return self._text_generator.continue_phrase(input)
+            settings = settings if settings is not None else self._settings
+            text_generator = self._get_text_generator()
+            if seed is None or self._generation_cache is None:
+                return text_generator.continue_phrase(input, seed, settings=settings)
+            words = text_generator.parse_prompt(input)
+            key = (self._dictionary_name, text_generator.version, text_generator.context_tail(words), settings, seed)
+            generated_words = self._generation_cache.get(key)
+            if generated_words is None:
+                generated_words = self._generation_cache.put(
+                    key, tuple(text_generator.generate_words(words, seed, settings=settings))
+                )
+            return " ".join([*words, *generated_words])+"."
+
+    def generate_batch(self, inputs: list[str], n_per_input: int = 1, seed: int = None,
+                       settings: GenerationSettings = None) -> list[list[str]]:
+        """
+        Generate n_per_input texts by every input in text generator with settings, settings of the model
+        if they are None. Results are in the order of inputs.
+        """
+        if self._dictionary_name:
+            settings = settings if settings is not None else self._settings
+            return self._get_text_generator().generate_batch(inputs, n_per_input, seed, settings)
 
     def open_model(self, file_name) -> None:
-        """Open text generator model by file_name of his dump."""
-        self._text_generator = FileHandler.read_data(file_name)
+        """Open text generator model by file_name of his dump, it is loaded only if it is not resident."""
+        self._registry.get(file_name)
         self._dictionary_name = file_name
 
-    def create_new(self, file_name) -> None:
-        """Create new text generator and save current."""
+    def create_new(self, file_name, tokenizer: str = "default", order: int = 3, continuations_count: int = 2) -> None:
+        """
+        Create new text generator with tokenizer, ngram order and number of the most frequent continuations
+        the next word is chosen from, and save current.
+        """
         self._dictionary_name = file_name
-        self._text_generator = TextGenerator()
+        self._discard_generations()
+        self._registry.put(
+            file_name, TextGenerator(continuations_count=continuations_count, tokenizer=tokenizer, order=order)
+        )
         self.save_model(file_name)
 
     def delete(self) -> None:
         """Delete current text generator and create empty."""
         if self.dictionary_name:
-            FileHandler.delete_file(self._dictionary_name)
+            with self._registry.update_lock(self._dictionary_name):
+                self._registry.discard(self._dictionary_name)
+                self._discard_generations()
+                FileHandler.delete_file(self._dictionary_name)
             self._dictionary_name = ""
-            self._text_generator = None
+
+    @classmethod
+    def set_memory_budget_mb(cls, value: int) -> None:
+        """set memory_budget_mb"""
+        cls._memory_budget_mb = value
+
+    @classmethod
+    def set_generation_cache_size(cls, value: int) -> None:
+        """set generation_cache_size"""
+        cls._generation_cache_size = value
+
+    @classmethod
+    def set_generation_cache_ttl(cls, value: int) -> None:
+        """set generation_cache_ttl"""
+        cls._generation_cache_ttl = value
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Callable, Optional
+
+from model.text_generator import TextGenerator
+
+
+class ModelRegistry:
+    """
+    Class describing cache of text generators of several dictionaries under a memory budget.
+
+    Text generators are loaded lazily on first use, when their total approximate size
+    exceeds the budget, the least recently used ones are evicted. The last used text generator
+    is kept even if it alone exceeds the budget. Methods may be called from several threads,
+    a dictionary is loaded outside the registry lock, so loading does not block getting other dictionaries.
+    """
+
+    def __init__(self, loader: Callable[[str], TextGenerator], memory_budget: int):
+        """loader loads text generator by dictionary name, memory_budget is in bytes."""
+        self._loader = loader
+        self._memory_budget = memory_budget
+        self._text_generators = OrderedDict()   # dictionary name -> (text generator, size), the last is the newest
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._update_locks = {}     # dictionary name -> lock held while the dictionary is being updated
+        self._load_locks = {}   # dictionary name -> lock held while the dictionary is being loaded
+        self._generations = {}  # dictionary name -> number of puts and discards of the dictionary
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    @property
+    def memory_budget(self) -> int:
+        return self._memory_budget
+
+    def get(self, name: str) -> TextGenerator:
+        """
+        Return text generator of dictionary name, it is loaded if it is not resident.
+        Concurrent gets of one dictionary load it once. A text generator loaded while the dictionary
+        was put or discarded is returned but not made resident, as it may be older than the put or discarded one.
+        """
+        with self._lock:
+            text_generator = self._get_resident(name)
+            if text_generator is not None:
+                return text_generator
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            with self._lock:
+                text_generator = self._get_resident(name)   # loaded by another thread meanwhile
+                if text_generator is not None:
+                    return text_generator
+                self._misses += 1
+                generation = self._generations.get(name, 0)
+            start = time.perf_counter()
+            text_generator = self._loader(name)
+            with self._lock:
+                self._load_seconds += time.perf_counter() - start
+                if self._generations.get(name, 0) != generation:
+                    if name in self._text_generators:   # put while loading, e.g. by an update, is newer
+                        return self._text_generators[name][0]
+                    return text_generator
+                self._put(name, text_generator)
+                return text_generator
+
+    def _get_resident(self, name: str) -> Optional[TextGenerator]:
+        """Return resident text generator of dictionary name counting a hit, None if it is not resident."""
+        entry = self._text_generators.get(name)
+        if entry is None:
+            return None
+        self._hits += 1
+        self._text_generators.move_to_end(name)
+        return entry[0]
+
+    def update_lock(self, name: str) -> threading.Lock:
+        """Return lock of dictionary name, updates of one dictionary hold it, so they are applied one by one."""
+        with self._lock:
+            return self._update_locks.setdefault(name, threading.Lock())
+
+    def put(self, name: str, text_generator: TextGenerator) -> None:
+        """Make text generator resident as the dictionary name, e.g. after creation or update of the dictionary."""
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            self._put(name, text_generator)
+
+    def _put(self, name: str, text_generator: TextGenerator) -> None:
+        self._discard(name)
+        size = text_generator.memory_size()
+        self._text_generators[name] = (text_generator, size)
+        self._memory_size += size
+        while self._memory_size > self._memory_budget and len(self._text_generators) > 1:
+            self._discard(next(iter(self._text_generators)))
+            self._evictions += 1
+
+    def discard(self, name: str) -> None:
+        """Evict text generator of dictionary name, the next get loads it again."""
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            self._discard(name)
+
+    def _discard(self, name: str) -> None:
+        entry = self._text_generators.pop(name, None)
+        if entry is not None:
+            self._memory_size -= entry[1]
+
+    def stats(self) -> dict:
+        """Return counters of hits, misses, evictions, total load time and resident dictionaries."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "load_seconds": self._load_seconds,
+                "resident": list(self._text_generators),
+                "memory_size": self._memory_size,
+            }
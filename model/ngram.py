@@ -1,60 +1,82 @@
 import random
+from typing import List
 
 from model.frequency_analyzer import FrequencyAnalyzer
 
 
+def choose_dot_is_possible(continuations: List[str], rng: random.Random = None) -> str:
+    """Return random one from the list of continuations, but if possible a dot. rng is random module by default."""
+    rng = rng if rng else random
+    if "." in continuations:
+        return "."
+    else:
+        return rng.choice(continuations)
+
+
+def choose_not_dot_is_possible(continuations: List[str], rng: random.Random = None) -> str:
+    """Return random one from the list of continuations, but if possible not a dot. rng is random module by default."""
+    rng = rng if rng else random
+    if "." not in continuations:
+        return rng.choice(continuations)
+    not_dot_continuations = [word for word in continuations if word != "."]
+    if not_dot_continuations:
+        return rng.choice(not_dot_continuations)
+    else:
+        return "."
+
+
 class Ngram():
     """Class describing ngram."""
 
-    def __init__(self, text, count_dict=None, most_frequently_continuations_list=None):
+    _continuations_count = 2    # number of the most frequent continuations kept by default
+
+    def __init__(self, text, count_dict=None, most_frequently_continuations_list=None, continuations_count=2):
         """
         Initialize the class with text and optional count_dict and most_frequently_continued_list.
 
         The default values for count_dict are assigned for testing convenience.
         In a real-world scenario, this arguments should always be provided with actual data.
+        continuations_count is the number of the most frequent continuations kept.
         """
         self._frequency_analyzer = FrequencyAnalyzer()
         self._text = text
         self._count_dict = count_dict
+        self._continuations_count = continuations_count
         self._most_frequently_continuations_list = (
-            most_frequently_continuations_list
+            list(most_frequently_continuations_list)
             if most_frequently_continuations_list
-            else self._frequency_analyzer.get_2_most_frequently_continuation(count_dict)
+            else self._frequency_analyzer.get_most_frequently_continuations(count_dict, continuations_count)
         )
 
     def update_dicts(self, input_count_dict) -> None:
         """
         Adds the values of the input count dictionary to the values of current count dictionary
-        then finds the new most frequent continuations.
+        and updates the most frequent continuations by each changed continuation.
         """
-        self._count_dict += input_count_dict
-        self._update_most_frequently_continued_list()
+        for word, count in input_count_dict.items():
+            self._count_dict[word] = self._count_dict.get(word, 0) + count
+            self._update_most_frequently_continued_list(word)
 
-    def _update_most_frequently_continued_list(self):
-        """Update the the most frequent continuations by current count_dict."""
-        self._most_frequently_continuations_list = (
-            self._frequency_analyzer.get_2_most_frequently_continuation(
-                self._count_dict
-            )
+    def _update_most_frequently_continued_list(self, word: str) -> None:
+        """Update the the most frequent continuations after the count of word has been increased."""
+        self._frequency_analyzer.update_most_frequently_continuations(
+            self._most_frequently_continuations_list,
+            word,
+            lambda continuation: (-self._count_dict[continuation], continuation),
+            self._continuations_count,
         )
 
-    def get_next_word_dot_is_possible(self) -> str:
+    @property
+    def most_frequently_continuations(self) -> List[str]:
+        return self._most_frequently_continuations_list
+
+    def get_next_word_dot_is_possible(self, rng: random.Random = None) -> str:
         """Return random one from the list of the most frequent continuations, but if possible a dot."""
-        if "." in self._most_frequently_continuations_list:
-            return "."
-        else:
-            return random.choice(self._most_frequently_continuations_list)
+        return choose_dot_is_possible(self._most_frequently_continuations_list, rng)
 
-    def get_next_word_not_dot_is_possible(self) -> str:
+    def get_next_word_not_dot_is_possible(self, rng: random.Random = None) -> str:
         """Return random one from the list of the most frequent continuations, but if possible not a dot."""
-        if "." not in self._most_frequently_continuations_list:
-            return random.choice(self._most_frequently_continuations_list)
-        elif self._most_frequently_continuations_list[0] != ".":
-            return self._most_frequently_continuations_list[0]
-        elif len(self._most_frequently_continuations_list) > 1:
-            return self._most_frequently_continuations_list[1]
-        else:
-            return "."
+        return choose_not_dot_is_possible(self._most_frequently_continuations_list, rng)
 
     def __eq__(self, other) -> bool:
         """Ngrams are equal when their count dictionaries and most frequently continuations list are equal."""
@@ -62,3 +84,4 @@ class Ngram():
             return self._text == other._text and self._count_dict == other._count_dict and (
                 self._most_frequently_continuations_list == other._most_frequently_continuations_list)
         return False
+
@@ -0,0 +1,655 @@
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from copy import deepcopy
+from itertools import chain
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from model.context_cursor import ContextCursor, TextContextCursor
+from model.count_encoding import narrowest_typecode
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.ngram import Ngram
+from model.pruning import PruningPolicy, eviction_order, fit_memory
+from model.sampling import SamplingSettings, SamplingTable, SamplingTableCache, build_sampling_table
+
+
+_ID_BITS = 32   # number of bits reserved for one id inside a packed key
+
+
+def _array_size(column: array) -> int:
+    """Return number of bytes allocated for items of array."""
+    return column.buffer_info()[1] * column.itemsize
+
+
+class IntIndex:
+    """
+    Class describing hash table of non-negative integer keys to non-negative integer values.
+
+    Keys and values are kept in two arrays with open addressing and linear probing,
+    so an entry costs 12 bytes of the table instead of a dict entry with two int objects.
+    Keys must be less than 2**63, values less than 2**31.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._allocate(3)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _allocate(self, bits: int) -> None:
+        """Allocate empty table of 2**bits slots."""
+        self._shift = 64 - bits
+        self._mask = (1 << bits) - 1
+        self._keys = array("q", [-1]) * (1 << bits)
+        self._values = array("i", [-1]) * (1 << bits)
+
+    def _slot(self, key: int) -> int:
+        """Return slot where key is stored or empty slot where it should be stored."""
+        keys = self._keys
+        slot = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self._shift     # Fibonacci hashing
+        stored = keys[slot]
+        while stored != key and stored >= 0:
+            slot = (slot + 1) & self._mask
+            stored = keys[slot]
+        return slot
+
+    def get(self, key: int, default: int = -1) -> int:
+        """Return value by key or default if key is absent."""
+        slot = self._slot(key)
+        return self._values[slot] if self._keys[slot] >= 0 else default
+
+    def setdefault(self, key: int, value: int) -> int:
+        """Return value by key, if key is absent set it to value and return value."""
+        slot = self._slot(key)
+        if self._keys[slot] >= 0:
+            return self._values[slot]
+        if 3 * (self._size + 1) > 2 * len(self._keys):
+            self._grow()
+            slot = self._slot(key)
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._size += 1
+        return value
+
+    def set(self, key: int, value: int) -> None:
+        """Set value by key."""
+        if self.setdefault(key, value) != value:
+            self._values[self._slot(key)] = value
+
+    def memory_size(self) -> int:
+        """Return number of bytes of the table."""
+        return _array_size(self._keys) + _array_size(self._values)
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        """Iterate over (key, value) pairs in the order of slots."""
+        for key, value in zip(self._keys, self._values):
+            if key >= 0:
+                yield key, value
+
+    def _grow(self) -> None:
+        """Double the table and reinsert all entries."""
+        items = list(self.items())
+        self._allocate(64 - self._shift + 1)
+        for key, value in items:
+            slot = self._slot(key)
+            self._keys[slot] = key
+            self._values[slot] = value
+
+
+class Vocabulary:
+    """Class describing vocabulary which interns every token to an integer id."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __contains__(self, token) -> bool:
+        return token in self._ids
+
+    def intern(self, token: str) -> int:
+        """Return id of token, a new id is assigned to the token met for the first time."""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = len(self._tokens)
+            self._ids[token] = token_id
+            self._tokens.append(token)
+        return token_id
+
+    def get_id(self, token: str) -> int:
+        """Return id of token or -1 if token is unknown."""
+        return self._ids.get(token, -1)
+
+    def get_token(self, token_id: int) -> str:
+        """Return token by its id."""
+        return self._tokens[token_id]
+
+    def memory_size(self) -> int:
+        """Return approximate number of bytes of the vocabulary."""
+        return sys.getsizeof(self._ids) + sys.getsizeof(self._tokens) + sum(map(sys.getsizeof, self._tokens))
+
+
+class NgramDict(dict):
+    """
+    Class describing dictionary of Ngram objects by their text.
+
+    It is the initial representation of ngrams, every context holds its own Ngram object.
+    """
+
+    _continuations_count = 2    # number of the most frequent continuations kept by default
+    read_only = False
+
+    def __init__(self, ngrams: Dict[str, Ngram] = None, continuations_count: int = 2):
+        super().__init__(ngrams if ngrams else {})
+        self._continuations_count = continuations_count
+        self._sampling_tables = SamplingTableCache()    # context text -> sampling table
+
+    def __getstate__(self) -> dict:
+        return {name: value for name, value in self.__dict__.items() if name != "_sampling_tables"}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._sampling_tables = SamplingTableCache()
+
+    @property
+    def continuations_count(self) -> int:
+        return self._continuations_count
+
+    @property
+    def edges_count(self) -> int:
+        """Number of stored (context, continuation) pairs."""
+        return sum(len(ngram._count_dict) for ngram in self.values() if ngram._count_dict)
+
+    @property
+    def total_count(self) -> int:
+        """Sum of counts of all continuations."""
+        return sum(sum(ngram._count_dict.values()) for ngram in self.values() if ngram._count_dict)
+
+    def copy(self) -> "NgramDict":
+        """Return copy of the dictionary with copies of Ngram objects, which can be updated independently."""
+        return deepcopy(self)
+
+    def pruned(self, policy: PruningPolicy) -> "NgramDict":
+        """
+        Return new dictionary with continuations kept by policy, the most frequent continuations
+        are chosen again among the kept ones.
+        """
+        kept = {}
+        for text, ngram in self.items():
+            count_dict = {word: count for word, count in (ngram._count_dict or {}).items() if count >= policy.min_count}
+            if policy.max_continuations and len(count_dict) > policy.max_continuations:
+                count_dict = dict(
+                    sorted(count_dict.items(), key=lambda item: (-item[1], item[0]))[:policy.max_continuations]
+                )
+            if count_dict:
+                kept[text] = count_dict
+
+        def build(evicted: set) -> NgramDict:
+            return NgramDict({
+                text: Ngram(text=text, count_dict=dict(count_dict), continuations_count=self._continuations_count)
+                for text, count_dict in kept.items() if text not in evicted
+            }, self._continuations_count)
+        order = eviction_order(
+            {text: sum(count_dict.values()) for text, count_dict in kept.items()},
+            {text: text.count(" ") + 1 for text in kept},
+        )
+        return fit_memory(build, order, [len(kept[text]) for text in order], policy.max_memory_bytes)
+
+    def as_ngram_store(self) -> "NgramStore":
+        """Return NgramStore with counts of ngrams, ngrams without count dictionary are skipped."""
+        store = NgramStore(self._continuations_count)
+        store.update_by_count_dict({text: ngram._count_dict for text, ngram in self.items() if ngram._count_dict})
+        return store
+
+    def memory_size(self) -> int:
+        """Return approximate number of bytes of the dictionary, Ngram objects and their dictionaries."""
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(text) + sys.getsizeof(ngram) + sys.getsizeof(ngram.__dict__)
+            + sys.getsizeof(ngram._count_dict) + sys.getsizeof(ngram.most_frequently_continuations)
+            for text, ngram in self.items()
+        )
+
+    def get_continuations(self, context: str) -> Optional[List[str]]:
+        """Return the most frequent continuations of context or None if context is unknown."""
+        ngram = self.get(context)
+        return ngram.most_frequently_continuations if ngram is not None else None
+
+    def context_cursor(self, words: List[str], max_length: int) -> TextContextCursor:
+        """Return cursor over contexts of up to max_length last words, which is moved by generated words."""
+        return TextContextCursor(self, words, max_length)
+
+    def get_sampling_table_by_text(self, context: str, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of all continuations of context or None if context is unknown."""
+        table = self._sampling_tables.get(context, settings)
+        if table is None:
+            ngram = self.get(context)
+            if ngram is None or not ngram._count_dict:
+                return None
+            count_dict = ngram._count_dict
+            table = self._sampling_tables.put(
+                context, build_sampling_table(settings, list(count_dict), list(count_dict.values()))
+            )
+        return table
+
+    def update_by_count_dict(self, input_count_dict: Dict[str, Dict[str, int]]) -> None:
+        """Udpdate dictionaries in ngrams by input_count_dict."""
+        self._sampling_tables.discard(input_count_dict)
+        for ngram in input_count_dict:
+            if ngram not in self:
+                self[ngram] = Ngram(
+                    text=ngram,
+                    count_dict=input_count_dict[ngram],
+                    continuations_count=self._continuations_count,
+                )
+            else:
+                self[ngram].update_dicts(input_count_dict[ngram])
+
+    def update_by_id_counts(self, tokens: List[str], *ngram_counts: Counter) -> None:
+        """Udpdate dictionaries in ngrams by counters of ngrams of token ids from FrequencyAnalyzer.count_id_ngrams."""
+        self.update_by_count_dict(FrequencyAnalyzer.id_counts_to_count_dict(tokens, *ngram_counts))
+
+
+class StoreTables(NamedTuple):
+    """
+    Tables of ngram store sorted for the binary dump.
+
+    Token ids are positions of tokens in lexicographic order, context ids are positions in context_keys plus one
+    (0 is the root), context keys are packed (parent context id, token id) and ascend.
+    Continuations of context c are at [edge_offsets[c], edge_offsets[c + 1]) of edge_next and edge_count,
+    sorted by next id. context_top keeps continuations_count ids of the most frequent continuations per context.
+    """
+    tokens: List[str]
+    context_keys: array
+    edge_offsets: array
+    edge_next: array
+    edge_count: array
+    context_top: array
+
+
+class NgramStore(Mapping):
+    """
+    Class describing compact storage of ngrams.
+
+    Contexts form a prefix tree: the context id is obtained by the packed key of its prefix context id
+    and its last token id, the root (empty) context has id 0.
+    Continuations are stored in array columns (context id, next id, count),
+    continuations of one context are chained through the sibling column.
+    Counts are kept in the narrowest unsigned typecode holding the largest count, it is widened on overflow.
+    For compatibility the store is a read-only mapping of context text to Ngram.
+    """
+    _root = 0   # id of the empty context
+    root_context = _root
+    _prune_batch_size = 100000  # number of ngrams added to a pruned store at once
+
+    def __init__(self, continuations_count: int = 2):
+        """continuations_count is the number of the most frequent continuations kept for each context."""
+        self._continuations_count = continuations_count
+        self._vocabulary = Vocabulary()
+        self._children = IntIndex()     # packed (context id, token id) -> context id
+        self._context_parent = array("i", [-1])
+        self._context_token = array("i", [-1])
+        self._context_first_edge = array("i", [-1])     # head of the chain of continuation rows or -1
+        self._context_top = array("i", [-1]) * continuations_count  # rows of the most frequent continuations
+        self._edges = IntIndex()    # packed (context id, next id) -> continuation row
+        self._edge_context = array("I")
+        self._edge_next = array("I")
+        self._edge_count = array("B")
+        self._edge_sibling = array("i")
+        self._contexts_count = 0    # number of contexts having continuations
+        self._saved_edges_count = 0     # number of continuation rows at the moment of the last save
+        self._saved_counts = {}     # row -> count at the moment of the last save for rows changed since it
+        self._sampling_tables = SamplingTableCache()    # context id -> sampling table, built on first draw
+
+    def __getstate__(self) -> dict:
+        return {name: value for name, value in self.__dict__.items() if name != "_sampling_tables"}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._sampling_tables = SamplingTableCache()
+
+    read_only = False
+
+    @property
+    def vocabulary(self) -> Vocabulary:
+        return self._vocabulary
+
+    @property
+    def continuations_count(self) -> int:
+        return self._continuations_count
+
+    @property
+    def edges_count(self) -> int:
+        """Number of stored (context, continuation) pairs."""
+        return len(self._edge_count)
+
+    @property
+    def total_count(self) -> int:
+        """Sum of counts of all continuations."""
+        return sum(self._edge_count)
+
+    def _find_context(self, token_ids: List[int]) -> int:
+        """Return id of context by ids of its tokens or -1 if context is unknown."""
+        context = NgramStore._root
+        for token_id in token_ids:
+            if token_id < 0:
+                return -1
+            context = self._children.get(context << _ID_BITS | token_id)
+            if context < 0:
+                return -1
+        return context
+
+    def _find_context_by_text(self, text: str) -> int:
+        """Return id of context by its text or -1 if context is unknown."""
+        return self._find_context([self._vocabulary.get_id(token) for token in text.split(" ")])
+
+    def _intern_context(self, tokens: List[str]) -> int:
+        """Return id of context by its tokens, unknown contexts are added."""
+        return self._intern_context_ids([self._vocabulary.intern(token) for token in tokens])
+
+    def _intern_context_ids(self, token_ids: List[int]) -> int:
+        """Return id of context by ids of its tokens, unknown contexts are added."""
+        context = NgramStore._root
+        for token_id in token_ids:
+            child = self._children.setdefault(context << _ID_BITS | token_id, len(self._context_parent))
+            if child == len(self._context_parent):
+                self._context_parent.append(context)
+                self._context_token.append(token_id)
+                self._context_first_edge.append(-1)
+                self._context_top.extend(array("i", [-1]) * self._continuations_count)
+            context = child
+        return context
+
+    def _context_text(self, context: int) -> str:
+        """Return text of context by its id."""
+        tokens = []
+        while context != NgramStore._root:
+            tokens.append(self._vocabulary.get_token(self._context_token[context]))
+            context = self._context_parent[context]
+        return " ".join(reversed(tokens))
+
+    def _iter_rows(self, context: int) -> Iterator[int]:
+        """Iterate over continuation rows of context."""
+        row = self._context_first_edge[context]
+        while row >= 0:
+            yield row
+            row = self._edge_sibling[row]
+
+    def _add_count(self, context: int, next_id: int, count: int) -> int:
+        """Add count to continuation next_id of context and return its row."""
+        row = self._edges.setdefault(context << _ID_BITS | next_id, len(self._edge_count))
+        if row == len(self._edge_count):
+            if self._context_first_edge[context] < 0:
+                self._contexts_count += 1
+            self._edge_context.append(context)
+            self._edge_next.append(next_id)
+            try:
+                self._edge_count.append(count)
+            except OverflowError:
+                self._widen_counts(count)
+                self._edge_count.append(count)
+            self._edge_sibling.append(self._context_first_edge[context])
+            self._context_first_edge[context] = row
+        else:
+            if row < self._saved_edges_count and row not in self._saved_counts:
+                self._saved_counts[row] = self._edge_count[row]
+            try:
+                self._edge_count[row] += count
+            except OverflowError:
+                self._widen_counts(self._edge_count[row] + count)
+                self._edge_count[row] += count
+        return row
+
+    def _widen_counts(self, count: int) -> None:
+        """Copy counts to an array of the narrowest typecode holding count."""
+        self._edge_count = array(narrowest_typecode(count), self._edge_count)
+
+    def _get_count_dict(self, context: int) -> Counter:
+        """Return count dictionary of continuations of context."""
+        return Counter({
+            self._vocabulary.get_token(self._edge_next[row]): self._edge_count[row]
+            for row in self._iter_rows(context)
+        })
+
+    def _get_top_rows(self, context: int) -> List[int]:
+        """Return rows of the most frequent continuations of context."""
+        start = context * self._continuations_count
+        return [row for row in self._context_top[start:start + self._continuations_count] if row >= 0]
+
+    def _get_top(self, context: int) -> List[str]:
+        """Return the most frequent continuations of context."""
+        return [self._vocabulary.get_token(self._edge_next[row]) for row in self._get_top_rows(context)]
+
+    def _continuation_sort_key(self, row: int) -> tuple[int, str]:
+        """Return key ordering continuations as in FrequencyAnalyzer: higher count, then lexicographically smaller."""
+        return -self._edge_count[row], self._vocabulary.get_token(self._edge_next[row])
+
+    def _update_top(self, context: int, row: int) -> None:
+        """Update the most frequent continuations of context after the count of continuation row has been increased."""
+        top_rows = self._get_top_rows(context)
+        FrequencyAnalyzer.update_most_frequently_continuations(
+            top_rows, row, self._continuation_sort_key, self._continuations_count
+        )
+        top_rows += [-1] * (self._continuations_count - len(top_rows))
+        start = context * self._continuations_count
+        self._context_top[start:start + self._continuations_count] = array("i", top_rows)
+
+    def get_continuations(self, context: str) -> Optional[List[str]]:
+        """Return the most frequent continuations of context or None if context is unknown."""
+        context_id = self._find_context_by_text(context)
+        if context_id < 0 or self._context_first_edge[context_id] < 0:
+            return None
+        return self._get_top(context_id)
+
+    def get_token_id(self, token: str) -> int:
+        """Return id of token or -1 if token is unknown."""
+        return self._vocabulary.get_id(token)
+
+    def get_token(self, token_id: int) -> str:
+        """Return token by its id."""
+        return self._vocabulary.get_token(token_id)
+
+    def get_child_context(self, context: int, token_id: int) -> int:
+        """Return id of context extended by token_id or -1 if it is unknown."""
+        return self._children.get(context << _ID_BITS | token_id)
+
+    def get_top_ids(self, context: int) -> List[int]:
+        """Return token ids of the most frequent continuations of context, empty if it has no continuations."""
+        start = context * self._continuations_count
+        edge_next = self._edge_next
+        return [edge_next[row] for row in self._context_top[start:start + self._continuations_count] if row >= 0]
+
+    def context_cursor(self, words: List[str], max_length: int) -> ContextCursor:
+        """Return cursor over contexts of up to max_length last words, which is moved by generated words."""
+        return ContextCursor(self, words, max_length)
+
+    def get_sampling_table(self, context: int, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of all continuations of context or None if it has no continuations."""
+        table = self._sampling_tables.get(context, settings)
+        if table is None:
+            rows = list(self._iter_rows(context))
+            if not rows:
+                return None
+            table = self._sampling_tables.put(context, build_sampling_table(
+                settings,
+                [self._vocabulary.get_token(self._edge_next[row]) for row in rows],
+                [self._edge_count[row] for row in rows],
+            ))
+        return table
+
+    def get_sampling_table_by_text(self, context: str, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return sampling table of all continuations of context or None if context is unknown."""
+        context_id = self._find_context_by_text(context)
+        return self.get_sampling_table(context_id, settings) if context_id >= 0 else None
+
+    def update_by_count_dict(self, input_count_dict: Dict[str, Dict[str, int]]) -> None:
+        """Add counts of input_count_dict and update the most frequent continuations of changed contexts."""
+        for ngram, count_dict in input_count_dict.items():
+            if not count_dict:
+                continue
+            context = self._intern_context(ngram.split(" "))
+            self._sampling_tables.discard((context,))
+            for word, count in count_dict.items():
+                self._update_top(context, self._add_count(context, self._vocabulary.intern(word), count))
+
+    def update_by_id_counts(self, tokens: List[str], *ngram_counts: Counter) -> None:
+        """
+        Add counts of ngrams of token ids, built by FrequencyAnalyzer.count_id_ngrams,
+        and update the most frequent continuations of changed contexts.
+        """
+        store_ids = [self._vocabulary.intern(token) for token in tokens]
+        contexts = {}
+        for counts in ngram_counts:
+            for ngram, count in counts.items():
+                context = contexts.get(ngram[:-1])
+                if context is None:
+                    context = contexts[ngram[:-1]] = self._intern_context_ids([store_ids[i] for i in ngram[:-1]])
+                self._update_top(context, self._add_count(context, store_ids[ngram[-1]], count))
+        self._sampling_tables.discard(contexts.values())
+
+    def as_ngram_store(self) -> "NgramStore":
+        return self
+
+    def copy(self) -> "NgramStore":
+        """Return copy of the store, which can be updated independently, its arrays are copied as whole buffers."""
+        return deepcopy(self)
+
+    def _kept_rows(self, policy: PruningPolicy) -> Dict[int, List[int]]:
+        """Return rows of continuations kept by the least count and the number of continuations of policy by context."""
+        kept = {}
+        for context in range(len(self._context_first_edge)):
+            rows = [row for row in self._iter_rows(context) if self._edge_count[row] >= policy.min_count]
+            if policy.max_continuations and len(rows) > policy.max_continuations:
+                rows = sorted(rows, key=self._continuation_sort_key)[:policy.max_continuations]
+            if rows:
+                kept[context] = rows
+        return kept
+
+    def pruned(self, policy: PruningPolicy) -> "NgramStore":
+        """
+        Return new store with continuations kept by policy, the most frequent continuations are chosen again
+        among the kept ones. Tokens left without ngrams are dropped from the vocabulary.
+        All counts of the new store are unsaved, so it is saved by a whole dump, not by a journal of changes.
+        """
+        kept = self._kept_rows(policy)
+        context_ids = [()]  # token ids of contexts by context id, parents precede children
+        for context in range(1, len(self._context_parent)):
+            context_ids.append(context_ids[self._context_parent[context]] + (self._context_token[context],))
+
+        def build(evicted: set) -> NgramStore:
+            store = NgramStore(self._continuations_count)
+            new_ids = {}    # token id of this store -> token id of ngrams passed to the new store
+            ngram_counts = Counter()
+            for context, rows in kept.items():
+                if context in evicted:
+                    continue
+                ngram = tuple(new_ids.setdefault(token_id, len(new_ids)) for token_id in context_ids[context])
+                for row in rows:
+                    next_id = new_ids.setdefault(self._edge_next[row], len(new_ids))
+                    ngram_counts[ngram + (next_id,)] = self._edge_count[row]
+                if len(ngram_counts) >= NgramStore._prune_batch_size:
+                    store.update_by_id_counts(list(map(self._vocabulary.get_token, new_ids)), ngram_counts)
+                    ngram_counts = Counter()
+            store.update_by_id_counts(list(map(self._vocabulary.get_token, new_ids)), ngram_counts)
+            return store
+        order = eviction_order(
+            {context: sum(self._edge_count[row] for row in rows) for context, rows in kept.items()},
+            {context: len(context_ids[context]) for context in kept},
+        )
+        return fit_memory(build, order, [len(kept[context]) for context in order], policy.max_memory_bytes)
+
+    def memory_size(self) -> int:
+        """Return approximate number of bytes of the store."""
+        columns = (
+            self._context_parent, self._context_token, self._context_first_edge, self._context_top,
+            self._edge_context, self._edge_next, self._edge_count, self._edge_sibling,
+        )
+        return (
+            sum(map(_array_size, columns)) + self._children.memory_size() + self._edges.memory_size()
+            + self._vocabulary.memory_size()
+        )
+
+    def get_changes(self) -> Dict[str, Counter]:
+        """Return count dictionary of counts added since the last mark_saved call."""
+        changes = defaultdict(Counter)
+        rows = chain(self._saved_counts, range(self._saved_edges_count, len(self._edge_count)))
+        for row in rows:
+            next_word = self._vocabulary.get_token(self._edge_next[row])
+            changes[self._context_text(self._edge_context[row])][next_word] = (
+                self._edge_count[row] - self._saved_counts.get(row, 0)
+            )
+        return changes
+
+    def mark_saved(self) -> None:
+        """Mark current counts as saved, get_changes returns counts added after it."""
+        self._saved_edges_count = len(self._edge_count)
+        self._saved_counts = {}
+
+    def to_sorted_tables(self) -> StoreTables:
+        """Return tables of the store in the sorted order of the binary dump."""
+        token_order = sorted(range(len(self._vocabulary)), key=self._vocabulary.get_token)
+        new_token = array("I", [0]) * len(token_order)
+        for new_id, old_id in enumerate(token_order):
+            new_token[old_id] = new_id
+
+        children = defaultdict(list)
+        for context in range(1, len(self._context_parent)):
+            children[self._context_parent[context]].append(context)
+        new_context = array("i", [-1]) * len(self._context_parent)
+        new_context[NgramStore._root] = NgramStore._root
+        context_order = [NgramStore._root]
+        context_keys = array("Q")
+        level = [NgramStore._root]
+        while level:    # contexts are numbered level by level, so context keys ascend
+            next_level = []
+            for parent in level:
+                for context in sorted(children[parent], key=lambda child: new_token[self._context_token[child]]):
+                    new_context[context] = len(context_order)
+                    context_order.append(context)
+                    context_keys.append(new_context[parent] << _ID_BITS | new_token[self._context_token[context]])
+                    next_level.append(context)
+            level = next_level
+
+        edge_offsets = array("Q", [0])
+        edge_next = array("I")
+        edge_count = array("Q")
+        context_top = array("i")
+        for context in context_order:
+            for row in sorted(self._iter_rows(context), key=lambda row: new_token[self._edge_next[row]]):
+                edge_next.append(new_token[self._edge_next[row]])
+                edge_count.append(self._edge_count[row])
+            edge_offsets.append(len(edge_next))
+            top = [new_token[self._edge_next[row]] for row in self._get_top_rows(context)]
+            context_top.extend(top + [-1] * (self._continuations_count - len(top)))
+        return StoreTables(
+            [self._vocabulary.get_token(token_id) for token_id in token_order],
+            context_keys, edge_offsets, edge_next, edge_count, context_top,
+        )
+
+    def __getitem__(self, context: str) -> Ngram:
+        context_id = self._find_context_by_text(context)
+        if context_id < 0 or self._context_first_edge[context_id] < 0:
+            raise KeyError(context)
+        return Ngram(
+            text=context,
+            count_dict=self._get_count_dict(context_id),
+            most_frequently_continuations_list=self._get_top(context_id),
+            continuations_count=self._continuations_count,
+        )
+
+    def __contains__(self, context) -> bool:
+        if not isinstance(context, str):
+            return False
+        context_id = self._find_context_by_text(context)
+        return context_id >= 0 and self._context_first_edge[context_id] >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for context in range(1, len(self._context_first_edge)):
+            if self._context_first_edge[context] >= 0:
+                yield self._context_text(context)
+
+    def __len__(self) -> int:
+        return self._contexts_count
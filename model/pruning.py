@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, NamedTuple, Set, TypeVar
+
+
+Store = TypeVar("Store")
+
+
+@dataclass(frozen=True)
+class PruningPolicy:
+    """
+    Immutable policy of pruning counts of ngrams, it is validated once on creation.
+
+    min_count is the least count of a kept continuation.
+    max_continuations is the number of the most frequent continuations kept for every context, 0 keeps all.
+    max_memory_mb is the memory size of the pruned store in MiB, contexts with the least total counts
+    are evicted until the store fits it, 0 means no limit.
+    """
+    min_count: int = 1
+    max_continuations: int = 0
+    max_memory_mb: float = 0
+    _ingestion_share = 0.75     # share of max_memory_mb to which ngrams are pruned between batches of ingestion
+
+    def __post_init__(self):
+        for name in ("min_count", "max_continuations"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"{name} must be non-negative integer, not {value!r}")
+        if isinstance(self.max_memory_mb, bool) or not isinstance(self.max_memory_mb, (int, float)) \
+                or not self.max_memory_mb >= 0:
+            raise ValueError(f"max_memory_mb must be non-negative number, not {self.max_memory_mb!r}")
+
+    @property
+    def max_memory_bytes(self) -> int:
+        """Memory limit in bytes, 0 means no limit."""
+        return int(self.max_memory_mb * 2**20)
+
+    def ingestion_policy(self) -> "PruningPolicy":
+        """
+        Return policy applied between batches of ingestion once the memory limit is exceeded.
+        It keeps only the memory limit lowered to _ingestion_share, so the next batches have room to grow
+        before the store is rebuilt again. min_count and max_continuations are applied after the ingestion,
+        as the next batches may raise the counts.
+        """
+        return PruningPolicy(max_memory_mb=self.max_memory_mb * self._ingestion_share)
+
+    def memory_exceeded(self, store) -> bool:
+        """Return whether store is larger than the memory limit."""
+        return bool(self.max_memory_mb) and store.memory_size() > self.max_memory_bytes
+
+
+class PruningReport(NamedTuple):
+    """Contexts, continuations, total count and memory size of ngrams before and after pruning."""
+    contexts_before: int
+    contexts_after: int
+    edges_before: int
+    edges_after: int
+    count_before: int
+    count_after: int
+    memory_before: int
+    memory_after: int
+
+    @classmethod
+    def of(cls, before, after) -> "PruningReport":
+        """Return report of pruning store before into store after."""
+        return cls(
+            len(before), len(after), before.edges_count, after.edges_count,
+            before.total_count, after.total_count, before.memory_size(), after.memory_size(),
+        )
+
+    @property
+    def memory_saved(self) -> int:
+        """Number of bytes freed by pruning."""
+        return self.memory_before - self.memory_after
+
+    @property
+    def count_kept_share(self) -> float:
+        """Share of counted ngrams kept, the rest of the probability mass is lost by generation."""
+        return self.count_after / self.count_before if self.count_before else 1.0
+
+
+def eviction_order(totals: dict, lengths: dict) -> list:
+    """
+    Return contexts in the order of eviction by their total counts and lengths in words:
+    the least total count first, longer contexts first among equal counts, generation backs off to shorter ones.
+    """
+    return sorted(totals, key=lambda context: (totals[context], -lengths[context]))
+
+
+def fit_memory(build: Callable[[Set[Hashable]], Store], order: List[Hashable], sizes: List[int],
+               max_memory_bytes: int) -> Store:
+    """
+    Return build(evicted) for a short prefix evicted of contexts in eviction order whose memory size
+    fits max_memory_bytes, or the store without any of them. sizes are the numbers of continuations of contexts.
+
+    Every attempt evicts contexts holding the share of the remaining continuations by which the last store
+    exceeds the limit, so the store is built a few times instead of once per evicted context.
+    """
+    evicted = 0
+    remaining = sum(sizes) + len(sizes)     # a context costs about as much as one continuation
+    store = build(set())
+    while max_memory_bytes and store.memory_size() > max_memory_bytes and evicted < len(order):
+        target = max(1, remaining * (1 - max_memory_bytes / store.memory_size()))
+        while target > 0 and evicted < len(order):
+            target -= sizes[evicted] + 1
+            remaining -= sizes[evicted] + 1
+            evicted += 1
+        store = build(set(order[:evicted]))
+    return store
@@ -0,0 +1,60 @@
+import zlib
+from typing import Sequence
+
+
+_MASK = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15  # increment of SplitMix64 between steps
+
+
+def _mix(value: int) -> int:
+    """Return SplitMix64 finalizer of 64-bit value, it spreads every input bit over all output bits."""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK
+    return value ^ (value >> 31)
+
+
+class StepRandom:
+    """
+    Class describing random source of one generation, which gives one uniform number per generation step.
+
+    The number is SplitMix64 of the key of the generation at the current step of its StepStreams,
+    so it is computed on demand and generations with different keys draw independent numbers.
+    choice and random of one step return the same number, as a step chooses one word.
+    """
+    __slots__ = ("_streams", "_key")
+
+    def __init__(self, streams: "StepStreams", key: int):
+        self._streams = streams
+        self._key = key
+
+    def random(self) -> float:
+        return _mix(self._key + self._streams.step * _GOLDEN_GAMMA & _MASK) / 2**64
+
+    def choice(self, sequence: Sequence):
+        return sequence[min(int(self.random() * len(sequence)), len(sequence) - 1)]
+
+
+class StepStreams:
+    """
+    Class describing streams of uniform numbers of a seed, each stream gives one number per generation step.
+
+    The stream of a generation is keyed by the seed, the context of its prompt, the index of the prompt
+    in a batch and the index of the generation among the continuations of the prompt, so generations of a batch
+    never share numbers, even of identical prompts. The first continuation of the first prompt of a batch
+    has the same key as continue_phrase of that prompt. Numbers are not drawn ahead, a step only advances
+    the counter, so finished generations of a batch cost nothing.
+    """
+
+    def __init__(self, seed: int):
+        self._seed_key = _mix(seed & _MASK ^ _mix(seed >> 64 & _MASK))
+        self.step = 0
+
+    def next_step(self) -> None:
+        """Move all streams to the numbers of the next generation step."""
+        self.step += 1
+
+    def rng(self, context: str, prompt_index: int = 0, sample_index: int = 0) -> StepRandom:
+        """Return random source of generation after context of prompt prompt_index drawing its sample_index stream."""
+        key = _mix(self._seed_key ^ zlib.crc32(context.encode("UTF-8")))
+        key = _mix(key ^ prompt_index << 32 ^ sample_index)
+        return StepRandom(self, key)
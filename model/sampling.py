@@ -0,0 +1,148 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+import random
+import threading
+from typing import List, NamedTuple, Optional, Sequence
+
+
+class SamplingSettings(NamedTuple):
+    """
+    Settings of weighted sampling of the next word from the counts of all continuations.
+
+    Counts are raised to the power 1/temperature, so a temperature below 1 favors frequent continuations
+    and above 1 flattens the distribution. top_k keeps only the k most frequent continuations, 0 keeps all.
+    top_p keeps the most frequent continuations whose total weight reaches the share top_p of all weight.
+    """
+    temperature: float = 1.0
+    top_k: int = 0
+    top_p: float = 1.0
+
+    def validate(self) -> None:
+        """Raise ValueError if settings are out of their ranges."""
+        if not self.temperature > 0:
+            raise ValueError(f"temperature must be positive, not {self.temperature}")
+        if not isinstance(self.top_k, int) or self.top_k < 0:
+            raise ValueError(f"top_k must be non-negative integer, not {self.top_k}")
+        if not 0 < self.top_p <= 1:
+            raise ValueError(f"top_p must be in (0, 1], not {self.top_p}")
+
+
+def parse_sampling_settings(config: dict) -> Optional[SamplingSettings]:
+    """
+    Return sampling settings by options sampling, temperature, top_k and top_p of config,
+    None if sampling is "top". Raise ValueError if options are invalid.
+    """
+    sampling = config.get("sampling", "top")
+    if sampling == "top":
+        return None
+    if sampling != "weighted":
+        raise ValueError(f"sampling must be top or weighted, not {sampling}")
+    settings = SamplingSettings(
+        float(config.get("temperature", 1.0)), int(config.get("top_k", 0)), float(config.get("top_p", 1.0))
+    )
+    settings.validate()
+    return settings
+
+
+class SamplingTable(NamedTuple):
+    """
+    Cumulative weights of the continuations of one context kept by sampling settings.
+
+    The dot is kept apart with its weight, so a word can be drawn with or without it.
+    """
+    settings: SamplingSettings
+    tokens: List[str]
+    cumulative_weights: List[float]
+    dot_weight: float
+
+    @property
+    def has_dot(self) -> bool:
+        return self.dot_weight > 0
+
+
+def build_sampling_table(settings: SamplingSettings, tokens: Sequence[str], counts: Sequence[int]) -> SamplingTable:
+    """Return sampling table of continuations tokens with counts, it takes O(V log V) for V continuations."""
+    order = sorted(range(len(tokens)), key=lambda index: (-counts[index], tokens[index]))
+    if settings.top_k:
+        order = order[:settings.top_k]
+    max_count = counts[order[0]] if order else 1
+    weights = [(counts[index] / max_count) ** (1 / settings.temperature) for index in order]
+    if settings.top_p < 1:
+        threshold = settings.top_p * sum(weights)
+        total = 0.0
+        for kept, weight in enumerate(weights, 1):
+            total += weight
+            if total >= threshold:
+                order, weights = order[:kept], weights[:kept]
+                break
+    kept = [position for position, index in enumerate(order) if tokens[index] != "."]
+    return SamplingTable(
+        settings=settings,
+        tokens=[tokens[order[position]] for position in kept],
+        cumulative_weights=list(accumulate(weights[position] for position in kept)),
+        dot_weight=sum(weight for index, weight in zip(order, weights) if tokens[index] == "."),
+    )
+
+
+def choose_weighted(table: SamplingTable, dot_is_possible: bool, rng: random.Random = None) -> str:
+    """
+    Return token of table drawn by its weight, it takes O(log V).
+    If dot_is_possible, the dot is drawn by its weight among the other tokens, otherwise it is returned
+    only when it is the only continuation, as choose_not_dot_is_possible does. rng is random module by default.
+    """
+    rng = rng if rng else random
+    if not table.tokens:
+        return "."
+    weights = table.cumulative_weights
+    if dot_is_possible and table.dot_weight:
+        draw = rng.random() * (weights[-1] + table.dot_weight)
+        if draw >= weights[-1]:
+            return "."
+    else:
+        draw = rng.random() * weights[-1]
+    return table.tokens[min(bisect_right(weights, draw), len(weights) - 1)]
+
+
+class SamplingTableCache:
+    """
+    Class describing cache of sampling tables by context, they are built lazily on first draw.
+
+    Stores discard tables of contexts changed by an update, a table built with other settings is rebuilt.
+    At most max_size tables are kept, the least recently used ones are evicted, so the cache does not outgrow
+    the store it belongs to. Methods may be called from several threads.
+    """
+    _max_size = 10000   # number of tables kept by default
+
+    def __init__(self, max_size: int = None):
+        self._max_size = max_size if max_size is not None else SamplingTableCache._max_size
+        self._tables = OrderedDict()    # context -> table, the last is the most recently used
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def get(self, context, settings: SamplingSettings) -> Optional[SamplingTable]:
+        """Return table of context built with settings or None if there is no such table."""
+        with self._lock:
+            table = self._tables.get(context)
+            if table is None or table.settings != settings:
+                return None
+            self._tables.move_to_end(context)
+            return table
+
+    def put(self, context, table: SamplingTable) -> SamplingTable:
+        with self._lock:
+            self._tables[context] = table
+            self._tables.move_to_end(context)
+            while len(self._tables) > self._max_size:
+                self._tables.popitem(last=False)
+        return table
+
+    def discard(self, contexts) -> None:
+        """Discard tables of contexts."""
+        if self._tables:
+            with self._lock:
+                for context in contexts:
+                    self._tables.pop(context, None)
+
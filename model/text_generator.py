@@ -1,78 +1,354 @@
-from typing import Dict
+from copy import copy
+from itertools import chain, count, islice
+import random
+from typing import Dict, Iterable, Iterator, List, Tuple
 
+from model.context_cursor import get_continuations_by_backoff, get_sampling_table_by_backoff
+from model.count_min_sketch import SketchReport, SketchSettings
 from model.frequency_analyzer import FrequencyAnalyzer
-from model.ngram import Ngram
-from model.text_parser import TextParser
+from model.generation_settings import GenerationSettings
+from model.ingest_progress import IngestMonitor
+from model.ingestion import count_texts_parallel
+from model.ngram import Ngram, choose_dot_is_possible, choose_not_dot_is_possible
+from model.ngram_store import NgramDict, NgramStore
+from model.pruning import PruningPolicy, PruningReport
+from model.random_streams import StepStreams
+from model.sampling import SamplingTable, choose_weighted
+from model.text_parser import get_text_parser
 
 
 class TextGenerator():
     """Class describing TextGenerator."""
 
-    _max_generated_word_count = 10  # maximum number of words generated
-    _generated_without_dot = 10  # number of generated words after which Generator tries to complete the sentence
+    _ingest_batch_size = 10000  # number of sentences counted at once during streaming ingestion
+    _ingest_workers = 1     # number of processes counting ngrams, 1 means counting in the current process
+    _order = 3  # number of words in the longest ngram, contexts have up to _order-1 words
+    _versions = count()     # source of versions, unique for all text generators of the process
 
-    def __init__(self, ngrams: Dict[str, Ngram] = None):
-        self._text_parser = TextParser()
+    def __init__(self, ngrams: Dict[str, Ngram] = None, continuations_count: int = 2, tokenizer: str = "default",
+                 order: int = 3):
+        """
+        Initializes text generator.
+
+        If ngrams are given, they are kept as a dictionary of Ngram objects,
+        otherwise ngrams are stored in the compact NgramStore.
+        continuations_count is the number of the most frequent continuations the next word is chosen from.
+        tokenizer is the name of the tokenizer of texts and prompts, one of TOKENIZERS.
+        order is the number of words in the longest ngram, the next word is chosen by the longest known context
+        of up to order-1 last words.
+        """
+        if order < 2:
+            raise ValueError(f"order must be at least 2, not {order}")
+        self._order = order
+        self._version = next(TextGenerator._versions)
+        self._text_parser = get_text_parser(tokenizer)
         self._frequency_analyzer = FrequencyAnalyzer()
-        self._ngrams_dict = ngrams if ngrams else {}
+        self._ngrams_dict = (
+            NgramDict(ngrams, continuations_count) if ngrams else NgramStore(continuations_count)
+        )
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore text generator, dumps with a plain dictionary of ngrams are supported."""
+        self.__dict__.update(state)
+        self._version = next(TextGenerator._versions)
+        if type(self._ngrams_dict) is dict:
+            self._ngrams_dict = NgramDict(self._ngrams_dict)
+
+    @classmethod
+    def from_store(cls, store, tokenizer: str = "default", order: int = 3) -> "TextGenerator":
+        """Create text generator around an existing ngram store, e.g. a MappedNgramStore opened from a dump."""
+        text_generator = cls(continuations_count=store.continuations_count, tokenizer=tokenizer, order=order)
+        text_generator._ngrams_dict = store
+        return text_generator
 
     @property
     def ngrams_dict(self):
         return self._ngrams_dict
 
+    @property
+    def tokenizer(self) -> str:
+        return self._text_parser.name
+
+    @property
+    def order(self) -> int:
+        return self._order
+
+    @property
+    def version(self) -> int:
+        """Version of ngrams, it changes on every update and differs between text generators."""
+        return self._version
+
+    def memory_size(self) -> int:
+        """Return approximate number of bytes of ngrams of text generator."""
+        return self._ngrams_dict.memory_size()
+
+    def _mutable_ngrams_dict(self):
+        """
+        Return ngrams store which can be updated, a read-only store is loaded into NgramStore first.
+        It is called before every update, so the version is changed.
+        """
+        self._version = next(TextGenerator._versions)
+        if self._ngrams_dict.read_only:
+            mapped_store = self._ngrams_dict
+            self._ngrams_dict = mapped_store.as_ngram_store()
+            mapped_store.close()
+        return self._ngrams_dict
+
+    def copy(self) -> "TextGenerator":
+        """
+        Return text generator with a copy of ngrams and a new version, it can be updated while this one
+        keeps generating. A read-only store is loaded into NgramStore instead of copying.
+        """
+        text_generator = copy(self)
+        text_generator._ngrams_dict = (
+            self._ngrams_dict.as_ngram_store() if self._ngrams_dict.read_only else self._ngrams_dict.copy()
+        )
+        return text_generator
+
+    def prune(self, policy: PruningPolicy) -> PruningReport:
+        """
+        Replace ngrams by ngrams pruned by policy and return the report of pruning.
+        A read-only store is loaded into NgramStore first.
+        """
+        ngrams_dict = self._mutable_ngrams_dict()
+        self._ngrams_dict = ngrams_dict.pruned(policy)
+        return PruningReport.of(ngrams_dict, self._ngrams_dict)
+
+    def _prune_if_exceeded(self, pruning: PruningPolicy) -> None:
+        """Prune ngrams by the ingestion policy of pruning, if they are larger than its memory limit."""
+        if pruning and pruning.memory_exceeded(self._ngrams_dict):
+            self.prune(pruning.ingestion_policy())
+
     def update_dicts_by_text(self, text: str) -> None:
         """Parse text and update dictionaries in ngrams in _ngrams_dict by it."""
         parsed_text = self._text_parser.parse_text(text)
-        input_count_dict = self._frequency_analyzer.create_count_dict(parsed_text)
-        self.update_dicts_by_count_dict(input_count_dict)
+        self._mutable_ngrams_dict().update_by_id_counts(
+            *self._frequency_analyzer.count_id_ngrams(parsed_text, self._order)
+        )
+
+    def update_dicts_by_chunks(self, chunks: Iterable[str]) -> None:
+        """Parse text given by consecutive chunks and update dictionaries in ngrams by it batch by batch."""
+        self.update_dicts_by_chunk_streams([chunks])
+
+    def update_dicts_by_chunk_streams(self, chunk_streams: Iterable[Iterable[str]],
+                                      monitor: IngestMonitor = None, pruning: PruningPolicy = None) -> None:
+        """
+        Update dictionaries in ngrams by several texts, each given by consecutive chunks.
+        The texts are split at sentence boundaries and with more than one ingest worker
+        the parts are counted in parallel processes.
+        monitor gets counts of every batch and may stop the update between batches by IngestCancelled.
+        Whenever ngrams outgrow the memory limit of pruning between batches, they are pruned below it
+        by its ingestion policy, the whole pruning is applied once after the update.
+        """
+        texts = chain.from_iterable(self._text_parser.split_chunks(chunks) for chunks in chunk_streams)
+        if TextGenerator._ingest_workers > 1:
+            self.update_dicts_by_texts_parallel(texts, monitor, pruning)
+        else:
+            self.update_dicts_by_sentences(
+                chain.from_iterable(map(self._text_parser.parse_text, texts)), monitor, pruning
+            )
+        if pruning:
+            self.prune(pruning)
+
+    def update_dicts_by_texts_parallel(self, texts: Iterable[str], monitor: IngestMonitor = None,
+                                       pruning: PruningPolicy = None) -> None:
+        """
+        Count ngrams of texts in _ingest_workers processes and update dictionaries by merged counts,
+        ngrams are pruned by the ingestion policy of pruning whenever they outgrow its memory limit.
+        """
+        for id_counts in count_texts_parallel(texts, TextGenerator._ingest_workers, self.tokenizer, self._order):
+            self._mutable_ngrams_dict().update_by_id_counts(*id_counts)
+            self._prune_if_exceeded(pruning)
+            if monitor:
+                monitor.add_id_counts(*id_counts)
+
+    def update_dicts_by_sentences(self, sentences: Iterable[List[str]], monitor: IngestMonitor = None,
+                                  pruning: PruningPolicy = None) -> None:
+        """
+        Update dictionaries in ngrams by batches of parsed sentences, only one batch is kept in memory.
+        Ngrams are pruned by the ingestion policy of pruning whenever they outgrow its memory limit.
+        """
+        sentences = iter(sentences)
+        while batch := list(islice(sentences, TextGenerator._ingest_batch_size)):
+            id_counts = self._frequency_analyzer.count_id_ngrams(batch, self._order)
+            self._mutable_ngrams_dict().update_by_id_counts(*id_counts)
+            self._prune_if_exceeded(pruning)
+            if monitor:
+                monitor.add_id_counts(*id_counts)
+
+    def _count_batches(self, chunk_streams: Iterable[Iterable[str]]) -> Iterator[Tuple]:
+        """Yield counts of ngrams of token ids of every batch of sentences of texts given by chunk streams."""
+        texts = chain.from_iterable(self._text_parser.split_chunks(chunks) for chunks in chunk_streams)
+        sentences = chain.from_iterable(map(self._text_parser.parse_text, texts))
+        while batch := list(islice(sentences, TextGenerator._ingest_batch_size)):
+            yield self._frequency_analyzer.count_id_ngrams(batch, self._order)
+
+    def update_dicts_by_sketch(self, chunk_streams: Iterable[Iterable[str]], settings: SketchSettings,
+                               monitor: IngestMonitor = None,
+                               first_pass_chunk_streams: Iterable[Iterable[str]] = None) -> SketchReport:
+        """
+        Update dictionaries in ngrams only by ngrams frequent by Count-Min Sketch of settings and return
+        the report of the sketch, so counts of rare ngrams never take memory beyond the fixed size of the sketch.
+        With two_pass settings first_pass_chunk_streams give the same texts as chunk_streams,
+        they fill the sketch before ngrams are counted. Ngrams are counted in the current process.
+        monitor gets counts of every batch of the last pass and may stop the update by IngestCancelled.
+        """
+        sketch = settings.create_sketch()
+        if settings.two_pass:
+            if first_pass_chunk_streams is None:
+                raise ValueError("two pass ingestion needs chunk streams of the first pass")
+            for id_counts in self._count_batches(first_pass_chunk_streams):
+                sketch.add_id_counts(*id_counts)
+                if monitor:
+                    monitor.check()
+        kept_count = 0
+        for id_counts in self._count_batches(chunk_streams):
+            if settings.two_pass:
+                kept_id_counts = sketch.frequent_id_counts(settings.min_count, *id_counts)
+            else:
+                kept_id_counts = sketch.admit_id_counts(settings.min_count, *id_counts)
+            self._mutable_ngrams_dict().update_by_id_counts(*kept_id_counts)
+            kept_count += sum(sum(counts.values()) for counts in kept_id_counts[1:])
+            if monitor:
+                monitor.add_id_counts(*id_counts)
+        return SketchReport.of(sketch, kept_count)
 
     def update_dicts_by_count_dict(self, input_count_dict: Dict[str, Dict[str, int]]) -> None:
         """Udpdate dictionaries in ngrams in _ngrams_dict by input_count_dict."""
-        for ngram in input_count_dict:
-            if ngram not in self._ngrams_dict:
-                self._ngrams_dict[ngram] = Ngram(text=ngram, count_dict=input_count_dict[ngram])
-            else:
-                self._ngrams_dict[ngram].update_dicts(input_count_dict[ngram])
+        self._mutable_ngrams_dict().update_by_count_dict(input_count_dict)
 
-    def continue_phrase(self, phrase_begin: str) -> str:
-        """Generate the text based on the beginning of the phrase."""
+    def parse_prompt(self, phrase_begin: str) -> List[str]:
+        """Return words of the last sentence of the beginning of the phrase, raise ValueError if it has no words."""
         parsed_text = self._text_parser.parse_text(phrase_begin)
         if len(parsed_text) == 0:
             raise ValueError()
-        parse_phrase_begin = parsed_text[-1][:-1]
-        words_count = 0
-        next_word = ""
-        while next_word != "." and words_count < TextGenerator._max_generated_word_count:
-            bigram_start = parse_phrase_begin[-1]
-            trigram_start = " ".join(parse_phrase_begin[-2:])
-
-            if trigram_start in self._ngrams_dict:
-                if words_count < TextGenerator._generated_without_dot:
-                    next_word = self._ngrams_dict[trigram_start].get_next_word_not_dot_is_possible()
-                else:
-                    next_word = self._ngrams_dict[trigram_start].get_next_word_dot_is_possible()
-            elif bigram_start in self._ngrams_dict:
-                if words_count < TextGenerator._generated_without_dot:
-                    next_word = self._ngrams_dict[bigram_start].get_next_word_not_dot_is_possible()
-                else:
-                    next_word = self._ngrams_dict[bigram_start].get_next_word_dot_is_possible()
+        return parsed_text[-1][:-1]
+
+    def context_tail(self, words: List[str]) -> Tuple[str, ...]:
+        """Return the last words of the phrase which the generated words depend on."""
+        return tuple(words[1 - self._order:])
+
+    def continue_phrase(self, phrase_begin: str, seed: int = None, rng: random.Random = None,
+                        settings: GenerationSettings = None) -> str:
+        """
+        Generate the text based on the beginning of the phrase with settings, default settings if they are None.
+
+        Words are chosen by rng or by the stream of StepStreams of seed, so the text is reproduced
+        by the same seed and equals the first continuation of the first prompt of generate_batch with this seed.
+        Without both the random module is used.
+        """
+        words = self.parse_prompt(phrase_begin)
+        return " ".join(words + self.generate_words(words, seed, rng, settings))+"."
+
+    def generate_words(self, words: List[str], seed: int = None, rng: random.Random = None,
+                       settings: GenerationSettings = None) -> List[str]:
+        """
+        Return words generated after words of the phrase by continue_phrase, the final dot is not included.
+        With seed the generated words depend only on the context tail of words, seed and settings.
+        """
+        step_streams = StepStreams(seed) if rng is None and seed is not None else None
+        if step_streams:
+            rng = step_streams.rng(" ".join(self.context_tail(words)))
+        context_cursor = self._ngrams_dict.context_cursor(words, self._order - 1)
+        settings = settings if settings is not None else GenerationSettings()
+        max_generated_word_count = settings.max_generated_word_count
+        generated_without_dot = settings.generated_without_dot
+        sampling = settings.sampling
+        generated_words = []
+        while len(generated_words) < max_generated_word_count:
+            if step_streams:
+                step_streams.next_step()
+            if sampling is None:
+                continuations = context_cursor.continuations()
             else:
+                continuations = context_cursor.sampling_table(sampling)
+            if continuations is None:
                 break
 
-            parse_phrase_begin.append(next_word)
-            words_count += 1
+            next_word = self._choose_next_word(
+                continuations, len(generated_words) >= generated_without_dot, rng
+            )
+            if next_word == ".":
+                break
+            generated_words.append(next_word)
+            context_cursor.advance(next_word)
 
-        if next_word == '.':
-            parse_phrase_begin = parse_phrase_begin[:-1]
+        return generated_words
 
-        return ' '.join(parse_phrase_begin)+"."
+    @staticmethod
+    def _choose_next_word(continuations, dot_is_possible: bool, rng: random.Random = None) -> str:
+        """
+        Choose next word from the most frequent continuations or draw it by a sampling table of continuations.
+        dot_is_possible tells, whether generator tries to complete the sentence.
+        """
+        if isinstance(continuations, SamplingTable):
+            return choose_weighted(continuations, dot_is_possible, rng)
+        if dot_is_possible:
+            return choose_dot_is_possible(continuations, rng)
+        return choose_not_dot_is_possible(continuations, rng)
 
-    @classmethod
-    def set_max_generated_word_count(cls, value: int) -> None:
-        """set max generated word count"""
-        cls._max_generated_word_count = value
+    def generate_batch(self, prompts: List[str], n_per_prompt: int = 1, seed: int = None,
+                       settings: GenerationSettings = None) -> List[List[str]]:
+        """
+        Generate n_per_prompt continuations of every prompt as continue_phrase does,
+        results are returned in the order of prompts.
+
+        Identical prompts are parsed once, all generations are advanced step by step together
+        and continuations of identical contexts are looked up once for the whole batch.
+        With seed every continuation draws from its own stream of StepStreams of seed keyed by the index
+        of its prompt and its own index, so continuations of one batch differ even for identical prompts,
+        and the first continuation of the first prompt equals continue_phrase(prompt, seed).
+        """
+        step_streams = StepStreams(seed) if seed is not None else None
+        shared_rng = random.Random()
+        settings = settings if settings is not None else GenerationSettings()
+        max_generated_word_count = settings.max_generated_word_count
+        generated_without_dot = settings.generated_without_dot
+        sampling = settings.sampling
+        parsed_prompts = {}
+        for prompt in prompts:
+            if prompt not in parsed_prompts:
+                parsed_prompts[prompt] = self.parse_prompt(prompt)
+
+        generations = [list(parsed_prompts[prompt]) for prompt in prompts for _ in range(n_per_prompt)]
+        rngs = [
+            step_streams.rng(" ".join(self.context_tail(parsed_prompts[prompt])), prompt_index, sample_index)
+            if step_streams else shared_rng
+            for prompt_index, prompt in enumerate(prompts) for sample_index in range(n_per_prompt)
+        ]
+        continuations_by_context = {}
+        in_flight = list(zip(generations, rngs))
+        for words_count in range(max_generated_word_count):
+            dot_is_possible = words_count >= generated_without_dot
+            if step_streams:
+                step_streams.next_step()
+            still_in_flight = []
+            for words, rng in in_flight:
+                context = self.context_tail(words)
+                if context in continuations_by_context:
+                    continuations = continuations_by_context[context]
+                elif sampling is None:
+                    continuations = continuations_by_context[context] = get_continuations_by_backoff(
+                        self._ngrams_dict, words, self._order - 1
+                    )
+                else:
+                    continuations = continuations_by_context[context] = get_sampling_table_by_backoff(
+                        self._ngrams_dict, words, self._order - 1, sampling
+                    )
+                if continuations is None:
+                    continue
+                next_word = self._choose_next_word(continuations, dot_is_possible, rng)
+                if next_word != ".":
+                    words.append(next_word)
+                    still_in_flight.append((words, rng))
+            in_flight = still_in_flight
+
+        return [
+            [" ".join(words)+"." for words in generations[index * n_per_prompt:(index + 1) * n_per_prompt]]
+            for index in range(len(prompts))
+        ]
 
     @classmethod
-    def set_generated_without_dot(cls, value: int) -> None:
-        """set generated_without_dot"""
-        cls._generated_without_dot = value
+    def set_ingest_workers(cls, value: int) -> None:
+        """set ingest_workers"""
+        cls._ingest_workers = value
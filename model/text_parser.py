@@ -1,32 +1,100 @@
 import re
+from typing import Iterable, Iterator
 
 
 class TextParser():
+    """
+    Class describing the default tokenizer: words consist of latin and cyrillic letters and apostrophes.
 
+    Tokenizers differ in _find_words, which returns words of one lowercased sentence,
+    sentences are always split by DELIMITERS.
+    """
+
+    name = "default"    # name of the tokenizer recorded in dumps
     DELIMITERS = r"[.!?;()]+"  # regular expression for delimiters between sentences
+    SENTENCE_END_CHARACTERS = ".!?;()"  # characters matched by DELIMITERS
     WORD = r"[a-zа-я'ё]+[,:]?"  # regular expression for words
 
-    def _parse_sentences(self, text: str) -> list[str]:
-        """
-        Splits the text into an array of sentences by DELIMITERS.
-        """
-        sentences = re.split(TextParser.DELIMITERS, text)
-        return [sentence.strip().lower() for sentence in sentences if sentence.strip()]
+    _sentence_delimiters = re.compile(DELIMITERS)   # compiled DELIMITERS
+    _find_words = re.compile(WORD).findall  # returns words of sentence
 
-    def _parse_words(self, sentence: str) -> list[str]:
+    def iter_sentences(self, text: str) -> Iterator[list[str]]:
         """
-        Generates an list of sentence words.
+        Generates sentences of the text as parse_text does.
+
+        The text is lowercased once and split into sentences by one pass of compiled DELIMITERS,
+        words of every sentence are found by compiled WORD, so no work is done twice per sentence.
         """
-        return re.findall(TextParser.WORD, sentence)
+        find_words = self._find_words
+        for sentence in self._split_sentences(text):
+            if sentence and not sentence.isspace():
+                words = find_words(sentence)
+                words.append(".")
+                yield words
+
+    def _split_sentences(self, text: str) -> list[str]:
+        """Splits lowercased text by DELIMITERS, the parts may be empty or consist of whitespaces."""
+        if not isinstance(text, str):
+            raise TypeError(f"text must be str, not {type(text).__name__}")
+        return TextParser._sentence_delimiters.split(text.lower())
 
     def parse_text(self, text: str) -> list[list[str]]:
         """
         Generates list of sentences for the text, each of which is list of strings corresponding to words.
         A dot at the end of a sentence is considered a word and is always put down.
         """
-        result = []
-        for sentence in self._parse_sentences(text):
-            parse_sentence = self._parse_words(sentence)
-            parse_sentence.append(".")
-            result.append(parse_sentence)
-        return result
+        return list(self.iter_sentences(text))
+
+    def split_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Generates texts made of consecutive chunks, which end at sentence boundaries.
+        The part of a chunk after its last delimiter is carried over to the next chunk,
+        so only one unfinished sentence is kept in memory. It is kept as a list of pieces
+        and only new chunks are searched for delimiters, so a long sentence is not copied at every chunk.
+        """
+        rest = []
+        for chunk in chunks:
+            last_delimiter = max(chunk.rfind(delimiter) for delimiter in TextParser.SENTENCE_END_CHARACTERS)
+            if last_delimiter < 0:
+                if chunk:
+                    rest.append(chunk)
+                continue
+            rest.append(chunk[:last_delimiter + 1])
+            yield "".join(rest)
+            rest = [chunk[last_delimiter + 1:]] if last_delimiter + 1 < len(chunk) else []
+        if rest:
+            yield "".join(rest)
+
+    def parse_chunks(self, chunks: Iterable[str]) -> Iterator[list[str]]:
+        """Generates sentences of the text given by consecutive chunks, as parse_text does for the whole text."""
+        for text in self.split_chunks(chunks):
+            yield from self.iter_sentences(text)
+
+
+class UnicodeTextParser(TextParser):
+    """Class describing tokenizer, which words consist of Unicode word characters of any script and apostrophes."""
+
+    name = "unicode"
+    WORD = r"[\w']+[,:]?"
+
+    _find_words = re.compile(WORD).findall
+
+
+class WhitespaceTextParser(TextParser):
+    """Class describing the fast tokenizer, which words are parts of sentence between whitespaces."""
+
+    name = "whitespace"
+
+    _find_words = staticmethod(str.split)
+
+
+TOKENIZERS = {
+    text_parser.name: text_parser for text_parser in (TextParser, UnicodeTextParser, WhitespaceTextParser)
+}   # tokenizers by their names
+
+
+def get_text_parser(tokenizer: str) -> TextParser:
+    """Return tokenizer by its name."""
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"unknown tokenizer {tokenizer}, expected one of {', '.join(TOKENIZERS)}")
+    return TOKENIZERS[tokenizer]()
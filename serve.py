@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from model.file_handler import FileHandler
+from model.instrumentation import Instrumentation
+from server.server import GenerationServer, apply_config
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless HTTP server of text generation.")
+    parser.add_argument("dictionaries", nargs="*", help="dictionaries to open, all saved dictionaries by default")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=64, help="number of requests handled at once")
+    parser.add_argument("--max-n", type=int, default=100, help="largest n of a generation request")
+    parser.add_argument("--max-prompts", type=int, default=1000, help="largest number of prompts of a request")
+    parser.add_argument("--instrument", action="store_true", help="time hot functions, see GET /metrics")
+    parser.add_argument("--profile-dir", help="folder of cProfile stats of requests with \"profile\": true")
+    arguments = parser.parse_args()
+
+    if arguments.instrument:
+        Instrumentation.enable()
+    settings = apply_config(FileHandler.read_config())
+    server = GenerationServer(
+        arguments.dictionaries if arguments.dictionaries else FileHandler.get_files(), arguments.max_concurrency,
+        settings=settings, profile_dir=arguments.profile_dir, max_n=arguments.max_n, max_prompts=arguments.max_prompts,
+    )
+    asyncio.run(server.serve(arguments.host, arguments.port))
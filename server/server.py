@@ -0,0 +1,323 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+import time
+from typing import Optional, Tuple, Union
+
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings, parse_generation_settings
+from model.instrumentation import Instrumentation
+from model.model import Model
+from model.text_generator import TextGenerator
+from model.text_parser import TOKENIZERS
+
+
+class HTTPError(Exception):
+    """Error answered to the client with status and message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GenerationServer:
+    """
+    Class describing headless asyncio HTTP server of text generation.
+
+    Endpoints, bodies and answers are JSON:
+        GET /dictionaries - list of open dictionaries;
+        GET /stats - hits, misses, evictions and load time of the registry of resident dictionaries,
+            hits, hit rate and memory size of the generation cache and timers of enabled instrumentation;
+        GET /metrics - timers of instrumentation in the Prometheus text format;
+        POST /generate {"dictionary", "prompt" or "prompts", "n", "seed"} - generated texts, requests with more
+            than max_prompts prompts or n above max_n are answered with 413, the body may override
+            generation settings by options of config: max_generated_word_count, generated_without_dot,
+            sampling, temperature, top_k and top_p, with "profile": true the request is profiled by cProfile
+            into profile_dir and the path of the stats is answered;
+        POST /ingest {"dictionary", "path", "tokenizer", "order", "continuations_count"} - update dictionary
+            by text file on the server, create it with tokenizer, ngram order and number of the most frequent
+            continuations if needed;
+        DELETE /dictionaries/<name> - delete dictionary.
+    Generation and ingestion run in executors, so the event loop keeps answering other requests
+    while a dictionary is being loaded or updated. Unexpected errors are answered with 500.
+    Generation by a dictionary being updated uses its previous version until the update is published,
+    generation by a dictionary being created or deleted is answered with 503.
+    """
+    _reasons = {
+        200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+        409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+    }   # reason phrases of used statuses
+    _max_body_size = 1 << 20    # maximum size of request body in bytes
+
+    def __init__(self, dictionaries: list[str], max_concurrency: int = 64, ingest_threads: int = 1,
+                 settings: GenerationSettings = None, profile_dir: str = None, max_n: int = 100,
+                 max_prompts: int = 1000):
+        """
+        Open dictionaries through Model, text generators are loaded on first use and kept in the shared registry.
+
+        max_concurrency is the number of requests handled at once, other requests wait for their turn,
+        it is also the number of threads of generation.
+        ingest_threads is the number of dictionaries updated at once.
+        settings are the generation settings of requests which do not override them.
+        profile_dir is the folder of stats of profiled requests, None disables profiling.
+        max_n and max_prompts are the largest n and number of prompts of one generation request.
+        """
+        self._registry = Model.create_registry()
+        self._generation_cache = Model.create_generation_cache()
+        self._settings = settings if settings is not None else GenerationSettings()
+        self._models = {
+            name: Model(name, self._registry, self._generation_cache, self._settings) for name in dictionaries
+        }
+        self._updating = set()  # names of dictionaries being updated or deleted
+        self._unavailable = set()   # names of dictionaries being created or deleted
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._executor = ThreadPoolExecutor(max_workers=ingest_threads)
+        self._generation_executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._profile_dir = profile_dir
+        self._max_n = max_n
+        self._max_prompts = max_prompts
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serve requests forever."""
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests of one connection, the connection is kept alive until the client closes it."""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                async with self._semaphore:
+                    status, answer = await self._dispatch(method, path, body)
+                self._write_response(writer, status, answer, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes, bool]]:
+        """Return method, path, body and keep-alive flag of the next request or None if connection is closed."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, version = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > GenerationServer._max_body_size:
+            raise ConnectionError("request body is too large")
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+        return method, path, body, keep_alive
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, answer: Union[dict, str],
+                        keep_alive: bool) -> None:
+        """Write JSON answer or plain text answer, e.g. metrics."""
+        if isinstance(answer, str):
+            body, content_type = answer.encode("UTF-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(answer, ensure_ascii=False).encode("UTF-8"), "application/json"
+            content_type += "; charset=utf-8"
+        writer.write(
+            f"HTTP/1.1 {status} {GenerationServer._reasons[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[dict, str]]:
+        """Return status and answer of request."""
+        try:
+            if path == "/dictionaries":
+                self._check_method(method, "GET")
+                return 200, {"dictionaries": sorted(self._models)}
+            if path == "/stats":
+                self._check_method(method, "GET")
+                stats = self._registry.stats()
+                if self._generation_cache:
+                    stats["generation_cache"] = self._generation_cache.stats()
+                if Instrumentation.enabled():
+                    stats["instrumentation"] = Instrumentation.snapshot()
+                return 200, stats
+            if path == "/metrics":
+                self._check_method(method, "GET")
+                return 200, Instrumentation.prometheus_text()
+            if path.startswith("/dictionaries/"):
+                self._check_method(method, "DELETE")
+                return 200, await self._delete(path[len("/dictionaries/"):])
+            if path == "/generate":
+                self._check_method(method, "POST")
+                return 200, await self._generate(self._parse_body(body))
+            if path == "/ingest":
+                self._check_method(method, "POST")
+                return 200, await self._ingest(self._parse_body(body))
+            raise HTTPError(404, f"unknown path {path}")
+        except HTTPError as error:
+            return error.status, {"error": error.message}
+        except Exception as error:
+            return 500, {"error": f"internal error: {error!r}"}
+
+    @staticmethod
+    def _check_method(method: str, expected: str) -> None:
+        if method != expected:
+            raise HTTPError(405, f"{method} is not allowed")
+
+    @staticmethod
+    def _parse_body(body: bytes) -> dict:
+        try:
+            request = json.loads(body.decode("UTF-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "body must be JSON object")
+        return request
+
+    def _get_model(self, name: str) -> Model:
+        """Return open model of dictionary, which is not being created or deleted."""
+        if not isinstance(name, str) or name not in self._models:
+            raise HTTPError(404, f"unknown dictionary {name}")
+        if name in self._unavailable:
+            raise HTTPError(503, f"dictionary {name} is being created or deleted")
+        return self._models[name]
+
+    async def _generate(self, request: dict) -> dict:
+        model = self._get_model(request.get("dictionary"))
+        prompts, n, seed = request.get("prompts", [request.get("prompt")]), request.get("n", 1), request.get("seed")
+        if not isinstance(prompts, list) or not all(isinstance(prompt, str) for prompt in prompts):
+            raise HTTPError(400, "prompt must be string and prompts must be list of strings")
+        if not isinstance(n, int) or isinstance(n, bool) or n < 1 \
+                or not isinstance(seed, (int, type(None))) or isinstance(seed, bool):
+            raise HTTPError(400, "n must be positive integer and seed must be integer")
+        if n > self._max_n or len(prompts) > self._max_prompts:
+            raise HTTPError(413, f"n must be at most {self._max_n} and prompts at most {self._max_prompts}")
+        try:
+            settings = parse_generation_settings(request, self._settings)
+        except (TypeError, ValueError) as error:
+            raise HTTPError(400, f"invalid generation settings: {error}")
+        profile = bool(request.get("profile", False))
+        if profile and self._profile_dir is None:
+            raise HTTPError(400, "profiling is disabled")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._generation_executor, self._generate_answer, model, prompts, n, seed, settings, profile
+        )
+
+    def _generate_answer(self, model: Model, prompts: list[str], n: int, seed: Optional[int],
+                         settings: GenerationSettings, profile: bool) -> dict:
+        """Return answer of generation request, it runs in the generation executor, so profile is of its thread."""
+        if not profile:
+            return {"results": self._generate_results(model, prompts, n, seed, settings)}
+        os.makedirs(self._profile_dir, exist_ok=True)
+        path = os.path.join(self._profile_dir, f"generate-{time.time_ns()}.prof")
+        with Instrumentation.profile(path):
+            results = self._generate_results(model, prompts, n, seed, settings)
+        return {"results": results, "profile": path}
+
+    @staticmethod
+    def _generate_results(model: Model, prompts: list[str], n: int, seed: Optional[int],
+                          settings: GenerationSettings) -> list[list[str]]:
+        try:
+            if len(prompts) == 1 and n == 1 and seed is not None:
+                return [[model.generate(prompts[0], seed, settings)]]
+            return model.generate_batch(prompts, n, seed, settings)
+        except ValueError:
+            raise HTTPError(400, "every prompt must contain at least one latin or cyrillic letter")
+
+    async def _ingest(self, request: dict) -> dict:
+        name, path = request.get("dictionary"), request.get("path")
+        if not isinstance(name, str) or re.fullmatch(r"[A-Za-z_]+", name) is None:
+            raise HTTPError(400, "dictionary name must consist of latin letters and underscores")
+        if not isinstance(path, str) or not os.path.isfile(path):
+            raise HTTPError(400, f"file {path} not found")
+        tokenizer = request.get("tokenizer", "default")
+        if not isinstance(tokenizer, str) or tokenizer not in TOKENIZERS:
+            raise HTTPError(400, f"tokenizer must be one of {', '.join(TOKENIZERS)}")
+        order = request.get("order", 3)
+        if not isinstance(order, int) or isinstance(order, bool) or order < 2:
+            raise HTTPError(400, "order must be integer not less than 2")
+        continuations_count = request.get("continuations_count", 2)
+        if not isinstance(continuations_count, int) or isinstance(continuations_count, bool) or continuations_count < 1:
+            raise HTTPError(400, "continuations_count must be positive integer")
+        if name in self._updating:
+            raise HTTPError(409, f"dictionary {name} is being updated")
+        self._updating.add(name)
+        try:
+            model = self._models.get(name)
+            if model is None:
+                model = self._models[name] = Model(
+                    registry=self._registry, generation_cache=self._generation_cache, settings=self._settings
+                )
+                self._unavailable.add(name)
+                await asyncio.get_running_loop().run_in_executor(
+                    self._executor, model.create_new, name, tokenizer, order, continuations_count
+                )
+                self._unavailable.discard(name)
+            await asyncio.get_running_loop().run_in_executor(self._executor, model.read_and_update, path)
+        except UnicodeDecodeError:
+            raise HTTPError(400, f"file {path} is not UTF-8 text")
+        except OSError as error:
+            if error.filename != path:
+                raise
+            raise HTTPError(400, f"file {path} can not be read: {error.strerror}")
+        finally:
+            self._updating.discard(name)
+            self._unavailable.discard(name)
+        return {"dictionary": name}
+
+    async def _delete(self, name: str) -> dict:
+        self._get_model(name)
+        if name in self._updating:
+            raise HTTPError(409, f"dictionary {name} is being updated")
+        self._updating.add(name)
+        self._unavailable.add(name)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._models.pop(name).delete)
+        finally:
+            self._updating.discard(name)
+            self._unavailable.discard(name)
+        return {"dictionary": name}
+
+
+def apply_config(config: dict[str, str]) -> GenerationSettings:
+    """
+    Apply settings of config read by FileHandler and return its generation settings,
+    invalid values are ignored.
+    """
+    setters = {
+        "ingest_workers": TextGenerator.set_ingest_workers,
+        "memory_budget_mb": Model.set_memory_budget_mb,
+        "generation_cache_size": Model.set_generation_cache_size,
+        "generation_cache_ttl": Model.set_generation_cache_ttl,
+    }
+    for option, setter in setters.items():
+        if config.get(option, "").isdigit():
+            setter(int(config[option]))
+    for option, setter in (("count_encoding", FileHandler.set_count_encoding),
+                           ("dump_compression", FileHandler.set_dump_compression)):
+        try:
+            if option in config:
+                setter(config[option])
+        except ValueError:
+            pass
+    settings = GenerationSettings()
+    for options in (
+        ("max_generated_word_count",), ("generated_without_dot",), ("sampling", "temperature", "top_k", "top_p")
+    ):
+        try:
+            settings = parse_generation_settings({name: config[name] for name in options if name in config}, settings)
+        except ValueError:
+            pass
+    return settings
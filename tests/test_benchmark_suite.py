@@ -0,0 +1,36 @@
+"""Module tests synthetic corpora and comparison of results of the benchmark suite."""
+
+import unittest
+
+from benchmarks.corpus import CYRILLIC_LETTERS, generate_corpus
+from benchmarks.suite import METRICS, compare, run_corpus
+from model.text_parser import TextParser
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_cyrillic_corpus(self):
+        sentences = TextParser().parse_text(generate_corpus(1000, vocabulary_size=50, letters=CYRILLIC_LETTERS))
+        words = {word for sentence in sentences for word in sentence if word != "."}
+        self.assertEqual(sum(map(len, sentences)) - len(sentences), 1000)
+        self.assertLessEqual(len(words), 50)
+        self.assertTrue(all(set(word) <= set(CYRILLIC_LETTERS) for word in words))
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_regressions_by_direction(self):
+        baseline = {"results": {"latin": {"tokenize_words_per_second": 100.0, "load_ms": 10.0, "save_ms": 10.0}}}
+        current = {"results": {"latin": {"tokenize_words_per_second": 80.0, "load_ms": 10.5, "save_ms": 5.0}}}
+        rows = {row[1]: row for row in compare(baseline, current, threshold=0.1)}
+        self.assertEqual(set(rows), {"tokenize_words_per_second", "load_ms", "save_ms"})
+        self.assertAlmostEqual(rows["tokenize_words_per_second"][4], 0.2)
+        self.assertTrue(rows["tokenize_words_per_second"][5])
+        self.assertFalse(rows["load_ms"][5])
+        self.assertAlmostEqual(rows["save_ms"][4], -0.5)
+        self.assertFalse(rows["save_ms"][5])
+
+    def test_run_corpus_measures_all_metrics(self):
+        metrics = run_corpus(CYRILLIC_LETTERS, 2000, 100, repeats=1)
+        self.assertEqual(set(metrics), set(METRICS))
+        self.assertTrue(all(value is None or value > 0 for value in metrics.values()))
@@ -0,0 +1,60 @@
+"""Module tests cursors over contexts from context_cursor module."""
+
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.context_cursor import ContextCursor, TextContextCursor
+from model.file_handler import FileHandler
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+class TestContextCursor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text = generate_corpus(5000, vocabulary_size=40)
+        cls.words = [word for sentence in TextParser().parse_text(cls.text) for word in sentence] + ["unknown"]
+
+    def assert_same_as_text_lookup(self, store, max_length: int) -> None:
+        rng = random.Random(0)
+        for _ in range(50):
+            start = rng.randrange(len(self.words))
+            words = self.words[start:start + rng.randrange(4)]
+            cursor = store.context_cursor(words, max_length)
+            self.assertIsInstance(cursor, ContextCursor)
+            text_cursor = TextContextCursor(store, words, max_length)
+            for word in rng.choices(self.words, k=10):
+                self.assertEqual(cursor.continuations(), text_cursor.continuations())
+                cursor.advance(word)
+                text_cursor.advance(word)
+
+    def test_same_as_text_lookup(self):
+        for order in (2, 3, 5):
+            text_generator = TextGenerator(order=order)
+            text_generator.update_dicts_by_text(self.text)
+            self.assert_same_as_text_lookup(text_generator.ngrams_dict, order - 1)
+
+    def test_same_as_text_lookup_in_mapped_store(self):
+        text_generator = TextGenerator(order=4)
+        text_generator.update_dicts_by_text(self.text)
+        with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+            FileHandler.write_data(text_generator, "dictionary")
+            store = FileHandler.read_data("dictionary").ngrams_dict
+            self.assert_same_as_text_lookup(store, 3)
+            store.close()
+            os.remove(os.path.join(directory, "dictionary.tgm"))
+
+    def test_advance_by_generated_words(self):
+        text_generator = TextGenerator(continuations_count=1)
+        text_generator.update_dicts_by_text("a b c. x b d.")
+        cursor = text_generator.ngrams_dict.context_cursor(["x"], 2)
+        self.assertEqual(cursor.continuations(), ["b"])
+        cursor.advance("b")
+        self.assertEqual(cursor.continuations(), ["d"])
+        cursor.advance("q")
+        self.assertIsNone(cursor.continuations())
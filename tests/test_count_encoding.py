@@ -0,0 +1,237 @@
+"""Module tests count encodings and compression of binary dumps."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model import mapped_ngram_store
+from model.count_encoding import (
+    COMPRESSIONS, COUNT_ENCODINGS, QUANTIZERS, QuantizedCounts, decode_varint_edges, encode_varint_edges,
+    narrowest_typecode, quantize_counts, validate_encoding,
+)
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings
+from model.mapped_ngram_store import MappedNgramStore, read_dump_info, write_store
+from model.ngram_store import NgramStore
+from model.sampling import SamplingSettings
+from model.text_generator import TextGenerator
+
+
+LOSSLESS_ENCODINGS = ("raw", "narrow", "escape8", "varint")
+
+
+class TestQuantizers(unittest.TestCase):
+
+    def test_narrowest_typecode(self):
+        self.assertEqual(narrowest_typecode(0), "B")
+        self.assertEqual(narrowest_typecode(255), "B")
+        self.assertEqual(narrowest_typecode(256), "H")
+        self.assertEqual(narrowest_typecode(2**16), "I")
+        self.assertEqual(narrowest_typecode(2**40), "Q")
+        with self.assertRaises(OverflowError):
+            narrowest_typecode(2**64)
+
+    def test_counts_are_exact_up_to_limit(self):
+        for quantizer in QUANTIZERS.values():
+            for count in range(quantizer.exact_limit + 1):
+                self.assertEqual(quantizer.decode(quantizer.encode(count)), count)
+
+    def test_relative_error_and_idempotence(self):
+        for quantizer in QUANTIZERS.values():
+            for count in list(range(1, 5000)) + [10**6, 123_456_789]:
+                code = quantizer.encode(count)
+                if code == quantizer.escape:
+                    continue
+                decoded = quantizer.decode(code)
+                self.assertLessEqual(abs(decoded - count) / count, quantizer.ratio ** 0.5 - 1 + 0.5 / count)
+                self.assertEqual(quantizer.encode(decoded), code)
+
+    def test_large_counts_are_escaped(self):
+        counts = [1, 300, 2**60, 7, 2**40]
+        for name, quantizer in QUANTIZERS.items():
+            codes, escape_indexes, escape_counts = quantize_counts(counts, quantizer)
+            self.assertEqual(codes.typecode, quantizer.typecode)
+            self.assertIn(2, escape_indexes)
+            self.assertIn(2**60, escape_counts)
+            decoded = QuantizedCounts(codes, quantizer, escape_indexes, escape_counts)
+            self.assertEqual(len(decoded), len(counts))
+            self.assertEqual(decoded[2], 2**60)
+            self.assertEqual(decoded[1:5], [decoded[index] for index in range(1, 5)])
+            if name == "escape8":
+                self.assertEqual(decoded[:], counts)
+            else:
+                self.assertAlmostEqual(decoded[4] / 2**40, 1, delta=quantizer.ratio - 1)
+
+    def test_varint_round_trip(self):
+        edge_offsets = [0, 3, 3, 5]
+        edge_next = [2, 7, 2**31, 0, 1]
+        edge_count = [1, 2**40, 127, 128, 300]
+        byte_offsets, blob = encode_varint_edges(edge_offsets, edge_next, edge_count)
+        self.assertEqual(len(byte_offsets), len(edge_offsets))
+        for context in range(len(edge_offsets) - 1):
+            start, end = edge_offsets[context], edge_offsets[context + 1]
+            self.assertEqual(
+                decode_varint_edges(blob, byte_offsets[context], byte_offsets[context + 1]),
+                (edge_next[start:end], edge_count[start:end]),
+            )
+
+    def test_validate_encoding(self):
+        for count_encoding in COUNT_ENCODINGS:
+            for compression in COMPRESSIONS:
+                validate_encoding(count_encoding, compression)
+        with self.assertRaises(ValueError):
+            validate_encoding("float")
+        with self.assertRaises(ValueError):
+            validate_encoding("raw", "zip")
+
+
+class TestEncodedDumps(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text_generator = TextGenerator(continuations_count=3)
+        cls.text_generator.update_dicts_by_text(generate_corpus(5000, vocabulary_size=200))
+        cls.text_generator.update_dicts_by_count_dict({"мама мыла": {"раму": 2**60, "ёлку": 300}})
+        cls.store = cls.text_generator.ngrams_dict
+
+    def setUp(self):
+        file_descriptor, self.path = tempfile.mkstemp()
+        os.close(file_descriptor)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def open_store(self, count_encoding: str, compression: str = "none") -> MappedNgramStore:
+        with open(self.path, "wb") as file:
+            write_store(self.store, file, count_encoding=count_encoding, compression=compression)
+        mapped_store = MappedNgramStore(self.path)
+        self.addCleanup(mapped_store.close)
+        return mapped_store
+
+    def test_lossless_encodings(self):
+        for count_encoding in LOSSLESS_ENCODINGS:
+            for compression in COMPRESSIONS:
+                with self.subTest(count_encoding=count_encoding, compression=compression):
+                    mapped_store = self.open_store(count_encoding, compression)
+                    self.assertEqual(mapped_store.count_encoding, count_encoding)
+                    self.assertEqual(mapped_store, self.store)
+                    for context in ("мама мыла", *list(self.store)[:50]):
+                        self.assertEqual(mapped_store[context]._count_dict, self.store[context]._count_dict)
+                    self.assertEqual(mapped_store.as_ngram_store(), self.store)
+
+    def test_lossy_encodings_keep_tops(self):
+        for count_encoding in ("log8", "log16"):
+            for compression in COMPRESSIONS:
+                with self.subTest(count_encoding=count_encoding, compression=compression):
+                    mapped_store = self.open_store(count_encoding, compression)
+                    ratio = QUANTIZERS[count_encoding].ratio
+                    for context in self.store:
+                        self.assertEqual(
+                            mapped_store.get_continuations(context), self.store.get_continuations(context)
+                        )
+                        expected = self.store[context]._count_dict
+                        count_dict = mapped_store[context]._count_dict
+                        self.assertEqual(count_dict.keys(), expected.keys())
+                        for word, count in expected.items():
+                            self.assertLessEqual(abs(count_dict[word] - count) / count, ratio ** 0.5 - 1 + 0.5 / count)
+                    self.assertEqual(mapped_store["мама мыла"]._count_dict["раму"], 2**60)
+                    self.assertEqual(len(mapped_store.as_ngram_store()), len(self.store))
+
+    def test_generation_by_encoded_dumps(self):
+        settings = GenerationSettings(max_generated_word_count=20, sampling=SamplingSettings())
+        expected = self.text_generator.continue_phrase("мама мыла", seed=1, settings=settings)
+        top_expected = self.text_generator.continue_phrase("мама мыла", seed=1)
+        for count_encoding in COUNT_ENCODINGS:
+            with self.subTest(count_encoding=count_encoding):
+                text_generator = TextGenerator.from_store(self.open_store(count_encoding, "lzma"))
+                self.assertEqual(text_generator.continue_phrase("мама мыла", seed=1), top_expected)
+                text = text_generator.continue_phrase("мама мыла", seed=1, settings=settings)
+                if count_encoding in LOSSLESS_ENCODINGS:
+                    self.assertEqual(text, expected)
+
+    def test_compression_shrinks_dump(self):
+        self.open_store("raw")
+        raw_size = os.path.getsize(self.path)
+        for count_encoding in COUNT_ENCODINGS:
+            self.open_store(count_encoding, "lzma")
+            self.assertLess(os.path.getsize(self.path), raw_size)
+
+    def test_read_dump_info(self):
+        self.open_store("varint")
+        info = read_dump_info(self.path)
+        self.assertEqual(info.metadata["count_encoding"], "varint")
+        self.assertEqual(info.size, os.path.getsize(self.path))
+        self.open_store("varint", "lzma")
+        self.assertEqual(read_dump_info(self.path), info)
+
+    def test_reads_version_1_dumps(self):
+        with patch.object(mapped_ngram_store, "SECTIONS", mapped_ngram_store.SECTIONS[:8]), \
+                patch.object(mapped_ngram_store, "FORMAT_VERSION", 1), open(self.path, "wb") as file:
+            write_store(self.store, file)
+        mapped_store = MappedNgramStore(self.path)
+        self.addCleanup(mapped_store.close)
+        self.assertEqual(mapped_store, self.store)
+
+
+class TestNarrowCounts(unittest.TestCase):
+
+    def test_counts_are_widened(self):
+        store = NgramStore()
+        store.update_by_count_dict({"мама мыла": {"раму": 200}})
+        store.update_by_count_dict({"мама мыла": {"раму": 100, "ёлку": 1}})
+        self.assertEqual(store["мама мыла"]._count_dict, {"раму": 300, "ёлку": 1})
+        store.update_by_count_dict({"кошка ловит": {"мышь": 2**40}})
+        self.assertEqual(store["мама мыла"]._count_dict, {"раму": 300, "ёлку": 1})
+        self.assertEqual(store["кошка ловит"]._count_dict, {"мышь": 2**40})
+        self.assertEqual(store.get_changes()["мама мыла"], {"раму": 300, "ёлку": 1})
+
+
+class TestFileHandlerEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for patcher in (
+            patch.object(FileHandler, "_dumps_folder_path", self.directory.name),
+            patch.object(FileHandler, "_count_encoding", FileHandler._count_encoding),
+            patch.object(FileHandler, "_dump_compression", FileHandler._dump_compression),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def test_setters_reject_unknown_values(self):
+        with self.assertRaises(ValueError):
+            FileHandler.set_count_encoding("float")
+        with self.assertRaises(ValueError):
+            FileHandler.set_dump_compression("zstd")
+        self.assertEqual(FileHandler._count_encoding, "raw")
+        self.assertEqual(FileHandler._dump_compression, "none")
+
+    def test_write_and_read_encoded_dump(self):
+        FileHandler.set_count_encoding("log16")
+        FileHandler.set_dump_compression("lzma")
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text("Мама мыла раму. Сестра мыла кошку!")
+        FileHandler.write_data(text_generator, "dictionary")
+        read_generator = FileHandler.read_data("dictionary")
+        self.addCleanup(read_generator.ngrams_dict.close)
+        self.assertEqual(read_generator.ngrams_dict.count_encoding, "log16")
+        self.assertEqual(read_generator.ngrams_dict, text_generator.ngrams_dict)
+
+    def test_append_changes_to_compressed_dump(self):
+        FileHandler.set_dump_compression("lzma")
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text("Мама мыла раму. Сестра мыла кошку!")
+        FileHandler.write_data(text_generator, "dictionary")
+        text_generator.update_dicts_by_text("Мама мыла окно.")
+        with patch.object(mapped_ngram_store.lzma, "decompress", side_effect=AssertionError), \
+                patch.object(FileHandler, "_compaction_ratio", 0.25):
+            FileHandler.append_changes(text_generator, "dictionary")
+        dump_path = os.path.join(self.directory.name, "dictionary.tgm")
+        journal_path = os.path.join(self.directory.name, "dictionary.tgj")
+        self.assertGreater(os.path.getsize(journal_path), os.path.getsize(dump_path) * 0.25)
+        read_generator = FileHandler.read_data("dictionary")
+        self.addCleanup(read_generator.ngrams_dict.close)
+        self.assertEqual(read_generator.ngrams_dict, text_generator.ngrams_dict)
@@ -0,0 +1,112 @@
+"""Module tests CountMinSketch class and ingestion keeping only ngrams frequent by a sketch."""
+
+from collections import Counter
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.count_min_sketch import CountMinSketch, SketchReport, SketchSettings
+from model.file_handler import FileHandler
+from model.model import Model
+from model.pruning import PruningPolicy
+from model.text_generator import TextGenerator
+
+
+def as_count_dicts(store) -> dict:
+    return {context: dict(store[context]._count_dict) for context in store}
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.counts = Counter(f"key {rng.paretovariate(1.0):.0f} {rng.randrange(100)}" for _ in range(20000))
+
+    def test_estimates(self):
+        sketch = CountMinSketch(64, 4)
+        for key, count in self.counts.items():
+            sketch.add(key, count)
+        self.assertEqual(sketch.total, 20000)
+        estimates = {key: sketch.estimate(key) for key in self.counts}
+        self.assertTrue(all(estimates[key] >= count for key, count in self.counts.items()))
+        within_bound = sum(estimates[key] - count <= sketch.error_bound for key, count in self.counts.items())
+        self.assertGreaterEqual(within_bound / len(self.counts), sketch.confidence)
+        self.assertEqual(sketch.memory_size(), 64 * 4 * 8)
+
+    def test_wide_sketch_is_exact(self):
+        sketch = CountMinSketch(2**20, 2)
+        for key, count in self.counts.items():
+            self.assertEqual(sketch.add(key, count), count)
+        self.assertEqual({key: sketch.estimate(key) for key in self.counts}, dict(self.counts))
+        self.assertEqual(sketch.estimate("absent"), 0)
+
+    def test_dimensions(self):
+        sketch = CountMinSketch.for_error(0.01, 0.01)
+        self.assertEqual((sketch.width, sketch.depth), (272, 5))
+        self.assertEqual(SketchSettings.for_error(0.01, 0.01, min_count=3), SketchSettings(272, 5, 3))
+        for arguments in ((0, 0.1), (0.1, 1)):
+            with self.assertRaises(ValueError):
+                CountMinSketch.for_error(*arguments)
+        for values in ({"width": 0}, {"depth": 1.5}, {"min_count": True}):
+            with self.assertRaises(ValueError):
+                SketchSettings(**values)
+        with self.assertRaises(ValueError):
+            CountMinSketch(0, 1)
+
+    def test_report(self):
+        report = SketchReport(10, 2, 160, 200, 50, 2.7, 0.86)
+        self.assertEqual(report.kept_share, 0.25)
+
+
+class TestSketchIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.text = generate_corpus(5000)
+        self.exact = TextGenerator()
+        self.exact.update_dicts_by_text(self.text)
+        self.expected = as_count_dicts(self.exact.ngrams_dict.pruned(PruningPolicy(min_count=2)))
+
+    def test_wide_sketch_keeps_exact_counts_of_frequent_ngrams(self):
+        for two_pass in (True, False):
+            text_generator = TextGenerator()
+            with patch.object(TextGenerator, "_ingest_batch_size", 50):
+                report = text_generator.update_dicts_by_sketch(
+                    [[self.text]], SketchSettings(two_pass=two_pass), first_pass_chunk_streams=[[self.text]]
+                )
+            self.assertEqual(as_count_dicts(text_generator.ngrams_dict), self.expected)
+            self.assertEqual(report.total_count, self.exact.ngrams_dict.total_count)
+            self.assertEqual(report.kept_count, text_generator.ngrams_dict.total_count)
+            self.assertLess(report.error_bound, 1)
+            self.assertLess(len(text_generator.ngrams_dict.vocabulary), len(self.exact.ngrams_dict.vocabulary))
+
+    def test_narrow_sketch_keeps_every_frequent_ngram(self):
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_sketch(
+            [[self.text]], SketchSettings(width=2**10, depth=3), first_pass_chunk_streams=[[self.text]]
+        )
+        ngrams_dict = text_generator.ngrams_dict
+        for context, count_dict in self.expected.items():
+            self.assertEqual(ngrams_dict[context]._count_dict | count_dict, ngrams_dict[context]._count_dict)
+        for context in ngrams_dict:
+            for word, count in ngrams_dict[context]._count_dict.items():
+                self.assertEqual(count, self.exact.ngrams_dict[context]._count_dict[word])
+
+    def test_two_pass_needs_first_pass(self):
+        with self.assertRaises(ValueError):
+            TextGenerator().update_dicts_by_sketch([[self.text]], SketchSettings())
+
+    def test_model(self):
+        with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+            path = os.path.join(directory, "text.txt")
+            with open(path, "w", encoding="UTF-8") as file:
+                file.write(self.text)
+            model = Model()
+            model.create_new("dictionary")
+            self.assertIsNone(model.read_and_update(path))
+            model.create_new("sketched")
+            report = model.read_and_update(path, sketch=SketchSettings())
+            self.assertEqual(report.kept_count, model.registry.get("sketched").ngrams_dict.total_count)
+            self.assertEqual(as_count_dicts(FileHandler.read_data("sketched").ngrams_dict), self.expected)
@@ -0,0 +1,45 @@
+"""Module tests functions of the journal of changes appended to binary dumps."""
+
+import os
+import tempfile
+import unittest
+import uuid
+
+from model.delta_journal import append_record, ensure_journal, read_records
+
+
+class TestDeltaJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.tgj")
+        self.journal_id = uuid.uuid4().hex
+        self.records = [{"мама": {"мыла": 2}}, {"мама мыла": {"раму": 1, ".": 3}}]
+        ensure_journal(self.path, self.journal_id)
+        for record in self.records:
+            append_record(self.path, record)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_records(self):
+        ensure_journal(self.path, self.journal_id)
+        self.assertEqual(read_records(self.path, self.journal_id), self.records)
+
+    def test_torn_tail_is_cut_off(self):
+        size = os.path.getsize(self.path)
+        append_record(self.path, {"раму": {"и": 1}})
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 2)
+        self.assertEqual(read_records(self.path, self.journal_id), self.records)
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_corrupted_record_is_cut_off(self):
+        with open(self.path, "r+b") as file:
+            file.seek(-2, os.SEEK_END)
+            file.write(b"00")
+        self.assertEqual(read_records(self.path, self.journal_id), self.records[:1])
+
+    def test_journal_of_another_dump_is_removed(self):
+        self.assertEqual(read_records(self.path, uuid.uuid4().hex), [])
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,141 @@
+"""Module tests methods from FileHandler class."""
+
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.sampling import SamplingSettings, parse_sampling_settings
+from model.text_generator import TextGenerator
+
+
+class TestReadFileChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.text = "Первое предложение. Second sentence!\nТретье"
+        file_descriptor, self.path = tempfile.mkstemp()
+        with os.fdopen(file_descriptor, "w", encoding="UTF-8") as file:
+            file.write(self.text)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunks_make_up_file(self):
+        for chunk_size in (1, 3, 100):
+            chunks = list(FileHandler.read_file_chunks(self.path, chunk_size))
+            self.assertEqual("".join(chunks), FileHandler.read_file(self.path))
+            self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+
+
+class TestConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+
+    def test_save_and_read_fractional_values(self):
+        config = {"sampling": "weighted", "temperature": 0.7, "top_k": 5, "top_p": 0.9, "tokenizer": "unicode"}
+        FileHandler.save_config(config)
+        read_config = FileHandler.read_config()
+        self.assertEqual(read_config, {key: str(value) for key, value in config.items()})
+        self.assertEqual(parse_sampling_settings(read_config), SamplingSettings(0.7, 5, 0.9))
+
+
+class TestDumps(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.text_generator = TextGenerator()
+        self.text_generator.update_dicts_by_text("Мама мыла раму. Сестра мыла кошку!")
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        FileHandler.write_data(self.text_generator, "dictionary")
+        text_generator = FileHandler.read_data("dictionary")
+        self.assertEqual(text_generator.ngrams_dict, self.text_generator.ngrams_dict)
+        self.assertEqual(FileHandler.get_files(), ["dictionary"])
+        text_generator.ngrams_dict.close()
+        FileHandler.delete_file("dictionary")
+        self.assertEqual(FileHandler.get_files(), [])
+
+    def test_dump_is_synced_before_replace(self):
+        calls = []
+        fsync, replace = os.fsync, os.replace
+        with patch("os.fsync", side_effect=lambda fd: calls.append("fsync") or fsync(fd)), \
+                patch("os.replace", side_effect=lambda *paths: calls.append("replace") or replace(*paths)):
+            FileHandler.write_data(self.text_generator, "dictionary")
+        self.assertEqual(calls[:2], ["fsync", "replace"])
+        if hasattr(os, "O_DIRECTORY"):
+            self.assertEqual(calls, ["fsync", "replace", "fsync"])
+
+    def test_tokenizer_is_recorded(self):
+        text_generator = TextGenerator(tokenizer="unicode")
+        text_generator.update_dicts_by_text("Café déjà vu.")
+        FileHandler.write_data(text_generator, "dictionary")
+        text_generator = FileHandler.read_data("dictionary")
+        self.assertEqual(text_generator.tokenizer, "unicode")
+        self.assertEqual(text_generator.continue_phrase("Café"), "café déjà vu.")
+        text_generator.ngrams_dict.close()
+
+    def test_order_is_recorded(self):
+        text_generator = TextGenerator(order=4)
+        text_generator.update_dicts_by_text("a b c x. d b c y. d b c y.")
+        FileHandler.write_data(text_generator, "dictionary")
+        text_generator = FileHandler.read_data("dictionary")
+        self.assertEqual(text_generator.order, 4)
+        self.assertEqual(text_generator.continue_phrase("a b c"), "a b c x.")
+        text_generator.ngrams_dict.close()
+
+    def test_convert_legacy_dumps(self):
+        with open(os.path.join(self.directory.name, "old.pkl"), "wb") as file:
+            pickle.dump(self.text_generator, file)
+        self.assertEqual(FileHandler.read_data("old").ngrams_dict, self.text_generator.ngrams_dict)
+        self.assertEqual(FileHandler.convert_legacy_dumps(), ["old"])
+        self.assertEqual(os.listdir(self.directory.name), ["old.tgm"])
+        text_generator = FileHandler.read_data("old")
+        self.assertEqual(text_generator.ngrams_dict, self.text_generator.ngrams_dict)
+        text_generator.ngrams_dict.close()
+
+    def test_append_changes_and_replay(self):
+        FileHandler.write_data(self.text_generator, "dictionary")
+        self.text_generator.update_dicts_by_text("Мама мыла окно. Кошка спит.")
+        FileHandler.append_changes(self.text_generator, "dictionary")
+        self.assertTrue(os.path.isfile(os.path.join(self.directory.name, "dictionary.tgj")))
+        self.assertEqual(self.text_generator.ngrams_dict.get_changes(), {})
+        text_generator = FileHandler.read_data("dictionary")
+        self.assertEqual(text_generator.ngrams_dict, self.text_generator.ngrams_dict)
+
+        text_generator.update_dicts_by_text("Кошка спит.")
+        FileHandler.append_changes(text_generator, "dictionary")
+        self.assertEqual(FileHandler.read_data("dictionary").ngrams_dict, text_generator.ngrams_dict)
+
+    def test_compaction(self):
+        FileHandler.write_data(self.text_generator, "dictionary")
+        self.text_generator.update_dicts_by_text("Мама мыла окно.")
+        with patch.object(FileHandler, "_compaction_ratio", 0):
+            FileHandler.append_changes(self.text_generator, "dictionary")
+        self.assertEqual(os.listdir(self.directory.name), ["dictionary.tgm"])
+        text_generator = FileHandler.read_data("dictionary")
+        self.assertEqual(text_generator.ngrams_dict, self.text_generator.ngrams_dict)
+        text_generator.ngrams_dict.close()
+
+    def test_torn_append_keeps_saved_changes(self):
+        FileHandler.write_data(self.text_generator, "dictionary")
+        self.text_generator.update_dicts_by_text("Мама мыла окно.")
+        FileHandler.append_changes(self.text_generator, "dictionary")
+        saved = FileHandler.read_data("dictionary").ngrams_dict
+        self.text_generator.update_dicts_by_text("Кошка спит.")
+        FileHandler.append_changes(self.text_generator, "dictionary")
+        journal_path = os.path.join(self.directory.name, "dictionary.tgj")
+        with open(journal_path, "r+b") as file:
+            file.truncate(os.path.getsize(journal_path) - 1)
+        self.assertEqual(FileHandler.read_data("dictionary").ngrams_dict, saved)
@@ -1,8 +1,11 @@
 """Module tests methods from the FrequencyAnalyzer class."""
 
+import random
 import unittest
 
+from benchmarks.corpus import generate_corpus
 from model.frequency_analyzer import FrequencyAnalyzer
+from model.text_parser import TextParser
 
 
 class TestCreateCountDict(unittest.TestCase):
@@ -58,6 +61,49 @@ class TestCreateCountDict(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+class TestCreateCountDictBulk(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.frequency_analyzer = FrequencyAnalyzer()
+
+    def test_same_as_create_count_dict(self):
+        texts = [
+            [],
+            [["a", "."]],
+            [["a", "b", "a", "b", "c", "."]],
+            [["a", "b", "c", "a", "b", "c", "."]],
+            [["a", "b", "c", "."], ["a", "b", "a", "."]],
+            TextParser().parse_text(generate_corpus(5000, vocabulary_size=50)),
+        ]
+        for text in texts:
+            expected = self.frequency_analyzer.create_count_dict(text)
+            actual = self.frequency_analyzer.create_count_dict_bulk(text)
+            self.assertEqual(actual, expected)
+
+    def test_same_as_create_count_dict_with_order(self):
+        text = TextParser().parse_text(generate_corpus(3000, vocabulary_size=30))
+        for order in (2, 4, 5):
+            expected = self.frequency_analyzer.create_count_dict(text, order)
+            actual = self.frequency_analyzer.create_count_dict_bulk(text, order)
+            self.assertEqual(actual, expected)
+
+    def test_order(self):
+        text = [["a", "b", "c", "d", "."]]
+        self.assertEqual(
+            self.frequency_analyzer.create_count_dict(text, 2),
+            {"a": {"b": 1}, "b": {"c": 1}, "c": {"d": 1}, "d": {".": 1}},
+        )
+        count_dict = self.frequency_analyzer.create_count_dict(text, 5)
+        self.assertEqual(count_dict["a b c d"], {".": 1})
+        self.assertEqual(len(self.frequency_analyzer.count_id_ngrams(text, 5)), 5)
+
+    def test_ngrams_do_not_cross_sentences(self):
+        tokens, bigram_counts, trigram_counts = self.frequency_analyzer.count_id_ngrams([["a", "."], ["b", "."]])
+        self.assertEqual(tokens, ["a", ".", "b"])
+        self.assertEqual(bigram_counts, {(0, 1): 1, (2, 1): 1})
+        self.assertEqual(trigram_counts, {})
+
+
 class TestGet2MostFrequentlyContinued(unittest.TestCase):
 
     @classmethod
@@ -150,3 +196,86 @@ class TestGet2MostFrequentlyContinued(unittest.TestCase):
             )
             excepted = ["d", "i"]
             self.assertEqual(actual, excepted)
+
+
+class TestGetMostFrequentlyContinuations(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frequency_analyzer = FrequencyAnalyzer()
+
+    def test_works_with_empty_dict(self):
+        self.assertIsNone(self.frequency_analyzer.get_most_frequently_continuations({}, 3))
+
+    def test_same_as_2_most_frequently(self):
+        dictionary = {"b": 2, "a": 1, "d": 4, "c": 3, "i": 4, "g": 1}
+        self.assertEqual(
+            self.frequency_analyzer.get_most_frequently_continuations(dictionary, 2),
+            self.frequency_analyzer.get_2_most_frequently_continuation(dictionary),
+        )
+
+    def test_return_k_most_frequently(self):
+        dictionary = {"b": 2, "a": 2, "d": 4, "c": 3, "i": 4, "g": 1}
+        actual = self.frequency_analyzer.get_most_frequently_continuations(dictionary, 5)
+        self.assertEqual(actual, ["d", "i", "c", "a", "b"])
+
+
+class TestUpdateMostFrequentlyContinuations(unittest.TestCase):
+
+    @staticmethod
+    def update(top, count_dict, word, k):
+        FrequencyAnalyzer.update_most_frequently_continuations(
+            top, word, lambda continuation: (-count_dict[continuation], continuation), k
+        )
+
+    def test_continuation_gets_into_top(self):
+        count_dict = {"a": 3, "b": 2, "c": 2}
+        top = ["a", "b"]
+        count_dict["c"] += 1
+        self.update(top, count_dict, "c", 2)
+        self.assertEqual(top, ["a", "c"])
+
+    def test_continuation_moves_inside_top(self):
+        count_dict = {"a": 3, "b": 2}
+        top = ["a", "b"]
+        count_dict["b"] += 1
+        self.update(top, count_dict, "b", 2)
+        self.assertEqual(top, ["a", "b"])
+        count_dict["b"] += 1
+        self.update(top, count_dict, "b", 2)
+        self.assertEqual(top, ["b", "a"])
+
+    def test_same_as_full_recomputation(self):
+        rng = random.Random(0)
+        for k in (1, 2, 3, 5):
+            count_dict = {}
+            top = []
+            for _ in range(500):
+                word = rng.choice("abcdefghij")
+                count_dict[word] = count_dict.get(word, 0) + rng.randint(1, 3)
+                self.update(top, count_dict, word, k)
+                expected = FrequencyAnalyzer().get_most_frequently_continuations(count_dict, k)
+                self.assertEqual(top, expected)
+
+
+class TestMergeIdCounts(unittest.TestCase):
+
+    def test_same_as_counting_whole_text(self):
+        frequency_analyzer = FrequencyAnalyzer()
+        text = TextParser().parse_text(generate_corpus(3000, vocabulary_size=60))
+        shards = [text[:10], text[10:100], [], text[100:]]
+        merged = FrequencyAnalyzer.merge_id_counts(frequency_analyzer.count_id_ngrams(shard) for shard in shards)
+        self.assertEqual(
+            FrequencyAnalyzer.id_counts_to_count_dict(*merged),
+            frequency_analyzer.create_count_dict(text),
+        )
+
+    def test_merge_is_deterministic(self):
+        frequency_analyzer = FrequencyAnalyzer()
+        shards = [[["b", "a", "."]], [["a", "b", "."]]]
+        tokens, bigram_counts, trigram_counts = FrequencyAnalyzer.merge_id_counts(
+            frequency_analyzer.count_id_ngrams(shard) for shard in shards
+        )
+        self.assertEqual(tokens, ["b", "a", "."])
+        self.assertEqual(list(bigram_counts.items()), [((0, 1), 1), ((1, 2), 1), ((1, 0), 1), ((0, 2), 1)])
+        self.assertEqual(trigram_counts, {(0, 1, 2): 1, (1, 0, 2): 1})
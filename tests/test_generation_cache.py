@@ -0,0 +1,88 @@
+"""Module tests GenerationCache class and caching of generations in Model."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.generation_cache import GenerationCache
+from model.model import Model
+
+
+class TestGenerationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.time = 0.0
+        self.cache = GenerationCache(2, ttl=10, clock=lambda: self.time)
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.get(("a", 1)))
+        self.assertEqual(self.cache.put(("a", 1), ("x", "y")), ("x", "y"))
+        self.assertEqual(self.cache.get(("a", 1)), ("x", "y"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"]), (1, 1, 0.5, 1))
+        self.assertGreater(stats["memory_size"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put(("a", 1), ())
+        self.cache.put(("a", 2), ())
+        self.cache.get(("a", 1))
+        self.cache.put(("a", 3), ())
+        self.assertIsNone(self.cache.get(("a", 2)))
+        self.assertEqual(self.cache.get(("a", 1)), ())
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        self.cache.put(("a", 1), ())
+        self.time = 9.0
+        self.assertEqual(self.cache.get(("a", 1)), ())
+        self.time = 10.0
+        self.assertIsNone(self.cache.get(("a", 1)))
+        self.assertEqual(self.cache.stats()["memory_size"], 0)
+
+    def test_discard_dictionary(self):
+        self.cache.put(("a", 1), ())
+        self.cache.put(("b", 1), ())
+        self.cache.discard_dictionary("a")
+        self.assertIsNone(self.cache.get(("a", 1)))
+        self.assertEqual(self.cache.get(("b", 1)), ())
+
+
+class TestModelGenerationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.text_path = os.path.join(self.directory.name, "text.txt")
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write("a b c d. x b c e. q b c d.")
+        self.model = Model()
+        self.model.create_new("dictionary")
+        self.model.read_and_update(self.text_path)
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_prompts_with_same_context_are_generated_once(self):
+        text_generator = self.model.registry.get("dictionary")
+        for prompt in ("a b c", "x b c", "b c", "a b c"):
+            self.assertEqual(self.model.generate(prompt, seed=1), text_generator.continue_phrase(prompt, seed=1))
+        stats = self.model.generation_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.model.generate("a b c", seed=2)
+        self.model.generate("a b c")
+        self.assertEqual(self.model.generation_cache.stats()["misses"], 2)
+
+    def test_update_invalidates_cache(self):
+        self.model.generate("b c", seed=1)
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write("b c f. b c f. b c f. b c f.")
+        self.model.read_and_update(self.text_path)
+        self.assertEqual(self.model.generation_cache.stats()["entries"], 0)
+        self.assertEqual(
+            self.model.generate("b c", seed=1), self.model.registry.get("dictionary").continue_phrase("b c", seed=1)
+        )
+        self.assertEqual(self.model.generation_cache.stats()["misses"], 2)
@@ -0,0 +1,87 @@
+"""Module tests GenerationSettings class and generation with different settings in concurrent threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings, parse_generation_settings
+from model.model import Model
+from model.sampling import SamplingSettings
+from model.text_generator import TextGenerator
+
+
+class TestGenerationSettings(unittest.TestCase):
+
+    def test_invalid_settings(self):
+        for values in (
+            {"max_generated_word_count": -1}, {"generated_without_dot": "5"}, {"max_generated_word_count": True},
+            {"sampling": SamplingSettings(temperature=0)},
+        ):
+            with self.assertRaises(ValueError):
+                GenerationSettings(**values)
+
+    def test_settings_are_immutable_and_hashable(self):
+        settings = GenerationSettings(5, 3, SamplingSettings(top_k=2))
+        with self.assertRaises(AttributeError):
+            settings.max_generated_word_count = 7
+        self.assertEqual(hash(settings), hash(GenerationSettings(5, 3, SamplingSettings(top_k=2))))
+
+    def test_parse(self):
+        base = GenerationSettings(5, 3)
+        self.assertEqual(parse_generation_settings({}, base), base)
+        self.assertEqual(
+            parse_generation_settings({"max_generated_word_count": "7", "sampling": "weighted", "top_k": 2}, base),
+            GenerationSettings(7, 3, SamplingSettings(top_k=2)),
+        )
+        for options in ({"generated_without_dot": "x"}, {"max_generated_word_count": 2.5}, {"sampling": "beam"}):
+            with self.assertRaises(ValueError):
+                parse_generation_settings(options, base)
+
+
+class TestConcurrentGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.text_generator = TextGenerator(continuations_count=1)
+        self.text_generator.update_dicts_by_text("x" + " x" * 50 + ".")
+        self.settings = [GenerationSettings(count, count) for count in range(1, 9)]
+
+    def generate_with_settings(self, generate, settings: GenerationSettings) -> list[str]:
+        return [generate(prompt, settings) for _ in range(200) for prompt in ("x", "x x")]
+
+    def test_each_generation_uses_its_settings(self):
+        def generate(prompt, settings):
+            return self.text_generator.continue_phrase(prompt, seed=1, settings=settings)
+
+        with ThreadPoolExecutor(max_workers=len(self.settings)) as executor:
+            results = list(executor.map(partial(self.generate_with_settings, generate), self.settings))
+        for settings, phrases in zip(self.settings, results):
+            self.assertEqual(set(phrases), {
+                "x" + " x" * settings.max_generated_word_count + ".",
+                "x x" + " x" * settings.max_generated_word_count + ".",
+            })
+
+    def test_model_generations_match_serial_ones(self):
+        with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+            weighted = GenerationSettings(4, 2, SamplingSettings(temperature=3))
+            model = Model(settings=weighted)
+            model.create_new("dictionary")
+            text_path = os.path.join(directory, "text.txt")
+            with open(text_path, "w", encoding="UTF-8") as file:
+                file.write("a b c. a c b. b a c. c a b. a b a.")
+            model.read_and_update(text_path)
+            all_settings = [None, *self.settings, GenerationSettings(sampling=SamplingSettings(top_k=2))]
+
+            def generate(settings):
+                return [
+                    (model.generate(prompt, seed, settings), model.generate_batch([prompt], 2, seed, settings))
+                    for seed in range(20) for prompt in ("a", "b c", "c")
+                ]
+
+            with ThreadPoolExecutor(max_workers=len(all_settings)) as executor:
+                results = list(executor.map(generate, all_settings))
+            self.assertEqual(results, [generate(settings) for settings in all_settings])
+            self.assertEqual(results[0], generate(weighted))
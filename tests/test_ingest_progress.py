@@ -0,0 +1,67 @@
+"""Module tests progress reporting and cancellation of dictionary updates by IngestMonitor."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.ingest_progress import IngestCancelled, IngestMonitor, IngestProgress
+from model.model import Model
+from model.text_generator import TextGenerator
+
+
+class TestIngestMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.text_path = os.path.join(self.directory.name, "text.txt")
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write("Мама мыла раму. " * 30 + "a b c d.")
+        self.model = Model()
+        self.model.create_new("dictionary")
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_progress(self):
+        reports = []
+        total_bytes = os.path.getsize(self.text_path)
+        monitor = IngestMonitor(total_bytes, reports.append)
+        with patch.object(FileHandler, "_chunk_size", 100), patch.object(TextGenerator, "_ingest_batch_size", 7):
+            self.model.read_and_update(self.text_path, monitor)
+        # 31 sentences of 4 and 5 tokens give 30*(3+2) + (4+3) ngrams of orders 2 and 3
+        self.assertEqual(monitor.progress, IngestProgress(total_bytes, total_bytes, 31, 157))
+        self.assertEqual(reports[-1], monitor.progress)
+        self.assertEqual(reports, sorted(reports, key=lambda progress: (progress.bytes_read, progress.ngrams)))
+        self.assertGreater(len(reports), 5)
+
+    def test_progress_of_file_with_crlf_newlines(self):
+        with open(self.text_path, "w", encoding="UTF-8", newline="\r\n") as file:
+            file.write("Мама мыла раму.\n" * 30)
+        total_bytes = os.path.getsize(self.text_path)
+        monitor = IngestMonitor(total_bytes)
+        with patch.object(FileHandler, "_chunk_size", 100):
+            self.model.read_and_update(self.text_path, monitor)
+        self.assertEqual(monitor.progress.bytes_read, total_bytes)
+
+    def test_parallel_progress(self):
+        monitor = IngestMonitor()
+        with patch.object(TextGenerator, "_ingest_workers", 2):
+            self.model.read_and_update(self.text_path, monitor)
+        self.assertEqual(monitor.progress.sentences, 31)
+        self.assertEqual(monitor.progress.ngrams, 157)
+
+    def test_cancelled_update_leaves_dictionary_unchanged(self):
+        self.model.read_and_update(self.text_path)
+        text_generator = self.model.registry.get("dictionary")
+        monitor = IngestMonitor(callback=lambda progress: monitor.cancel() if progress.sentences else None)
+        with patch.object(TextGenerator, "_ingest_batch_size", 7), self.assertRaises(IngestCancelled):
+            self.model.read_and_update(self.text_path, monitor)
+        # cancel is called by the report of the first batch, the update stops at the report of the second one
+        self.assertEqual(monitor.progress.sentences, 14)
+        self.assertIs(self.model.registry.get("dictionary"), text_generator)
+        self.assertEqual(FileHandler.read_data("dictionary").ngrams_dict["мама"]._count_dict, {"мыла": 30})
@@ -0,0 +1,85 @@
+"""Module tests timers, export and profiling of Instrumentation class."""
+
+import os
+import pstats
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings
+from model.instrumentation import Instrumentation
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_generator = TextGenerator()
+        self.text_generator.update_dicts_by_text("Мама мыла раму. Мама мыла раму.")
+
+    def tearDown(self):
+        Instrumentation.disable()
+        Instrumentation.reset()
+        self.directory.cleanup()
+
+    def test_disabled_functions_are_original(self):
+        originals = (TextGenerator.__dict__["continue_phrase"], FileHandler.__dict__["read_file"])
+        Instrumentation.enable()
+        self.assertTrue(Instrumentation.enabled())
+        self.assertIsNot(TextGenerator.__dict__["continue_phrase"], originals[0])
+        Instrumentation.disable()
+        self.assertFalse(Instrumentation.enabled())
+        self.assertEqual((TextGenerator.__dict__["continue_phrase"], FileHandler.__dict__["read_file"]), originals)
+        self.text_generator.continue_phrase("мама")
+        self.assertEqual(Instrumentation.snapshot(), {})
+
+    def test_snapshot(self):
+        Instrumentation.enable()
+        Instrumentation.enable()    # enabling twice does not wrap wrappers
+        self.assertEqual(self.text_generator.continue_phrase("мама"), "мама мыла раму.")
+        self.text_generator.continue_phrase("мыла", settings=GenerationSettings(max_generated_word_count=1))
+        TextParser().parse_text("Мама мыла раму.")
+        snapshot = Instrumentation.snapshot()
+        self.assertEqual(snapshot["TextGenerator.continue_phrase"]["calls"], 2)
+        self.assertEqual(snapshot["TextParser.parse_text"]["calls"], 3)     # once more by continue_phrase
+        self.assertGreaterEqual(
+            snapshot["TextGenerator.continue_phrase"]["seconds"], snapshot["TextGenerator.continue_phrase"]["max_seconds"]
+        )
+        self.assertEqual(
+            set(snapshot["TextParser.parse_text"]), {"calls", "seconds", "max_seconds"}
+        )
+        Instrumentation.reset()
+        self.assertEqual(Instrumentation.snapshot(), {})
+
+    def test_file_handler(self):
+        path = os.path.join(self.directory.name, "text.txt")
+        with open(path, "w", encoding="UTF-8") as file:
+            file.write("a" * 250)
+        Instrumentation.enable()
+        with patch.object(FileHandler, "_chunk_size", 100):
+            self.assertEqual("".join(FileHandler.read_file_chunks(path)), "a" * 250)
+        self.assertEqual(FileHandler.read_file(path), "a" * 250)
+        snapshot = Instrumentation.snapshot()
+        self.assertEqual(snapshot["FileHandler.read_file_chunks"]["calls"], 3)      # items of a generator
+        self.assertEqual(snapshot["FileHandler.read_file"]["calls"], 1)
+
+    def test_prometheus_text(self):
+        Instrumentation.enable()
+        self.text_generator.continue_phrase("мама")
+        lines = Instrumentation.prometheus_text().splitlines()
+        self.assertIn("# TYPE textgen_calls_total counter", lines)
+        self.assertIn("# TYPE textgen_max_seconds gauge", lines)
+        self.assertIn('textgen_calls_total{function="TextGenerator.continue_phrase"} 1', lines)
+        for line in lines:
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
+
+    def test_profile(self):
+        path = os.path.join(self.directory.name, "generate.prof")
+        with Instrumentation.profile(path):
+            self.text_generator.continue_phrase("мама")
+        functions = {function for _, _, function in pstats.Stats(path).stats}
+        self.assertIn("continue_phrase", functions)
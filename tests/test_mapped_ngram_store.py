@@ -0,0 +1,80 @@
+"""Module tests writing binary dumps and MappedNgramStore class."""
+
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus import generate_corpus
+from model.mapped_ngram_store import MAGIC, MappedNgramStore, write_store
+from model.ngram_store import NgramStore
+from model.text_generator import TextGenerator
+
+
+class TestMappedNgramStore(unittest.TestCase):
+
+    def setUp(self):
+        self.text_generator = TextGenerator(continuations_count=3)
+        self.text_generator.update_dicts_by_text(
+            generate_corpus(5000, vocabulary_size=200) + " Мама мыла раму. Мама мыла ёлку!"
+        )
+        self.store = self.text_generator.ngrams_dict
+        file_descriptor, self.path = tempfile.mkstemp()
+        with os.fdopen(file_descriptor, "wb") as file:
+            write_store(self.store, file)
+        self.mapped_store = MappedNgramStore(self.path)
+
+    def tearDown(self):
+        self.mapped_store.close()
+        os.remove(self.path)
+
+    def test_equal_to_written_store(self):
+        self.assertEqual(len(self.mapped_store), len(self.store))
+        self.assertEqual(self.mapped_store, self.store)
+        self.assertEqual(self.mapped_store.continuations_count, 3)
+
+    def test_get_continuations(self):
+        for context in self.store:
+            self.assertEqual(self.mapped_store.get_continuations(context), self.store.get_continuations(context))
+        self.assertEqual(self.mapped_store.get_continuations("мама мыла"), ["раму", "ёлку"])
+        self.assertIsNone(self.mapped_store.get_continuations("собака"))
+        self.assertNotIn("ёлку мама", self.mapped_store)
+
+    def test_as_ngram_store_can_be_updated(self):
+        store = self.mapped_store.as_ngram_store()
+        self.assertIsInstance(store, NgramStore)
+        self.assertEqual(store, self.store)
+        store.update_by_count_dict({"мама мыла": {"раму": 5}})
+        self.assertEqual(store.get_continuations("мама мыла")[0], "раму")
+
+    def test_add_changes(self):
+        changes = {"мама мыла": {"окно": 3}, "кошка ловит": {"мышь": 1}}
+        self.mapped_store.add_changes(changes)
+        self.store.update_by_count_dict(changes)
+        self.assertEqual(len(self.mapped_store), len(self.store))
+        self.assertEqual(self.mapped_store, self.store)
+        self.assertEqual(self.mapped_store.get_continuations("мама мыла"), ["окно", "раму", "ёлку"])
+        self.assertEqual(self.mapped_store.get_continuations("кошка ловит"), ["мышь"])
+        self.assertEqual(self.mapped_store.as_ngram_store(), self.store)
+        self.assertEqual(self.mapped_store.as_ngram_store().get_changes(), {})
+
+    def test_text_generator_loads_store_before_update(self):
+        text_generator = TextGenerator.from_store(MappedNgramStore(self.path))
+        self.assertTrue(text_generator.ngrams_dict.read_only)
+        self.assertEqual(text_generator.continue_phrase("мама мыла раму"), "мама мыла раму.")
+        text_generator.update_dicts_by_text("Кошка ловит мышь.")
+        self.assertIsInstance(text_generator.ngrams_dict, NgramStore)
+        self.assertEqual(text_generator.ngrams_dict.get_continuations("кошка ловит"), ["мышь"])
+        self.assertIn("мама мыла", text_generator.ngrams_dict)
+
+    def test_wrong_magic_or_version(self):
+        with open(self.path, "rb") as file:
+            content = file.read()
+        for broken in (b"NOTADUMP" + content[len(MAGIC):], content[:len(MAGIC)] + b"\xff" + content[len(MAGIC) + 1:]):
+            file_descriptor, path = tempfile.mkstemp()
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(broken)
+            try:
+                with self.assertRaises(ValueError):
+                    MappedNgramStore(path)
+            finally:
+                os.remove(path)
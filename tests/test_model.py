@@ -0,0 +1,119 @@
+"""Module tests updates of Model published as new versions of text generators while generation runs."""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.model import Model
+from model.ngram import Ngram
+from model.text_generator import TextGenerator
+
+
+class TestTextGeneratorCopy(unittest.TestCase):
+
+    def assert_copy_is_independent(self, text_generator: TextGenerator) -> None:
+        expected = text_generator.ngrams_dict["a"]
+        text_generator_copy = text_generator.copy()
+        text_generator_copy.update_dicts_by_text("a c. a c. a c.")
+        self.assertEqual(text_generator.ngrams_dict["a"], expected)
+        self.assertEqual(text_generator_copy.ngrams_dict["a"]._count_dict, {"b": 2, "c": 3})
+        self.assertNotEqual(text_generator_copy.version, text_generator.version)
+        self.assertEqual(text_generator.continue_phrase("a"), "a b.")
+
+    def test_ngram_store(self):
+        text_generator = TextGenerator(continuations_count=1)
+        text_generator.update_dicts_by_text("a b. a b.")
+        self.assert_copy_is_independent(text_generator)
+
+    def test_ngram_dict(self):
+        self.assert_copy_is_independent(TextGenerator(
+            {"a": Ngram("a", {"b": 2}, continuations_count=1), "b": Ngram("b", {".": 2}, continuations_count=1)},
+            continuations_count=1,
+        ))
+
+    def test_mapped_store(self):
+        text_generator = TextGenerator(continuations_count=1)
+        text_generator.update_dicts_by_text("a b. a b.")
+        with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+            FileHandler.write_data(text_generator, "dictionary")
+            mapped_text_generator = FileHandler.read_data("dictionary")
+            self.assert_copy_is_independent(mapped_text_generator)
+            mapped_text_generator.ngrams_dict.close()
+
+
+class TestConcurrentUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.model = Model()
+        self.model.create_new("dictionary")
+        self.paths = []
+        for index in range(6):
+            self.paths.append(os.path.join(self.directory.name, f"text_{index}.txt"))
+            with open(self.paths[-1], "w", encoding="UTF-8") as file:
+                file.write("a b x. c d y. " * 200 + f"w{index} a b. w{index} c d.")
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_generation_sees_only_published_versions(self):
+        errors = []
+        updated = threading.Event()
+
+        def update(paths):
+            try:
+                for path in paths:
+                    self.model.read_and_update(path)
+            except Exception as error:
+                errors.append(error)
+
+        def generate():
+            try:
+                while not updated.is_set():
+                    store = self.model.registry.get("dictionary").ngrams_dict
+                    if "a" in store:
+                        # every file adds equal counts of "a b" and "c d", so a published version has them equal
+                        self.assertEqual(store["a"]._count_dict["b"], store["c"]._count_dict["d"])
+                    self.model.generate("a", seed=1)
+                    self.model.generate_batch(["c", "w1 a"], 2)
+            except Exception as error:
+                errors.append(error)
+
+        # one sentence per batch and frequent switches of threads, so an update in place would be seen by readers
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            with patch.object(TextGenerator, "_ingest_batch_size", 1):
+                writers = [threading.Thread(target=update, args=(self.paths[index::2],)) for index in range(2)]
+                readers = [threading.Thread(target=generate) for _ in range(4)]
+                for thread in readers + writers:
+                    thread.start()
+                for thread in writers:
+                    thread.join()
+                updated.set()
+                for thread in readers:
+                    thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertEqual(errors, [])
+        store = self.model.registry.get("dictionary").ngrams_dict
+        self.assertEqual(store["a"]._count_dict, {"b": 201 * len(self.paths)})
+        self.assertEqual(FileHandler.read_data("dictionary").ngrams_dict["c"], store["c"])
+        self.assertEqual(self.model.generate("a b"), "a b x.")
+
+    def test_failed_update_keeps_published_version(self):
+        self.model.read_and_update(self.paths[0])
+        text_generator = self.model.registry.get("dictionary")
+        with open(self.paths[1], "wb") as file:
+            file.write(b"a b \xff.")
+        with self.assertRaises(UnicodeDecodeError):
+            self.model.read_and_update(self.paths[1])
+        self.assertIs(self.model.registry.get("dictionary"), text_generator)
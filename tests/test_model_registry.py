@@ -0,0 +1,125 @@
+"""Module tests ModelRegistry class and switching of dictionaries in Model."""
+
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.model import Model
+from model.model_registry import ModelRegistry
+from model.text_generator import TextGenerator
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.loaded = []
+        self.size = TextGenerator().memory_size()
+
+    def load(self, name: str) -> TextGenerator:
+        self.loaded.append(name)
+        return TextGenerator()
+
+    def test_lazy_loading_and_stats(self):
+        registry = ModelRegistry(self.load, 10 * self.size)
+        self.assertEqual(self.loaded, [])
+        text_generator = registry.get("a")
+        self.assertIs(registry.get("a"), text_generator)
+        registry.get("b")
+        self.assertEqual(self.loaded, ["a", "b"])
+        stats = registry.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 2, 0))
+        self.assertEqual(stats["resident"], ["a", "b"])
+        self.assertEqual(stats["memory_size"], 2 * self.size)
+
+    def test_least_recently_used_is_evicted(self):
+        registry = ModelRegistry(self.load, 2 * self.size)
+        registry.get("a")
+        registry.get("b")
+        registry.get("a")
+        registry.get("c")
+        self.assertEqual(registry.stats()["resident"], ["a", "c"])
+        self.assertEqual(registry.stats()["evictions"], 1)
+        registry.get("b")
+        self.assertEqual(self.loaded, ["a", "b", "c", "b"])
+
+    def test_last_used_is_kept_over_budget(self):
+        registry = ModelRegistry(self.load, 0)
+        registry.get("a")
+        registry.get("b")
+        self.assertEqual(registry.stats()["resident"], ["b"])
+
+    def test_loading_does_not_block_other_dictionaries(self):
+        loading, release = threading.Event(), threading.Event()
+
+        def load(name: str) -> TextGenerator:
+            if name == "slow":
+                loading.set()
+                release.wait(5)
+            return self.load(name)
+        registry = ModelRegistry(load, 10 * self.size)
+        fast = registry.get("fast")
+        threads = [threading.Thread(target=registry.get, args=("slow",)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(loading.wait(5))
+        self.assertIs(registry.get("fast"), fast)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loaded, ["fast", "slow"])
+        self.assertEqual(registry.stats()["misses"], 2)
+
+    def test_put_and_discard(self):
+        registry = ModelRegistry(self.load, 10 * self.size)
+        text_generator = TextGenerator()
+        registry.put("a", text_generator)
+        self.assertIs(registry.get("a"), text_generator)
+        registry.discard("a")
+        self.assertIsNot(registry.get("a"), text_generator)
+        self.assertEqual(self.loaded, ["a"])
+
+    def test_load_racing_discard_is_not_resident(self):
+        loading, release = threading.Event(), threading.Event()
+
+        def load(name: str) -> TextGenerator:
+            loading.set()
+            release.wait(5)
+            return self.load(name)
+        registry = ModelRegistry(load, 10 * self.size)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(registry.get("a")))
+        thread.start()
+        self.assertTrue(loading.wait(5))
+        registry.discard("a")
+        release.set()
+        thread.join()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(registry.stats()["resident"], [])
+        self.assertIsNot(registry.get("a"), results[0])
+        self.assertEqual(self.loaded, ["a", "a"])
+
+
+class TestModelSwitching(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_switching_does_not_reload(self):
+        model = Model()
+        model.create_new("first")
+        model.create_new("second")
+        model = Model("first")
+        model.open_model("second")
+        model.open_model("first")
+        model.open_model("second")
+        model.open_model("first")
+        stats = model.registry.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
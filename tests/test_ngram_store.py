@@ -0,0 +1,137 @@
+"""Module tests methods from Vocabulary, IntIndex and NgramStore classes."""
+
+import pickle
+import unittest
+
+from benchmarks.corpus import generate_corpus
+from model.frequency_analyzer import FrequencyAnalyzer
+from model.ngram import Ngram
+from model.ngram_store import IntIndex, NgramDict, NgramStore, Vocabulary
+from model.text_generator import TextGenerator
+from model.text_parser import TextParser
+
+
+class TestVocabulary(unittest.TestCase):
+
+    def test_intern_returns_same_id_for_same_token(self):
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.intern("a"), 0)
+        self.assertEqual(vocabulary.intern("b"), 1)
+        self.assertEqual(vocabulary.intern("a"), 0)
+        self.assertEqual(len(vocabulary), 2)
+        self.assertEqual(vocabulary.get_token(1), "b")
+
+    def test_unknown_token(self):
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.get_id("a"), -1)
+        self.assertNotIn("a", vocabulary)
+
+
+class TestIntIndex(unittest.TestCase):
+
+    def test_set_and_get_many_keys(self):
+        index = IntIndex()
+        keys = [i * 7919 << 32 | i for i in range(1000)]
+        for value, key in enumerate(keys):
+            index.set(key, value)
+        self.assertEqual(len(index), 1000)
+        self.assertEqual([index.get(key) for key in keys], list(range(1000)))
+        self.assertEqual(index.get(1), -1)
+
+    def test_set_replaces_value(self):
+        index = IntIndex()
+        index.set(5, 1)
+        index.set(5, 2)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get(5), 2)
+
+
+class TestNgramStore(unittest.TestCase):
+
+    def setUp(self):
+        self.count_dict = FrequencyAnalyzer().create_count_dict(
+            TextParser().parse_text("Мама мыла раму. Сестра мыла раму и кошку. Мама мыла кошку!")
+        )
+
+    def test_equal_to_ngram_dict(self):
+        store = NgramStore()
+        store.update_by_count_dict(self.count_dict)
+        ngrams = NgramDict()
+        ngrams.update_by_count_dict(self.count_dict)
+        self.assertEqual(store, ngrams)
+        self.assertEqual(len(store), len(ngrams))
+
+    def test_get_continuations(self):
+        store = NgramStore()
+        store.update_by_count_dict(self.count_dict)
+        self.assertEqual(store.get_continuations("мыла"), ["раму", "кошку"])
+        self.assertEqual(store.get_continuations("мыла раму"), [".", "и"])
+        self.assertIsNone(store.get_continuations("раму мама"))
+        self.assertIsNone(store.get_continuations("собака"))
+
+    def test_prefix_context_without_continuations_is_absent(self):
+        store = NgramStore()
+        store.update_by_count_dict({"a b": {"c": 1}})
+        self.assertNotIn("a", store)
+        self.assertIn("a b", store)
+        self.assertEqual(list(store), ["a b"])
+
+    def test_update_adds_counts(self):
+        store = NgramStore()
+        store.update_by_count_dict({"a": {"b": 1, "c": 1}})
+        store.update_by_count_dict({"a": {"c": 2, "d": 5}})
+        expected = Ngram(text="a", count_dict={"b": 1, "c": 3, "d": 5})
+        self.assertEqual(store["a"], expected)
+        self.assertEqual(store.get_continuations("a"), ["d", "c"])
+
+    def test_get_changes(self):
+        store = NgramStore()
+        store.update_by_count_dict({"a": {"b": 1}, "a b": {"c": 2}})
+        self.assertEqual(store.get_changes(), {"a": {"b": 1}, "a b": {"c": 2}})
+        store.mark_saved()
+        self.assertEqual(store.get_changes(), {})
+        store.update_by_count_dict({"a": {"b": 2, "d": 1}})
+        self.assertEqual(store.get_changes(), {"a": {"b": 2, "d": 1}})
+
+    def test_pickle(self):
+        store = NgramStore()
+        store.update_by_count_dict(self.count_dict)
+        self.assertEqual(pickle.loads(pickle.dumps(store)), store)
+
+
+class TestTextGeneratorOnStore(unittest.TestCase):
+
+    def test_generator_uses_store_by_default(self):
+        text_generator = TextGenerator()
+        self.assertIsInstance(text_generator.ngrams_dict, NgramStore)
+
+    def test_continue_phrase(self):
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text("x y z. x y z. y q.")
+        self.assertEqual(text_generator.continue_phrase("x"), "x y z.")
+        self.assertEqual(text_generator.continue_phrase("a x y"), "a x y z.")
+
+    def test_dump_with_plain_dict_is_upgraded(self):
+        text_generator = TextGenerator({"x": Ngram(text="x", most_frequently_continuations_list=["y"])})
+        text_generator._ngrams_dict = dict(text_generator._ngrams_dict)
+        restored = pickle.loads(pickle.dumps(text_generator))
+        self.assertIsInstance(restored.ngrams_dict, NgramDict)
+        self.assertEqual(restored.continue_phrase("x"), "x y.")
+
+
+class TestUpdateByIdCounts(unittest.TestCase):
+
+    def test_same_as_update_by_count_dict(self):
+        frequency_analyzer = FrequencyAnalyzer()
+        text_parser = TextParser()
+        store_by_count_dict = NgramStore()
+        store_by_id_counts = NgramStore()
+        for seed in range(3):
+            parsed_text = text_parser.parse_text(generate_corpus(3000, vocabulary_size=100, seed=seed))
+            store_by_count_dict.update_by_count_dict(frequency_analyzer.create_count_dict(parsed_text))
+            store_by_id_counts.update_by_id_counts(*frequency_analyzer.count_id_ngrams(parsed_text))
+        self.assertEqual(store_by_id_counts, store_by_count_dict)
+        for context in store_by_count_dict:
+            self.assertEqual(
+                store_by_id_counts.get_continuations(context), store_by_count_dict.get_continuations(context)
+            )
@@ -0,0 +1,152 @@
+"""Module tests pruning policies of ngram stores, TextGenerator and Model."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.corpus import generate_corpus
+from model.file_handler import FileHandler
+from model.model import Model
+from model.ngram import Ngram
+from model.ngram_store import NgramDict, NgramStore
+from model.pruning import PruningPolicy, PruningReport
+from model.text_generator import TextGenerator
+
+
+COUNT_DICT = {"a": {"b": 2, "c": 1, "d": 5, "e": 1}, "b": {".": 2}, "a b": {".": 2}, "x": {"y": 1}}
+
+
+def as_count_dicts(store) -> dict:
+    return {context: dict(store[context]._count_dict) for context in store}
+
+
+class TestPruningPolicy(unittest.TestCase):
+
+    def test_validation(self):
+        for values in ({"min_count": -1}, {"max_continuations": 1.5}, {"max_memory_mb": -1}, {"min_count": True},
+                       {"max_memory_mb": float("nan")}, {"max_memory_mb": "1"}):
+            with self.assertRaises(ValueError):
+                PruningPolicy(**values)
+        self.assertEqual(PruningPolicy(max_memory_mb=0.5).max_memory_bytes, 2**19)
+
+    def test_ingestion_policy(self):
+        policy = PruningPolicy(min_count=3, max_continuations=2, max_memory_mb=8)
+        self.assertEqual(policy.ingestion_policy(), PruningPolicy(max_memory_mb=6))
+
+    def test_report(self):
+        report = PruningReport(4, 2, 10, 5, 20, 15, 1000, 400)
+        self.assertEqual(report.memory_saved, 600)
+        self.assertEqual(report.count_kept_share, 0.75)
+
+
+class TestStorePruning(unittest.TestCase):
+
+    def setUp(self):
+        self.store = NgramStore(continuations_count=3)
+        self.store.update_by_count_dict(COUNT_DICT)
+        self.ngram_dict = NgramDict(
+            {text: Ngram(text, dict(count_dict), continuations_count=3) for text, count_dict in COUNT_DICT.items()},
+            continuations_count=3,
+        )
+
+    def test_min_count(self):
+        for store in (self.store, self.ngram_dict):
+            pruned = store.pruned(PruningPolicy(min_count=2))
+            self.assertEqual(as_count_dicts(pruned), {"a": {"b": 2, "d": 5}, "b": {".": 2}, "a b": {".": 2}})
+            # the most frequent continuations are chosen again after "c" has been removed
+            self.assertEqual(pruned.get_continuations("a"), ["d", "b"])
+            self.assertEqual((len(pruned), pruned.edges_count, pruned.total_count), (3, 4, 11))
+            self.assertEqual(as_count_dicts(store), COUNT_DICT)
+        self.assertNotIn("y", self.store.pruned(PruningPolicy(min_count=2)).vocabulary)
+
+    def test_max_continuations(self):
+        for store in (self.store, self.ngram_dict):
+            pruned = store.pruned(PruningPolicy(max_continuations=2))
+            self.assertEqual(pruned["a"]._count_dict, {"d": 5, "b": 2})
+            self.assertEqual(pruned["x"]._count_dict, {"y": 1})
+            self.assertEqual(pruned.get_continuations("a"), ["d", "b"])
+
+    def test_pruned_store_is_updated(self):
+        pruned = self.store.pruned(PruningPolicy(min_count=2))
+        pruned.update_by_count_dict({"a": {"c": 6}})
+        self.assertEqual(pruned.get_continuations("a"), ["c", "d", "b"])
+
+    def test_memory_limit_evicts_the_least_frequent_contexts(self):
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text(generate_corpus(5000))
+        store = text_generator.ngrams_dict
+        for store in (store, store.pruned(PruningPolicy()), NgramDict({context: store[context] for context in store})):
+            policy = PruningPolicy(max_memory_mb=store.memory_size() / 2 / 2**20)
+            pruned = store.pruned(policy)
+            self.assertLessEqual(pruned.memory_size(), policy.max_memory_bytes)
+            self.assertGreater(pruned.memory_size(), policy.max_memory_bytes / 4)
+            totals = {context: sum(store[context]._count_dict.values()) for context in store}
+            kept = set(pruned)
+            self.assertLessEqual(
+                max(total for context, total in totals.items() if context not in kept),
+                min(total for context, total in totals.items() if context in kept),
+            )
+            for context in kept:
+                self.assertEqual(pruned[context]._count_dict, store[context]._count_dict)
+
+    def test_policy_keeping_everything(self):
+        self.assertEqual(as_count_dicts(self.store.pruned(PruningPolicy())), COUNT_DICT)
+        self.assertEqual(self.store.pruned(PruningPolicy()).get_continuations("a"), ["d", "b", "c"])
+
+
+class TestTextGeneratorPruning(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.text_path = os.path.join(self.directory.name, "text.txt")
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write("Мама мыла раму. " * 3 + "Мама мыла пол. Папа ушел.")
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    def test_prune(self):
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text(FileHandler.read_file(self.text_path))
+        version = text_generator.version
+        report = text_generator.prune(PruningPolicy(min_count=2))
+        self.assertNotEqual(text_generator.version, version)
+        self.assertEqual((report.contexts_before, report.contexts_after), (10, 5))
+        self.assertGreater(report.memory_saved, 0)
+        self.assertEqual(text_generator.ngrams_dict["мыла"]._count_dict, {"раму": 3})
+        self.assertEqual(text_generator.continue_phrase("мама"), "мама мыла раму.")
+        self.assertEqual(text_generator.continue_phrase("папа"), "папа.")
+
+    def test_model_prune_saves_dump(self):
+        model = Model()
+        model.create_new("dictionary")
+        model.read_and_update(self.text_path)
+        FileHandler.read_data("dictionary")     # the dictionary is opened from the dump with a journal
+        model.registry.discard("dictionary")
+        report = model.prune(PruningPolicy(min_count=2))
+        self.assertEqual(report.contexts_after, 5)
+        self.assertEqual(len(model.registry.get("dictionary").ngrams_dict), 5)
+        self.assertEqual(as_count_dicts(FileHandler.read_data("dictionary").ngrams_dict),
+                         as_count_dicts(model.registry.get("dictionary").ngrams_dict))
+        self.assertIsNone(Model().prune(PruningPolicy()))
+
+    def test_pruning_during_update(self):
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write(generate_corpus(5000))
+        model = Model()
+        model.create_new("dictionary")
+        policy = PruningPolicy(max_memory_mb=0.25)
+        with patch.object(TextGenerator, "_ingest_batch_size", 50), \
+                patch.object(TextGenerator, "prune", autospec=True, side_effect=TextGenerator.prune) as prune:
+            model.read_and_update(self.text_path, pruning=policy)
+        self.assertGreater(prune.call_count, 2)
+        policies = [call.args[1] for call in prune.call_args_list]
+        self.assertEqual(policies[:-1], [policy.ingestion_policy()] * (len(policies) - 1))
+        self.assertEqual(policies[-1], policy)
+        ngrams_dict = model.registry.get("dictionary").ngrams_dict
+        self.assertLessEqual(ngrams_dict.memory_size(), policy.max_memory_bytes)
+        self.assertEqual(as_count_dicts(FileHandler.read_data("dictionary").ngrams_dict), as_count_dicts(ngrams_dict))
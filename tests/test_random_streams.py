@@ -0,0 +1,60 @@
+"""Module tests random sources of generations from random_streams module."""
+
+from collections import Counter
+import unittest
+
+from model.random_streams import StepStreams
+
+
+class TestStepStreams(unittest.TestCase):
+
+    def draw(self, seed: int, prompt: str, prompt_index: int = 0, sample_index: int = 0,
+             steps: int = 5) -> list[float]:
+        step_streams = StepStreams(seed)
+        rng = step_streams.rng(prompt, prompt_index, sample_index)
+        numbers = []
+        for _ in range(steps):
+            step_streams.next_step()
+            numbers.append(rng.random())
+        return numbers
+
+    def test_reproduced_by_seed(self):
+        self.assertEqual(self.draw(1, "a"), self.draw(1, "a"))
+        self.assertNotEqual(self.draw(1, "a"), self.draw(2, "a"))
+        self.assertNotEqual(self.draw(-1, "a"), self.draw(2**64 - 1, "a"))
+
+    def test_every_generation_has_its_own_stream(self):
+        draws = [
+            self.draw(1, prompt, prompt_index, sample_index)
+            for prompt in "ab" for prompt_index in range(3) for sample_index in range(3)
+        ]
+        self.assertEqual(len({tuple(numbers) for numbers in draws}), len(draws))
+        for numbers, other_numbers in zip(draws, draws[1:]):
+            self.assertTrue(all(number != other for number, other in zip(numbers, other_numbers)))
+
+    def test_one_number_per_step(self):
+        step_streams = StepStreams(0)
+        rng = step_streams.rng("a")
+        step_streams.next_step()
+        self.assertEqual(rng.random(), rng.random())
+        self.assertEqual(rng.choice("abcd"), "abcd"[int(rng.random() * 4)])
+
+    def test_choice_is_uniform(self):
+        step_streams = StepStreams(0)
+        rng = step_streams.rng("a")
+        counts = Counter()
+        for _ in range(30000):
+            step_streams.next_step()
+            counts[rng.choice("abc")] += 1
+        for token in "abc":
+            self.assertAlmostEqual(counts[token] / 30000, 1 / 3, delta=0.02)
+
+    def test_streams_are_not_correlated(self):
+        step_streams = StepStreams(0)
+        first, second = step_streams.rng("a", 0), step_streams.rng("a", 1)
+        pairs = []
+        for _ in range(20000):
+            step_streams.next_step()
+            pairs.append((first.random() - 0.5, second.random() - 0.5))
+        covariance = sum(x * y for x, y in pairs) / len(pairs)
+        self.assertAlmostEqual(covariance / (1 / 12), 0, delta=0.03)
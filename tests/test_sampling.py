@@ -0,0 +1,153 @@
+"""Module tests weighted sampling from sampling module."""
+
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.generation_settings import GenerationSettings
+from model.ngram_store import NgramDict, NgramStore
+from model.sampling import (
+    SamplingSettings, SamplingTableCache, build_sampling_table, choose_weighted, parse_sampling_settings,
+)
+from model.text_generator import TextGenerator
+
+
+class TestBuildSamplingTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tokens = ["a", "b", ".", "c"]
+        self.counts = [1, 6, 2, 1]
+
+    def assert_weights(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for actual_weight, expected_weight in zip(actual, expected):
+            self.assertAlmostEqual(actual_weight, expected_weight)
+
+    def test_all_continuations(self):
+        table = build_sampling_table(SamplingSettings(), self.tokens, self.counts)
+        self.assertEqual(table.tokens, ["b", "a", "c"])
+        self.assert_weights(table.cumulative_weights, [1.0, 1 + 1 / 6, 1 + 2 / 6])
+        self.assertTrue(table.has_dot)
+
+    def test_top_k(self):
+        table = build_sampling_table(SamplingSettings(top_k=2), self.tokens, self.counts)
+        self.assertEqual(table.tokens, ["b"])
+        self.assertTrue(table.has_dot)
+
+    def test_top_p(self):
+        table = build_sampling_table(SamplingSettings(top_p=0.6), self.tokens, self.counts)
+        self.assertEqual(table.tokens, ["b"])
+        self.assertFalse(table.has_dot)
+
+    def test_temperature(self):
+        table = build_sampling_table(SamplingSettings(temperature=0.5), self.tokens, self.counts)
+        self.assert_weights(table.cumulative_weights, [1.0, 1 + 1 / 36, 1 + 2 / 36])
+
+    def test_invalid_settings(self):
+        for settings in (SamplingSettings(temperature=0), SamplingSettings(top_k=-1), SamplingSettings(top_p=0)):
+            with self.assertRaises(ValueError):
+                settings.validate()
+
+
+class TestChooseWeighted(unittest.TestCase):
+
+    def test_frequencies_follow_counts(self):
+        table = build_sampling_table(SamplingSettings(), ["a", "b", "c"], [1, 3, 6])
+        rng = random.Random(0)
+        draws = [choose_weighted(table, False, rng) for _ in range(20000)]
+        for token, share in (("a", 0.1), ("b", 0.3), ("c", 0.6)):
+            self.assertAlmostEqual(draws.count(token) / len(draws), share, delta=0.02)
+
+    def test_dot(self):
+        table = build_sampling_table(SamplingSettings(), ["a", "."], [1, 5])
+        self.assertEqual(choose_weighted(table, False), "a")
+        table = build_sampling_table(SamplingSettings(), ["."], [1])
+        self.assertEqual(choose_weighted(table, False), ".")
+        self.assertEqual(choose_weighted(table, True), ".")
+
+    def test_dot_is_drawn_by_its_weight(self):
+        table = build_sampling_table(SamplingSettings(), ["a", "b", "."], [6, 3, 1])
+        rng = random.Random(0)
+        self.assertNotIn(".", [choose_weighted(table, False, rng) for _ in range(1000)])
+        draws = [choose_weighted(table, True, rng) for _ in range(20000)]
+        for token, share in (("a", 0.6), ("b", 0.3), (".", 0.1)):
+            self.assertAlmostEqual(draws.count(token) / len(draws), share, delta=0.02)
+
+
+class TestSamplingTables(unittest.TestCase):
+
+    def test_table_is_rebuilt_after_update(self):
+        store = NgramStore()
+        store.update_by_count_dict({"a": {"b": 1}})
+        self.assertEqual(store.get_sampling_table_by_text("a", SamplingSettings()).tokens, ["b"])
+        store.update_by_count_dict({"a": {"c": 2}})
+        self.assertEqual(store.get_sampling_table_by_text("a", SamplingSettings()).tokens, ["c", "b"])
+        self.assertEqual(store.get_sampling_table_by_text("a", SamplingSettings(top_k=1)).tokens, ["c"])
+        self.assertIsNone(store.get_sampling_table_by_text("q", SamplingSettings()))
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = SamplingTableCache(max_size=2)
+        tables = {context: build_sampling_table(SamplingSettings(), [context], [1]) for context in "abc"}
+        cache.put("a", tables["a"])
+        cache.put("b", tables["b"])
+        self.assertIs(cache.get("a", SamplingSettings()), tables["a"])
+        cache.put("c", tables["c"])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b", SamplingSettings()))
+        self.assertIs(cache.get("a", SamplingSettings()), tables["a"])
+        self.assertIs(cache.get("c", SamplingSettings()), tables["c"])
+
+    def test_same_in_all_stores(self):
+        count_dict = {"a": {"b": 3, "c": 1, ".": 2}, "a b": {"c": 1}, "b": {".": 1}}
+        store = NgramStore()
+        store.update_by_count_dict(count_dict)
+        ngram_dict = NgramDict()
+        ngram_dict.update_by_count_dict(count_dict)
+        with tempfile.TemporaryDirectory() as directory, patch.object(FileHandler, "_dumps_folder_path", directory):
+            FileHandler.write_data(TextGenerator.from_store(store), "dictionary")
+            mapped_store = FileHandler.read_data("dictionary").ngrams_dict
+            mapped_store.add_changes({"b": {"c": 2}})
+            store.update_by_count_dict({"b": {"c": 2}})
+            ngram_dict.update_by_count_dict({"b": {"c": 2}})
+            for context in ("a", "a b", "b"):
+                expected = store.get_sampling_table_by_text(context, SamplingSettings())
+                self.assertEqual(mapped_store.get_sampling_table_by_text(context, SamplingSettings()), expected)
+                self.assertEqual(ngram_dict.get_sampling_table_by_text(context, SamplingSettings()), expected)
+            mapped_store.close()
+
+
+class TestWeightedGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.text_generator = TextGenerator(continuations_count=1)
+        self.text_generator.update_dicts_by_text("a b. a b. a b. a c. a d.")
+
+    def test_top_mode_is_default(self):
+        self.assertEqual({self.text_generator.continue_phrase("a") for _ in range(50)}, {"a b."})
+
+    def test_all_continuations_are_drawn(self):
+        settings = GenerationSettings(sampling=SamplingSettings())
+        self.assertEqual(
+            {self.text_generator.continue_phrase("a", settings=settings) for _ in range(200)}, {"a b.", "a c.", "a d."}
+        )
+        results = self.text_generator.generate_batch(["a"], n_per_prompt=200, seed=0, settings=settings)[0]
+        self.assertEqual(set(results), {"a b.", "a c.", "a d."})
+
+    def test_settings_validate_sampling(self):
+        with self.assertRaises(ValueError):
+            GenerationSettings(sampling=SamplingSettings(top_p=2))
+
+
+class TestParseSamplingSettings(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertIsNone(parse_sampling_settings({"sampling": "top", "temperature": "0"}))
+        self.assertEqual(
+            parse_sampling_settings({"sampling": "weighted", "temperature": "0.7", "top_k": "5", "top_p": "0.9"}),
+            SamplingSettings(0.7, 5, 0.9),
+        )
+        for config in ({"sampling": "beam"}, {"sampling": "weighted", "top_k": "x"}):
+            with self.assertRaises(ValueError):
+                parse_sampling_settings(config)
@@ -0,0 +1,147 @@
+"""Module tests request handling of GenerationServer class."""
+
+import asyncio
+import json
+import os
+import threading
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.file_handler import FileHandler
+from model.instrumentation import Instrumentation
+from model.model import Model
+from server.server import GenerationServer
+
+
+class TestGenerationServer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumps_folder_patch = patch.object(FileHandler, "_dumps_folder_path", self.directory.name)
+        self.dumps_folder_patch.start()
+        self.text_path = os.path.join(self.directory.name, "text.txt")
+        with open(self.text_path, "w", encoding="UTF-8") as file:
+            file.write("Мама мыла раму. Мама мыла раму.")
+        self.server = GenerationServer([])
+
+    def tearDown(self):
+        self.dumps_folder_patch.stop()
+        self.directory.cleanup()
+
+    async def request(self, method: str, path: str, body: dict = None):
+        return await self.server._dispatch(method, path, json.dumps(body).encode("UTF-8") if body else b"")
+
+    async def test_ingest_generate_delete(self):
+        self.assertEqual(
+            await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path}),
+            (200, {"dictionary": "mother"}),
+        )
+        self.assertEqual(await self.request("GET", "/dictionaries"), (200, {"dictionaries": ["mother"]}))
+        self.assertEqual(
+            await self.request("POST", "/generate", {"dictionary": "mother", "prompts": ["мама", "мыла"], "n": 2}),
+            (200, {"results": [["мама мыла раму."] * 2, ["мыла раму."] * 2]}),
+        )
+        self.assertEqual(
+            await self.request("POST", "/generate", {"dictionary": "mother", "prompt": "мама", "seed": 1}),
+            (200, {"results": [["мама мыла раму."]]}),
+        )
+        self.assertEqual((await self.request("GET", "/stats"))[1]["generation_cache"]["misses"], 1)
+        self.assertEqual(await self.request("DELETE", "/dictionaries/mother"), (200, {"dictionary": "mother"}))
+        self.assertEqual(FileHandler.get_files(), [])
+
+    async def test_errors(self):
+        self.assertEqual((await self.request("POST", "/generate", {"dictionary": "x", "prompt": "a"}))[0], 404)
+        self.assertEqual((await self.request("GET", "/generate"))[0], 405)
+        self.assertEqual((await self.request("GET", "/unknown"))[0], 404)
+        self.assertEqual((await self.request("POST", "/ingest", {"dictionary": "x", "path": "absent.txt"}))[0], 400)
+        self.assertEqual((await self.server._dispatch("POST", "/generate", b"not json"))[0], 400)
+
+    async def test_ingest_creates_dictionary_with_options(self):
+        body = {"dictionary": "mother", "path": self.text_path}
+        for option, value in (("order", 1), ("continuations_count", 0), ("continuations_count", True)):
+            self.assertEqual((await self.request("POST", "/ingest", {**body, option: value}))[0], 400)
+        await self.request("POST", "/ingest", {**body, "order": 2, "continuations_count": 1})
+        text_generator = self.server._registry.get("mother")
+        self.assertEqual((text_generator.order, text_generator.ngrams_dict.continuations_count), (2, 1))
+
+    async def test_generation_by_dictionary_being_updated(self):
+        await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path})
+        self.server._updating.add("mother")
+        self.assertEqual(
+            await self.request("POST", "/generate", {"dictionary": "mother", "prompt": "мама"}),
+            (200, {"results": [["мама мыла раму."]]}),
+        )
+        self.assertEqual((await self.request("DELETE", "/dictionaries/mother"))[0], 409)
+        self.server._unavailable.add("mother")
+        self.assertEqual((await self.request("POST", "/generate", {"dictionary": "mother", "prompt": "мама"}))[0], 503)
+
+    async def test_request_overrides_generation_settings(self):
+        await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path})
+        body = {"dictionary": "mother", "prompt": "мама", "max_generated_word_count": 1}
+        self.assertEqual(await self.request("POST", "/generate", body), (200, {"results": [["мама мыла."]]}))
+        self.assertEqual(
+            await self.request("POST", "/generate", {**body, "seed": 1, "n": 1}), (200, {"results": [["мама мыла."]]})
+        )
+        self.assertEqual(
+            await self.request("POST", "/generate", {"dictionary": "mother", "prompt": "мама", "seed": 1}),
+            (200, {"results": [["мама мыла раму."]]}),
+        )
+        for settings in ({"max_generated_word_count": -1}, {"sampling": "beam"}, {"sampling": "weighted", "top_p": 0},
+                         {"n": True}, {"n": 0}, {"seed": False}, {"seed": "1"}):
+            body = {"dictionary": "mother", "prompt": "мама", **settings}
+            self.assertEqual((await self.request("POST", "/generate", body))[0], 400)
+
+    async def test_loading_dictionary_does_not_block_other_requests(self):
+        await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path})
+        self.server._registry.discard("mother")
+        release = threading.Event()
+        loader = self.server._registry._loader
+
+        def load(name: str):
+            release.wait(5)
+            return loader(name)
+        with patch.object(self.server._registry, "_loader", load):
+            body = {"dictionary": "mother", "prompt": "мама"}
+            generation = asyncio.create_task(self.request("POST", "/generate", body))
+            answer = await asyncio.wait_for(self.request("GET", "/dictionaries"), 1)
+            self.assertEqual(answer, (200, {"dictionaries": ["mother"]}))
+            self.assertFalse(generation.done())
+            release.set()
+            self.assertEqual(await generation, (200, {"results": [["мама мыла раму."]]}))
+
+    async def test_request_limits(self):
+        await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path})
+        self.server._max_n, self.server._max_prompts = 3, 2
+        body = {"dictionary": "mother", "prompts": ["мама", "мыла"], "n": 3}
+        self.assertEqual((await self.request("POST", "/generate", body))[0], 200)
+        self.assertEqual((await self.request("POST", "/generate", {**body, "n": 4}))[0], 413)
+        self.assertEqual((await self.request("POST", "/generate", {**body, "prompts": ["мама"] * 3}))[0], 413)
+
+    async def test_unexpected_errors_are_answered(self):
+        body = {"dictionary": "mother", "path": self.text_path}
+        error = PermissionError(13, "Permission denied", self.text_path)
+        with patch.object(Model, "read_and_update", side_effect=error):
+            self.assertEqual((await self.request("POST", "/ingest", body))[0], 400)
+        with patch.object(Model, "read_and_update", side_effect=RuntimeError("broken")):
+            status, answer = await self.request("POST", "/ingest", body)
+        self.assertEqual(status, 500)
+        self.assertIn("broken", answer["error"])
+
+    async def test_metrics_and_profile(self):
+        await self.request("POST", "/ingest", {"dictionary": "mother", "path": self.text_path})
+        body = {"dictionary": "mother", "prompt": "мама", "profile": True}
+        self.assertEqual((await self.request("POST", "/generate", body))[0], 400)
+        self.server._profile_dir = os.path.join(self.directory.name, "profiles")
+        Instrumentation.enable()
+        try:
+            status, answer = await self.request("POST", "/generate", body)
+            stats = (await self.request("GET", "/stats"))[1]
+            metrics = (await self.request("GET", "/metrics"))[1]
+        finally:
+            Instrumentation.disable()
+            Instrumentation.reset()
+        self.assertEqual((status, answer["results"]), (200, [["мама мыла раму."]]))
+        self.assertTrue(os.path.isfile(answer["profile"]))
+        self.assertEqual(stats["instrumentation"]["TextGenerator.generate_batch"]["calls"], 1)
+        self.assertIn('textgen_calls_total{function="TextGenerator.generate_batch"} 1\n', metrics)
@@ -1,9 +1,14 @@
 """Module tests methods from TextGenerator and Ngram classes."""
 
+import random
 from typing import Counter
 import unittest
+from unittest.mock import patch
 
+from benchmarks.corpus import generate_corpus
+from model.generation_settings import GenerationSettings
 from model.ngram import Ngram
+from model.sampling import SamplingSettings
 from model.text_generator import TextGenerator
 
 
@@ -113,8 +118,8 @@ class TestContinuePhrase(unittest.TestCase):
         }
         text_generaotor = TextGenerator(ngrams)
         test_cases = [
-            ("x", " x" * TextGenerator._max_generated_word_count+"."),
-            ("y", " x" * TextGenerator._max_generated_word_count+"."),
+            ("x", " x" * GenerationSettings().max_generated_word_count+"."),
+            ("y", " x" * GenerationSettings().max_generated_word_count+"."),
         ]
         for phrase_begin, expected_new_words in test_cases:
             expected = expected = phrase_begin + expected_new_words
@@ -126,7 +131,7 @@ class TestContinuePhrase(unittest.TestCase):
             "x": Ngram(text="x", most_frequently_continuations_list=["x", "."]),
         }
         text_generaotor = TextGenerator(ngrams)
-        expected = "x" + " x"*TextGenerator._generated_without_dot+"."
+        expected = "x" + " x"*GenerationSettings().generated_without_dot+"."
         actual = text_generaotor.continue_phrase("x")
         self.assertEqual(actual, expected)
 
@@ -240,3 +245,165 @@ class TestUpdateDicts(unittest.TestCase):
         self.text_generaotor = TextGenerator(start_ngram)
         self.text_generaotor.update_dicts_by_count_dict(input_count_dict)
         self.assertEqual(self.text_generaotor._ngrams_dict, expected_ngrams)
+
+
+class TestContinuationsCount(unittest.TestCase):
+
+    def test_ngram_keeps_k_continuations(self):
+        ngram = Ngram(text="a", count_dict=Counter({"b": 1, "c": 3, "d": 2, "e": 1}), continuations_count=3)
+        self.assertEqual(ngram.most_frequently_continuations, ["c", "d", "b"])
+        ngram.update_dicts({"e": 2})
+        self.assertEqual(ngram.most_frequently_continuations, ["c", "e", "d"])
+
+    def test_not_dot_is_chosen_from_all_continuations(self):
+        ngram = Ngram(text="a", most_frequently_continuations_list=[".", "b", "c"])
+        obtained_values = {ngram.get_next_word_not_dot_is_possible() for _ in range(100)}
+        self.assertEqual(obtained_values, {"b", "c"})
+        self.assertEqual(ngram.get_next_word_dot_is_possible(), ".")
+
+    def test_generator_with_k_continuations(self):
+        for ngrams in (None, {"z": Ngram(text="z", most_frequently_continuations_list=["z"])}):
+            text_generator = TextGenerator(ngrams, continuations_count=3)
+            text_generator.update_dicts_by_count_dict({"a": {"b": 1, "c": 3, "d": 2, "e": 1}})
+            self.assertEqual(text_generator.ngrams_dict.get_continuations("a"), ["c", "d", "b"])
+            text_generator.update_dicts_by_count_dict({"a": {"e": 2}})
+            self.assertEqual(text_generator.ngrams_dict.get_continuations("a"), ["c", "e", "d"])
+
+
+class TestUpdateDictsByChunks(unittest.TestCase):
+
+    def test_same_as_update_dicts_by_text(self):
+        text = "x y z. x y z! y q? a b; x y q (z y x) y z."
+        expected = TextGenerator()
+        expected.update_dicts_by_text(text)
+        for chunk_size in (1, 2, 5, len(text)):
+            for batch_size in (1, 2, TextGenerator._ingest_batch_size):
+                with patch.object(TextGenerator, "_ingest_batch_size", batch_size):
+                    actual = TextGenerator()
+                    actual.update_dicts_by_chunks(text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
+                self.assertEqual(actual.ngrams_dict, expected.ngrams_dict)
+
+
+class TestParallelIngestion(unittest.TestCase):
+
+    def test_same_as_serial_ingestion(self):
+        texts = [generate_corpus(2000, vocabulary_size=50, seed=seed) for seed in range(3)]
+        serial = TextGenerator()
+        serial.update_dicts_by_chunk_streams([text] for text in texts)
+        with patch.object(TextGenerator, "_ingest_workers", 2):
+            parallel = TextGenerator()
+            parallel.update_dicts_by_chunk_streams(
+                (text[i:i + 500] for i in range(0, len(text), 500)) for text in texts
+            )
+        self.assertEqual(parallel.ngrams_dict, serial.ngrams_dict)
+        for context in serial.ngrams_dict:
+            self.assertEqual(
+                parallel.ngrams_dict.get_continuations(context), serial.ngrams_dict.get_continuations(context)
+            )
+
+
+class TestOrder(unittest.TestCase):
+
+    def test_order_must_be_at_least_2(self):
+        with self.assertRaises(ValueError):
+            TextGenerator(order=1)
+
+    def test_longest_context_is_used(self):
+        text = "a b c x. d b c y. d b c y. d b c y."
+        self.assertEqual(self._continue(3, text), "a b c y.")
+        self.assertEqual(self._continue(4, text), "a b c x.")
+
+    def test_backoff_to_shorter_context(self):
+        text_generator = TextGenerator(continuations_count=1, order=5)
+        text_generator.update_dicts_by_text("a b c d. q c e.")
+        self.assertEqual(text_generator.continue_phrase("z q c"), "z q c e.")
+        self.assertEqual(text_generator.continue_phrase("z c"), "z c d.")
+
+    def test_generate_batch_same_as_continue_phrase(self):
+        text_generator = TextGenerator(continuations_count=1, order=4)
+        text_generator.update_dicts_by_text("a b c x. d b c y. d b c y. e f g h i.")
+        prompts = ["a b c", "d b c", "e f", "z b c"]
+        self.assertEqual(
+            text_generator.generate_batch(prompts),
+            [[text_generator.continue_phrase(prompt)] for prompt in prompts],
+        )
+
+    @staticmethod
+    def _continue(order: int, text: str) -> str:
+        text_generator = TextGenerator(continuations_count=1, order=order)
+        text_generator.update_dicts_by_text(text)
+        return text_generator.continue_phrase("a b c")
+
+
+class TestGenerateBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.text_generator = TextGenerator()
+        self.text_generator.update_dicts_by_text(generate_corpus(5000, vocabulary_size=50))
+
+    def test_same_as_continue_phrase_without_choice(self):
+        text_generator = TextGenerator()
+        text_generator.update_dicts_by_text("x y z. a b c d. b e f.")
+        prompts = ["x", "a b", "x", "q", "b e"]
+        self.assertEqual(
+            text_generator.generate_batch(prompts),
+            [[text_generator.continue_phrase(prompt)] for prompt in prompts],
+        )
+
+    def test_results_in_order_of_prompts(self):
+        prompts = ["x y", "a", "x y"]
+        results = TextGenerator().generate_batch(prompts, n_per_prompt=2)
+        self.assertEqual(results, [["x y."] * 2, ["a."] * 2, ["x y."] * 2])
+
+    def test_seed(self):
+        prompts = list(self.text_generator.ngrams_dict)[:20]
+        results = self.text_generator.generate_batch(prompts, n_per_prompt=3, seed=1)
+        self.assertEqual(self.text_generator.generate_batch(prompts, n_per_prompt=3, seed=1), results)
+        for prompt, continuations in zip(prompts, results):
+            self.assertEqual(len(continuations), 3)
+            self.assertTrue(all(continuation.startswith(prompt) for continuation in continuations))
+
+    def test_with_empty_prompt(self):
+        with self.assertRaises(ValueError):
+            self.text_generator.generate_batch(["x", ""])
+
+
+class TestSeed(unittest.TestCase):
+
+    def setUp(self):
+        self.text_generator = TextGenerator()
+        self.text_generator.update_dicts_by_text(generate_corpus(5000, vocabulary_size=50))
+        self.prompts = list(self.text_generator.ngrams_dict)[:30]
+
+    def test_continue_phrase_is_reproduced_by_seed(self):
+        for prompt in self.prompts:
+            self.assertEqual(
+                self.text_generator.continue_phrase(prompt, seed=7), self.text_generator.continue_phrase(prompt, seed=7)
+            )
+        rng, same_rng = random.Random(3), random.Random(3)
+        self.assertEqual(
+            [self.text_generator.continue_phrase(prompt, rng=rng) for prompt in self.prompts],
+            [self.text_generator.continue_phrase(prompt, rng=same_rng) for prompt in self.prompts],
+        )
+
+    def test_global_random_is_not_used(self):
+        random.seed(0)
+        state = random.getstate()
+        self.text_generator.continue_phrase(self.prompts[0], seed=1)
+        self.text_generator.generate_batch(self.prompts, seed=1)
+        self.assertEqual(random.getstate(), state)
+
+    def test_batch_same_as_continue_phrase(self):
+        for sampling in (None, SamplingSettings(temperature=2)):
+            settings = GenerationSettings(sampling=sampling)
+            for prompt in self.prompts:
+                results = self.text_generator.generate_batch([prompt, prompt], n_per_prompt=2, seed=5, settings=settings)
+                self.assertEqual(results[0][0], self.text_generator.continue_phrase(prompt, seed=5, settings=settings))
+
+    def test_samples_of_batch_differ(self):
+        settings = GenerationSettings(max_generated_word_count=20, sampling=SamplingSettings())
+        prompt = self.prompts[0]
+        results = self.text_generator.generate_batch([prompt] * 3, n_per_prompt=4, seed=2, settings=settings)
+        texts = [text for continuations in results for text in continuations]
+        self.assertGreater(len(set(texts)), len(texts) // 2)
+        self.assertNotEqual(results[0], results[1])
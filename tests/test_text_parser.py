@@ -1,8 +1,11 @@
 """Module tests methods from TextParser class."""
 
+import random
+import re
+
 import unittest
 
-from model.text_parser import TextParser
+from model.text_parser import TOKENIZERS, TextParser, UnicodeTextParser, WhitespaceTextParser, get_text_parser
 
 
 class TestParseText(unittest.TestCase):
@@ -104,3 +107,110 @@ class TestParseText(unittest.TestCase):
         expected = [["a,", "b:", "."], ["a,", "a:", "b,", "."]]
         actual = self.text_parser.parse_text(text)
         self.assertEqual(actual, expected)
+
+
+class TestParseChunks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text_parser = TextParser()
+
+    @staticmethod
+    def split(text, chunk_size):
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    def test_empty_chunks(self):
+        self.assertEqual(list(self.text_parser.parse_chunks([])), [])
+        self.assertEqual(list(self.text_parser.parse_chunks(["", ""])), [])
+
+    def test_same_as_parse_text_for_any_chunk_size(self):
+        texts = [
+            "a.b!c?d;e(f)g;h",
+            "Очень нагруженный смысловой нагрузкой текст. Второе предложение этого великого текста.",
+            "a, b:. a, a:  b,",
+            " B ... C...!? it's  the end",
+            "no delimiters at all",
+        ]
+        for text in texts:
+            expected = self.text_parser.parse_text(text)
+            for chunk_size in range(1, len(text) + 1):
+                actual = list(self.text_parser.parse_chunks(self.split(text, chunk_size)))
+                self.assertEqual(actual, expected)
+
+    def test_texts_end_at_sentence_boundaries(self):
+        text = "a" * 1000 + ". b c! " + "d " * 500 + "e; f"
+        for chunk_size in (1, 7, 100):
+            texts = list(self.text_parser.split_chunks(self.split(text, chunk_size)))
+            self.assertEqual("".join(texts), text)
+            self.assertEqual(texts[-1], " f")
+            for part in texts[:-1]:
+                self.assertIn(part[-1], TextParser.SENTENCE_END_CHARACTERS)
+
+
+def reference_parse_text(text: str) -> list[list[str]]:
+    """The original implementation of parse_text, parsing every sentence separately."""
+    sentences = [sentence.strip().lower() for sentence in re.split(TextParser.DELIMITERS, text) if sentence.strip()]
+    return [re.findall(TextParser.WORD, sentence) + ["."] for sentence in sentences]
+
+
+class TestIterSentences(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text_parser = TextParser()
+
+    def assert_same_as_reference(self, text):
+        self.assertEqual(self.text_parser.parse_text(text), reference_parse_text(text), repr(text))
+        self.assertEqual(list(self.text_parser.iter_sentences(text)), reference_parse_text(text), repr(text))
+
+    def test_is_generator(self):
+        sentences = self.text_parser.iter_sentences("a. b.")
+        self.assertEqual(next(sentences), ["a", "."])
+
+    def test_fuzz_with_special_characters(self):
+        alphabet = (
+            "abzABZабяАБЯёЁ'',,::..!!??;;(())  \t\n\r\x0b\x0c\x1c\x1f\x85\xa0\u2028\u3000"
+            "0123456789-\"«»—İΣσςẞßǅ\u0307"
+        )
+        rng = random.Random(0)
+        for _ in range(3000):
+            self.assert_same_as_reference("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60))))
+
+    def test_fuzz_with_random_code_points(self):
+        rng = random.Random(1)
+        code_points = [code_point for code_point in range(0x3000) if not 0xd800 <= code_point < 0xe000]
+        for _ in range(300):
+            self.assert_same_as_reference("".join(map(chr, rng.choices(code_points, k=rng.randint(0, 300)))))
+
+
+class TestTokenizers(unittest.TestCase):
+
+    text = "Café déjà-vu 2024! Ελληνικά λόγια, don't. «Мама» мыла_раму"
+
+    def test_get_text_parser(self):
+        self.assertIsInstance(get_text_parser("default"), TextParser)
+        self.assertIsInstance(get_text_parser("unicode"), UnicodeTextParser)
+        self.assertIsInstance(get_text_parser("whitespace"), WhitespaceTextParser)
+        with self.assertRaises(ValueError):
+            get_text_parser("bytes")
+
+    def test_unicode_tokenizer_keeps_word_characters_of_any_script(self):
+        self.assertEqual(UnicodeTextParser().parse_text(self.text), [
+            ["café", "déjà", "vu", "2024", "."], ["ελληνικά", "λόγια,", "don't", "."], ["мама", "мыла_раму", "."]
+        ])
+
+    def test_whitespace_tokenizer_splits_by_whitespaces(self):
+        self.assertEqual(WhitespaceTextParser().parse_text(self.text), [
+            ["café", "déjà-vu", "2024", "."], ["ελληνικά", "λόγια,", "don't", "."], ["«мама»", "мыла_раму", "."]
+        ])
+
+    def test_all_tokenizers_split_sentences_alike(self):
+        rng = random.Random(0)
+        alphabet = "ab éΣ1_'.!?;()  \n"
+        for _ in range(500):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            expected = [len(sentence) for sentence in reference_parse_text(text)]
+            for tokenizer in TOKENIZERS:
+                parsed_text = get_text_parser(tokenizer).parse_text(text)
+                self.assertEqual(len(parsed_text), len(expected))
+                self.assertEqual(list(get_text_parser(tokenizer).iter_sentences(text)), parsed_text)
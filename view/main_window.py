@@ -23,6 +23,10 @@ class MainWindow(tk.Tk):
             _delete_dictionary_button (tk.Button): button for delete a new dictionary.
 
         _update_frame (ttk.Frame): frame for update selected dictionary:
+            _read_file_button (tk.Button): button for selecting a file to update dictionary by.
+            _cancel_update_button (tk.Button): button for cancelling the running update.
+            _update_progressbar (ttk.Progressbar): share of the file read by the running update.
+            _update_progress_label (ttk.Label): label with progress of the running update.
             _file_button (ttk.Radiobutton):  button that switches reading mode to reading file.
             _site_button (ttk.Radiobutton): button that switches reading mode to parsing site.
 
@@ -130,7 +134,13 @@ class MainWindow(tk.Tk):
         self._update_frame = ttk.LabelFrame(self._input_frame, text="Update", style="My.TLabelframe")
         self._update_frame.grid(row=0, column=2, sticky="nsew")
 
+        self._cancel_update_button = MainWindow._set_button(self._update_frame, "Отменить", pady=0)
+        self._cancel_update_button.config(state="disabled")
         self._read_file_button = MainWindow._set_button(self._update_frame, "Выберите файл", command=None)
+        self._update_progressbar = ttk.Progressbar(self._update_frame, length=150, maximum=1.0)
+        self._update_progressbar.pack(side="top", pady=10)
+        self._update_progress_label = ttk.Label(self._update_frame, text="", style="My.TLabel", wraplength=180)
+        self._update_progress_label.pack(side="top")
 
     def _set_image_frame(self) -> None:
         """Set and fill image_frame."""
@@ -203,6 +213,22 @@ class MainWindow(tk.Tk):
         """Set handler for button to read from file."""
         self._read_file_button.config(command=command)
 
+    def set_cancel_update_command(self, command) -> None:
+        """Set handler for button to cancel the running update."""
+        self._cancel_update_button.config(command=command)
+
+    def set_update_running(self, running: bool) -> None:
+        """Switch buttons of update frame between the running update and waiting for a file."""
+        self._read_file_button.config(state="disabled" if running else "normal")
+        self._cancel_update_button.config(state="normal" if running else "disabled")
+        if not running:
+            self.set_update_progress(0.0, "")
+
+    def set_update_progress(self, share: float, text: str) -> None:
+        """Show share of the file read by the running update and text describing its progress."""
+        self._update_progressbar["value"] = share
+        self._update_progress_label.config(text=text)
+
     def set_change_dictionary_command(self, command) -> None:
         """Set handler for button to change current dictionary."""
         self._dictionaries_combobox.bind("<<ComboboxSelected>>", command)